@@ -0,0 +1,166 @@
+"""
+Bounded, structured log sink for agent activity
+
+Agent and workflow logs go through stdlib logging instead of piling up as
+strings in graph state. The sink keeps the most recent records in a ring
+buffer, can also write every record as a JSON line to a file, and can
+echo to the console. Messages are %-formatted (or built by LazyText) only
+when a handler actually renders them.
+"""
+import json
+import logging
+import sys
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import config
+
+LOGGER_NAME = "feastguard"
+
+
+class LazyText:
+    """Defers building a log message until a handler formats it"""
+    
+    __slots__ = ("func", "args")
+    
+    def __init__(self, func: Callable[..., str], *args):
+        self.func = func
+        self.args = args
+    
+    def __str__(self) -> str:
+        return self.func(*self.args)
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the most recent records, unformatted, in a fixed-size buffer
+    
+    Also counts every record it sees by level, so totals survive the
+    buffer wrapping.
+    """
+    
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.buffer = deque(maxlen=capacity)
+        self.level_counts = Counter()
+    
+    def emit(self, record: logging.LogRecord):
+        # Handler.handle() already holds self.lock here
+        self.buffer.append(record)
+        self.level_counts[record.levelname] += 1
+    
+    def records(self, event_id: Optional[str] = None, level: int = logging.NOTSET) -> List[logging.LogRecord]:
+        """Buffered records, optionally for one event and/or at or above a level"""
+        with self.lock:
+            records = list(self.buffer)
+        return [
+            r for r in records
+            if r.levelno >= level and (event_id is None or getattr(r, "event_id", None) == event_id)
+        ]
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """One JSON object per record, with the agent, event and extra fields"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "agent": getattr(record, "agent", None),
+            "event_id": getattr(record, "event_id", None),
+            "message": record.getMessage()
+        }
+        payload.update(getattr(record, "fields", None) or {})
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class LogSink:
+    """
+    Handlers attached to the ``feastguard`` logger
+    
+    Args:
+        ring_size: Records kept in memory for recent()
+        path: Optional JSONL file receiving every record
+        level: Minimum level recorded (e.g. "INFO", "DEBUG")
+    """
+    
+    def __init__(self,
+                 ring_size: int = config.LOG_RING_SIZE,
+                 path: Optional[str] = None,
+                 level: str = config.LOG_LEVEL):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.setLevel(level)
+        self.logger.propagate = False
+        
+        self.ring = RingBufferHandler(ring_size)
+        self.ring.setFormatter(logging.Formatter("%(message)s"))
+        self.handlers: List[logging.Handler] = [self.ring]
+        
+        if path:
+            file_handler = logging.FileHandler(path, mode="w", encoding="utf-8")
+            file_handler.setFormatter(JSONLinesFormatter())
+            self.handlers.append(file_handler)
+        
+        for handler in self.handlers:
+            self.logger.addHandler(handler)
+    
+    def attach_console(self, stream=None) -> logging.Handler:
+        """Also print every record's message as it is logged"""
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(handler)
+        self.handlers.append(handler)
+        return handler
+    
+    def counts(self) -> Dict[str, int]:
+        """Records logged so far, by level name"""
+        with self.ring.lock:
+            return dict(self.ring.level_counts)
+    
+    def recent(self, limit: Optional[int] = None, event_id: Optional[str] = None) -> List[str]:
+        """Formatted messages from the ring buffer, oldest first"""
+        records = self.ring.records(event_id=event_id)
+        if limit is not None:
+            records = records[-limit:]
+        return [self.ring.format(r) for r in records]
+    
+    def close(self):
+        """Detach and close every handler"""
+        for handler in self.handlers:
+            self.logger.removeHandler(handler)
+            handler.close()
+        self.handlers = []
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the sink's ``feastguard`` namespace"""
+    get_log_sink()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+# Global sink instance
+_sink = None
+_sink_lock = threading.Lock()
+
+def get_log_sink() -> LogSink:
+    """Get or create the global log sink (ring buffer only by default)"""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = LogSink()
+    return _sink
+
+def configure_log_sink(ring_size: int = config.LOG_RING_SIZE,
+                       path: Optional[str] = None,
+                       level: str = config.LOG_LEVEL) -> LogSink:
+    """Replace the global log sink, e.g. to add a JSONL log file"""
+    global _sink
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+        _sink = LogSink(ring_size=ring_size, path=path, level=level)
+    return _sink
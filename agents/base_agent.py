@@ -1,8 +1,11 @@
 """
 Base agent utilities and shared functionality
 """
-from typing import Dict, Any
+import json
+from typing import Dict, Any, Callable, Generator, Optional, Union
 import llm_client
+from llm_client import MeteredStream
+from llm_resilience import LLMUnavailableError
 
 class BaseAgent:
     """
@@ -19,7 +22,10 @@ class BaseAgent:
         """Format agent log message"""
         return f"[{self.agent_name}] {message}"
     
-    def think(self, system_prompt: str, user_prompt: str, temperature: float = 0.7) -> str:
+    def think(self, system_prompt: str, user_prompt: str, temperature: float = 0.7,
+              use_cache: bool = True, stream: bool = False,
+              max_tokens: int = 800,
+              fallback: Optional[Callable[[], str]] = None) -> Union[str, MeteredStream]:
         """
         Call Nemotron for reasoning
         
@@ -27,15 +33,75 @@ class BaseAgent:
             system_prompt: Agent's role and instructions
             user_prompt: Specific task/question
             temperature: Sampling temperature
+            use_cache: Set False to force a fresh sample instead of a cached reply
+            stream: Yield reasoning chunks as they arrive
+            max_tokens: Max response length
+            fallback: Heuristic reasoning to use when Nemotron is unavailable
+                (retries exhausted or circuit open); the error is raised if omitted
+            
+        Returns:
+            Reasoning text from Nemotron (a MeteredStream of chunks when streaming)
+        """
+        try:
+            reply = self.client.chat_with_system(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=temperature,
+                use_cache=use_cache,
+                stream=stream,
+                max_tokens=max_tokens,
+                agent=self.agent_name
+            )
+        except LLMUnavailableError:
+            if fallback is None:
+                raise
+            return fallback()
+        
+        if stream:
+            # A stream only sends its request once iterated, so the error
+            # surfaces there rather than in the call above
+            return MeteredStream(self._stream_or_fallback(reply, fallback))
+        return reply
+    
+    def _stream_or_fallback(self, stream: MeteredStream,
+                            fallback: Optional[Callable[[], str]]) -> Generator[str, None, Optional[dict]]:
+        """Yield the streamed chunks, or the fallback text if Nemotron is unavailable"""
+        try:
+            return (yield from stream)
+        except LLMUnavailableError:
+            if fallback is None:
+                raise
+            yield fallback()
+            return None
+    
+    async def athink(self, system_prompt: str, user_prompt: str, temperature: float = 0.7,
+                     use_cache: bool = True,
+                     fallback: Optional[Callable[[], str]] = None) -> str:
+        """
+        Async variant of think(); lets independent events reason concurrently
+        
+        Args:
+            system_prompt: Agent's role and instructions
+            user_prompt: Specific task/question
+            temperature: Sampling temperature
+            use_cache: Set False to force a fresh sample instead of a cached reply
+            fallback: Heuristic reasoning to use when Nemotron is unavailable
             
         Returns:
             Reasoning text from Nemotron
         """
-        return self.client.chat_with_system(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=temperature
-        )
+        try:
+            return await self.client.achat_with_system(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=temperature,
+                use_cache=use_cache,
+                agent=self.agent_name
+            )
+        except LLMUnavailableError:
+            if fallback is None:
+                raise
+            return fallback()
     
     def extract_decision(self, reasoning_text: str, field: str) -> Any:
         """
@@ -52,4 +118,24 @@ class BaseAgent:
                 elif '=' in line:
                     return line.split('=', 1)[1].strip()
         return None
-
+    
+    def extract_json(self, response_text: str) -> Any:
+        """
+        Parse a JSON payload out of a model reply
+        
+        Accepts fenced ```json blocks, bare fences, or the outermost
+        [...] / {...} span in free text. Raises ValueError if nothing parses.
+        """
+        if "```json" in response_text:
+            json_str = response_text.split("```json")[1].split("```")[0].strip()
+        elif "```" in response_text:
+            json_str = response_text.split("```")[1].split("```")[0].strip()
+        else:
+            start = response_text.find('[')
+            end = response_text.rfind(']') + 1
+            if start == -1 or end <= start:
+                start = response_text.find('{')
+                end = response_text.rfind('}') + 1
+            json_str = response_text[start:end] if start != -1 and end > start else response_text.strip()
+        
+        return json.loads(json_str)
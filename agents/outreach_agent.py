@@ -1,7 +1,7 @@
 """
 Outreach Agent - Generates coordination messages
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from .base_agent import BaseAgent
 from tools import generate_outreach_message
 
@@ -81,6 +81,30 @@ Adapt tone based on urgency:
         
         return message
     
+    def generate_messages(self, route: dict) -> List[dict]:
+        """
+        Generate the outreach messages for a route: one per recipient
+        
+        A split delivery gets a message for each leg, covering only that
+        leg's volume and distance.
+        
+        Args:
+            route: Route dict from RoutingAgent
+            
+        Returns:
+            Message dicts (empty if no recipient)
+        """
+        if not route.get("legs"):
+            message = self.generate_message(route)
+            return [message] if message is not None else []
+        
+        messages = []
+        for number, leg in enumerate(route["legs"], start=1):
+            message = self.generate_message({**route, **leg})
+            message["leg"] = f"{number}/{len(route['legs'])}"
+            messages.append(message)
+        return messages
+    
     def _estimate_pickup_time(self, urgency: str) -> str:
         """Estimate pickup window based on urgency"""
         if urgency == "high":
@@ -107,7 +131,15 @@ Message Preview:
 
 In one sentence, explain the communication strategy and tone used."""
         
-        reasoning = self.think(self.system_prompt, user_prompt, temperature=0.6)
+        reasoning = self.think(
+            self.system_prompt,
+            user_prompt,
+            temperature=0.6,
+            fallback=lambda: (
+                f"Template message with {route['urgency']}-urgency tone, stating volume, "
+                f"food type and pickup window for {route['recipient_name']}."
+            )
+        )
         return reasoning
     
     def format_log(self, message: dict) -> str:
@@ -1,9 +1,14 @@
 """
 Prediction Agent - Analyzes events and predicts food surplus
 """
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from .base_agent import BaseAgent
-from tools import calculate_surplus_score, estimate_food_volume
+from llm_client import MeteredStream
+from tools import (calculate_surplus_score, estimate_food_volume, encode_categories,
+                   calculate_surplus_scores, estimate_food_volumes)
+from llm_resilience import LLMUnavailableError
+from reasoning_cache import ReasoningBucketCache
+import config
 
 
 class PredictionAgent(BaseAgent):
@@ -26,19 +31,26 @@ Consider these factors:
 4. Weather conditions (affects attendance and consumption)
 
 Think step-by-step about surplus likelihood and provide your reasoning."""
+        
+        # Near-duplicate events (same catering, weather, duration and
+        # attendee band) reuse one Nemotron reasoning
+        self.reasoning_cache = ReasoningBucketCache() if config.REASONING_CACHE_ENABLED else None
     
-    def analyze(self, event: dict) -> dict:
+    def analyze(self, event: dict, reasoning: Optional[str] = None) -> dict:
         """
         Analyze event and predict surplus
         
         Args:
             event: Event dictionary with attributes
+            reasoning: Pre-computed reasoning (e.g. from a batch call);
+                Nemotron is asked for it when omitted
             
         Returns:
             Prediction dict with surplus details and reasoning
         """
         # Step 1: Get Nemotron reasoning
-        reasoning = self._reason_about_surplus(event)
+        if reasoning is None:
+            reasoning = self._reason_about_surplus(event)
         
         # Step 2: Calculate surplus score using tool
         surplus_score = calculate_surplus_score(event)
@@ -64,11 +76,209 @@ Think step-by-step about surplus likelihood and provide your reasoning."""
         
         return prediction
     
+    def prescreen(self, events: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """
+        Score all events at once and predict the no-surplus ones without Nemotron
+        
+        The score alone decides has_surplus, so events it puts in the "none"
+        category get template reasoning instead of an LLM call.
+        
+        Args:
+            events: Event dictionaries
+            
+        Returns:
+            (surplus candidates still needing reasoning, predictions for
+            the no-surplus events), both in input order
+        """
+        scores = calculate_surplus_scores(
+            [event.get("attendees", 0) for event in events],
+            [event.get("duration_hours", 0) for event in events],
+            encode_categories([event.get("catering_type", "plated") for event in events],
+                              config.CATERING_FACTORS),
+            encode_categories([event.get("weather", "mild") for event in events],
+                              config.WEATHER_FACTORS)
+        )
+        categories = estimate_food_volumes([event.get("attendees", 0) for event in events], scores)["category"]
+        
+        candidates, predictions = [], []
+        for event, score, category in zip(events, scores, categories):
+            if category == "none":
+                predictions.append(self.analyze(event, reasoning=self._no_surplus_reasoning(event, float(score))))
+            else:
+                candidates.append(event)
+        return candidates, predictions
+    
+    def analyze_batch(self, events: List[dict], batch_size: Optional[int] = None) -> List[dict]:
+        """
+        Analyze many events, packing several into each Nemotron request
+        
+        Events whose reasoning is missing from a batch reply (or whose
+        whole batch reply fails to parse) fall back to a per-event call.
+        
+        Args:
+            events: Event dictionaries
+            batch_size: Events per request (defaults to config.PREDICTION_BATCH_SIZE)
+            
+        Returns:
+            Prediction dicts in the same order as events
+        """
+        batch_size = batch_size or config.PREDICTION_BATCH_SIZE
+        predictions = []
+        
+        for start in range(0, len(events), batch_size):
+            batch = events[start:start + batch_size]
+            
+            # Only events without reusable bucket reasoning go to Nemotron
+            reasonings = {}
+            if self.reasoning_cache is not None:
+                for event in batch:
+                    reused = self.reasoning_cache.lookup(event)
+                    if reused is not None:
+                        reasonings[event["event_id"]] = reused
+            pending = [event for event in batch if event["event_id"] not in reasonings]
+            
+            if len(pending) > 1:
+                batch_reasonings = self._reason_about_batch(pending)
+                if self.reasoning_cache is not None:
+                    for event in pending:
+                        if event["event_id"] in batch_reasonings:
+                            self.reasoning_cache.store(event, batch_reasonings[event["event_id"]])
+                reasonings.update(batch_reasonings)
+            
+            for event in batch:
+                predictions.append(self.analyze(event, reasoning=reasonings.get(event["event_id"])))
+        
+        return predictions
+    
+    def _reason_about_batch(self, events: List[dict]) -> Dict[str, str]:
+        """
+        Use one Nemotron call to reason about several events
+        
+        Returns:
+            Dict of event_id -> reasoning; empty if the reply can't be parsed
+        """
+        event_blocks = "\n\n".join(
+            f"""event_id: {event['event_id']}
+Event: {event['name']}
+- Attendees: {event['attendees']}
+- Catering Type: {event['catering_type']}
+- Duration: {event['duration_hours']} hours
+- Weather: {event['weather']}
+- Food Types: {', '.join(event['food_type'])}"""
+            for event in events
+        )
+        
+        user_prompt = f"""Analyze each of these {len(events)} events for food surplus potential:
+
+{event_blocks}
+
+For each event think through:
+1. What factors suggest surplus might occur?
+2. Is the food likely to be perishable or non-perishable?
+3. What's the urgency level for redistribution?
+
+Return ONLY a JSON array with one object per event, in this format:
+[
+  {{"event_id": "E001", "reasoning": "Brief 2-3 sentence analysis."}}
+]"""
+        
+        try:
+            response = self.think(
+                self.system_prompt,
+                user_prompt,
+                temperature=0.7,
+                max_tokens=config.PREDICTION_BATCH_TOKENS_PER_EVENT * len(events)
+            )
+        except LLMUnavailableError:
+            return {}
+        
+        try:
+            items = self.extract_json(response)
+            expected_ids = {event["event_id"] for event in events}
+            reasonings = {}
+            for item in items:
+                event_id = str(item["event_id"]).strip()
+                reasoning = str(item["reasoning"]).strip()
+                if event_id in expected_ids and reasoning:
+                    reasonings[event_id] = reasoning
+            return reasonings
+        except (ValueError, KeyError, TypeError):
+            return {}
+    
     def _reason_about_surplus(self, event: dict) -> str:
         """
         Use Nemotron to reason about surplus likelihood
+        
+        Reasoning from a similar event is reused when the bucket cache has it.
+        """
+        if self.reasoning_cache is None:
+            return self._ask_nemotron(event)[0]
+        return self.reasoning_cache.get_or_reason(event, lambda: self._ask_nemotron(event))
+    
+    def _ask_nemotron(self, event: dict) -> Tuple[str, bool]:
+        """
+        Returns:
+            (reasoning, whether it came from Nemotron rather than the heuristic)
         """
-        user_prompt = f"""Analyze this event for food surplus potential:
+        from_nemotron = True
+        
+        def fallback() -> str:
+            nonlocal from_nemotron
+            from_nemotron = False
+            return self._heuristic_reasoning(event)
+        
+        reasoning = self.think(
+            self.system_prompt,
+            self._surplus_prompt(event),
+            temperature=0.7,
+            fallback=fallback
+        )
+        return reasoning, from_nemotron
+    
+    def reasoning_cache_stats(self) -> Dict[str, float]:
+        """Hit rate of reasoning reuse across similar events (empty when disabled)"""
+        return self.reasoning_cache.stats() if self.reasoning_cache is not None else {}
+    
+    def _heuristic_reasoning(self, event: dict) -> str:
+        """Tool-only reasoning used when Nemotron is unavailable"""
+        surplus_score = calculate_surplus_score(event)
+        details = estimate_food_volume(event, surplus_score)
+        return (
+            f"Heuristic estimate (Nemotron unavailable): {event['attendees']} attendees, "
+            f"{event['catering_type']} catering for {event['duration_hours']} hours in "
+            f"{event['weather']} weather gives a surplus score of {surplus_score:.2f}, "
+            f"indicating {details['category'].replace('_', '-')} surplus with "
+            f"{details['urgency']} redistribution urgency."
+        )
+    
+    def _no_surplus_reasoning(self, event: dict, surplus_score: float) -> str:
+        """Template reasoning for events the pre-screen rules out"""
+        threshold = min(low for low, _ in config.SURPLUS_THRESHOLDS.values() if low > 0)
+        verdict = (
+            f"below the {threshold:.1f} surplus threshold" if surplus_score < threshold
+            else "outside the surplus score bands"
+        )
+        return (
+            f"Pre-screened without Nemotron: {event.get('attendees', 0)} attendees, "
+            f"{event.get('catering_type', 'plated')} catering for {event.get('duration_hours', 0)} hours in "
+            f"{event.get('weather', 'mild')} weather gives a surplus score of {surplus_score:.2f}, "
+            f"{verdict}, so no redistribution is expected."
+        )
+    
+    def stream_reasoning(self, event: dict, use_cache: bool = True) -> MeteredStream:
+        """
+        Stream surplus reasoning for an event chunk by chunk (for live UIs)
+        
+        The stream's ``metrics`` holds the call's timing record once exhausted
+        (None when the heuristic reasoning was streamed instead)
+        """
+        return self.think(self.system_prompt, self._surplus_prompt(event),
+                          temperature=0.7, use_cache=use_cache, stream=True,
+                          fallback=lambda: self._heuristic_reasoning(event))
+    
+    def _surplus_prompt(self, event: dict) -> str:
+        """Build the per-event surplus analysis prompt"""
+        return f"""Analyze this event for food surplus potential:
 
 Event: {event['name']}
 - Attendees: {event['attendees']}
@@ -83,9 +293,6 @@ Think through:
 3. What's the urgency level for redistribution?
 
 Provide a brief 2-3 sentence analysis."""
-        
-        reasoning = self.think(self.system_prompt, user_prompt, temperature=0.7)
-        return reasoning
     
     def _assess_confidence(self, event: dict, surplus_score: float) -> float:
         """
@@ -1,14 +1,21 @@
 """
 Routing Agent - Optimizes surplus-to-recipient matching
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional
 from .base_agent import BaseAgent
+from capacity_ledger import CapacityLedger
 from tools import (
     get_available_recipients, 
     calculate_distance, 
     check_recipient_capacity,
-    calculate_routing_cost
+    calculate_routing_cost,
+    plan_split_delivery,
+    RecipientIndex
 )
+import config
+
+# Routes keep the best candidate plus two alternatives
+TOP_CANDIDATES = 3
 
 
 class RoutingAgent(BaseAgent):
@@ -31,6 +38,22 @@ Optimization priorities:
 4. UTILIZATION: Prefer recipients who can use most of the volume
 
 Think strategically about the best match."""
+        
+        # Spatial index over the last recipient list routed against
+        # (rebuilt when a different list is passed)
+        self._index = (None, None)
+        
+        # Precomputed (event_id, recipient_id) -> distance, e.g. from the
+        # persistent distance store; missing pairs are calculated
+        self.distances: Optional[Mapping] = None
+        
+        # event_id -> recipient_id from a batch (global) routing plan; events
+        # without a planned recipient are routed greedily
+        self.assignments: Dict[str, Optional[str]] = {}
+        
+        # Run-wide capacity reservations; without one, capacity checks see
+        # only the recipients' original loads
+        self.ledger: Optional[CapacityLedger] = None
     
     def find_route(self, 
                    prediction: dict, 
@@ -49,28 +72,40 @@ Think strategically about the best match."""
         """
         # Skip if no surplus
         if not prediction["has_surplus"] or prediction["predicted_kg"] <= 0:
+            self.drop_route(prediction["event_id"])
             return None
         
-        # Step 1: Filter available recipients
+        # Step 1: Filter available recipients (net of capacity reserved by
+        # other routes and planned events; this event's own hold, e.g. at
+        # its planned recipient, is kept until the route moves or fails)
         food_category = prediction["category"]
-        available = get_available_recipients(
-            recipients, 
-            food_category=food_category,
-            min_capacity_kg=prediction["predicted_kg"] * 0.5  # Need at least 50% capacity
-        )
+        available = self.eligible_recipients(prediction, self._loaded(recipients, prediction["event_id"]))
         
         if not available:
-            return self._create_no_match_result(prediction, "No recipients available")
+            return self._split_or_no_match(event, prediction, recipients, "No recipients available")
         
         # Step 2: Calculate costs for each candidate
         candidates = self._score_candidates(
             event=event,
             prediction=prediction,
-            available_recipients=available
+            available_recipients=available,
+            limit=TOP_CANDIDATES,
+            all_recipients=recipients
         )
         
+        # A batch-planned recipient goes first; the greedy ranking is the
+        # fallback and supplies the alternatives
+        planned = self.assignments.get(prediction["event_id"])
+        if planned is not None:
+            candidates = self._with_planned(event, prediction, available, candidates, planned)
+        
+        if not candidates:
+            return self._split_or_no_match(event, prediction, recipients, "No suitable candidates")
+        
+        # Reserve the capacity before committing to the route
+        candidates = self._reserve(event, prediction, candidates, recipients)
         if not candidates:
-            return self._create_no_match_result(prediction, "No suitable candidates")
+            return self._split_or_no_match(event, prediction, recipients, "Capacity taken by other routes")
         
         # Step 3: Get Nemotron reasoning for top candidate
         best_candidate = candidates[0]
@@ -102,24 +137,151 @@ Think strategically about the best match."""
         
         return route
     
+    def use_distances(self, distances: Optional[Mapping]):
+        """
+        Look up event-recipient distances instead of calculating them
+        
+        Args:
+            distances: Mapping of (event_id, recipient_id) -> km built for the
+                same event and recipient locations (None to calculate again)
+        """
+        self.distances = distances
+    
+    def _distance(self, event: dict, recipient: dict) -> float:
+        """Event-to-recipient distance, from the precomputed matrix when it has it"""
+        if self.distances is not None:
+            distance = self.distances.get((event.get("event_id"), recipient["recipient_id"]))
+            if distance is not None:
+                return distance
+        return calculate_distance(tuple(event["location"]), tuple(recipient["location"]))
+    
+    def use_ledger(self, ledger: Optional[CapacityLedger]):
+        """
+        Reserve each route's volume in a shared capacity ledger
+        
+        Args:
+            ledger: Ledger for this run's recipients (None to stop reserving)
+        """
+        self.ledger = ledger
+    
+    def drop_route(self, event_id: str):
+        """Release the capacity held for an event whose route will not be delivered"""
+        if self.ledger is not None:
+            self.ledger.release(event_id)
+    
+    def _loaded(self, recipients: List[dict], event_id: Optional[str] = None) -> List[dict]:
+        """Recipients with capacity reserved for events other than event_id counted as load"""
+        return self.ledger.loaded(recipients, exclude=event_id) if self.ledger is not None else recipients
+    
+    def _reserve(self,
+                 event: dict,
+                 prediction: dict,
+                 candidates: List[dict],
+                 recipients: List[dict]) -> List[dict]:
+        """
+        Hold the surplus at the best candidate that still has room
+        
+        Another worker may have reserved a candidate since it was scored;
+        candidates are tried in order, and when all of them are taken the
+        ranking is redone against the ledger's current loads. Reserving
+        moves the event's existing hold only once a candidate accepts it.
+        
+        Returns:
+            Candidates starting with the reserved one (empty if none fits)
+        """
+        if self.ledger is None:
+            return candidates
+        
+        while candidates:
+            for position, candidate in enumerate(candidates):
+                if self.ledger.reserve(prediction["event_id"], candidate, prediction["predicted_kg"]):
+                    return candidates[position:]
+            
+            candidates = self._score_candidates(
+                event=event,
+                prediction=prediction,
+                available_recipients=self.eligible_recipients(
+                    prediction, self._loaded(recipients, prediction["event_id"])),
+                limit=TOP_CANDIDATES,
+                all_recipients=recipients
+            )
+        return []
+    
+    def use_assignments(self, assignments: Optional[Dict[str, Optional[str]]]):
+        """
+        Route events to recipients chosen by a batch plan
+        
+        Args:
+            assignments: event_id -> recipient_id from BatchRouter.plan()
+                (None or {} to route every event greedily)
+        """
+        self.assignments = assignments or {}
+    
+    def _with_planned(self,
+                      event: dict,
+                      prediction: dict,
+                      available_recipients: List[dict],
+                      candidates: List[dict],
+                      recipient_id: str) -> List[dict]:
+        """
+        Put the planned recipient first, if it can still take the surplus
+        
+        Returns:
+            The planned candidate plus the best greedy alternatives, or the
+            greedy candidates unchanged when the plan no longer fits
+        """
+        recipient = next((r for r in available_recipients if r["recipient_id"] == recipient_id), None)
+        scored = self._score_candidates(event, prediction, [recipient]) if recipient is not None else []
+        if not scored:
+            return candidates
+        
+        alternatives = [c for c in candidates if c["recipient_id"] != recipient_id]
+        return scored + alternatives[:TOP_CANDIDATES - 1]
+    
+    def eligible_recipients(self, prediction: dict, recipients: List[dict]) -> List[dict]:
+        """
+        Recipients a prediction's surplus could be routed to
+        
+        Args:
+            prediction: Prediction dict from PredictionAgent
+            recipients: List of available recipient orgs
+            
+        Returns:
+            Recipients accepting the food category with enough free capacity
+        """
+        if not prediction["has_surplus"] or prediction["predicted_kg"] <= 0:
+            return []
+        return get_available_recipients(
+            recipients, 
+            food_category=prediction["category"],
+            min_capacity_kg=prediction["predicted_kg"] * 0.5  # Need at least 50% capacity
+        )
+    
     def _score_candidates(self, 
                          event: dict, 
                          prediction: dict,
-                         available_recipients: List[dict]) -> List[dict]:
+                         available_recipients: List[dict],
+                         limit: Optional[int] = None,
+                         all_recipients: Optional[List[dict]] = None) -> List[dict]:
         """
         Score and rank candidate recipients
         
+        With a limit and a large recipient directory (all_recipients), only
+        the nearest recipients are scored, via the spatial index; the top
+        ``limit`` come out the same as from scoring every one.
+        
         Returns list sorted by cost (lower = better)
         """
+        if (limit and all_recipients is not None
+                and len(available_recipients) >= config.ROUTING_INDEX_MIN_RECIPIENTS):
+            return self._score_nearest(event, prediction, available_recipients, limit, all_recipients)
+        
         candidates = []
-        event_location = tuple(event["location"])
         is_perishable = prediction["category"] == "perishable"
         
         for recipient in available_recipients:
-            recipient_location = tuple(recipient["location"])
-            
             # Calculate distance
-            distance = calculate_distance(event_location, recipient_location)
+            distance = self._distance(event, recipient)
             
             # Check capacity
             capacity_check = check_recipient_capacity(
@@ -148,7 +310,184 @@ Think strategically about the best match."""
         # Sort by cost (lower is better)
         candidates.sort(key=lambda x: x["cost_score"])
         
-        return candidates
+        return candidates[:limit] if limit else candidates
+    
+    def _recipient_index(self, recipients: List[dict]) -> RecipientIndex:
+        """Spatial index for this recipient list, built on first use"""
+        indexed, index = self._index
+        if indexed is not recipients or len(index) != len(recipients):
+            index = RecipientIndex(recipients)
+            self._index = (recipients, index)
+        return index
+    
+    def _score_nearest(self,
+                       event: dict,
+                       prediction: dict,
+                       available_recipients: List[dict],
+                       limit: int,
+                       all_recipients: List[dict]) -> List[dict]:
+        """
+        Score recipients nearest-first and stop once none further can rank
+        
+        Cost is at least distance x weight (minus 0.005 from rounding), so
+        once that lower bound passes the limit-th best cost so far, every
+        further recipient would rank below it.
+        """
+        available = {recipient["recipient_id"]: recipient for recipient in available_recipients}
+        is_perishable = prediction["category"] == "perishable"
+        distance_weight = 2.0 if is_perishable else 1.0
+        
+        ranked = []  # (cost, directory position, candidate), best first
+        index = self._recipient_index(all_recipients)
+        for distance, position in index.iter_nearest(tuple(event["location"])):
+            if len(ranked) >= limit and distance * distance_weight - 0.01 > ranked[limit - 1][0]:
+                break
+            
+            recipient = available.get(all_recipients[position]["recipient_id"])
+            if recipient is None:
+                continue
+            
+            capacity_check = check_recipient_capacity(recipient, prediction["predicted_kg"])
+            if not capacity_check["can_accept"]:
+                continue
+            
+            cost = calculate_routing_cost(
+                distance_km=distance,
+                volume_kg=prediction["predicted_kg"],
+                capacity_kg=recipient["capacity_kg"],
+                is_perishable=is_perishable
+            )
+            
+            # Equal costs keep directory order, as the stable sort does
+            ranked.append((cost, position, {
+                **recipient,
+                "distance_km": distance,
+                "cost_score": cost,
+                "capacity_check": capacity_check
+            }))
+            ranked.sort(key=lambda item: item[:2])
+            del ranked[limit:]
+        
+        return [candidate for _, _, candidate in ranked]
+    
+    def _split_or_no_match(self,
+                           event: dict,
+                           prediction: dict,
+                           recipients: List[dict],
+                           reason: str) -> dict:
+        """
+        Split the surplus across several recipients when no single one fits
+        
+        Returns:
+            A split route (its legs in ``legs``), a single-recipient route
+            when only one recipient has room for part of it, or the
+            no-match result when split deliveries are off or none has room
+        """
+        if not config.SPLIT_DELIVERY_ENABLED:
+            self.drop_route(prediction["event_id"])
+            return self._create_no_match_result(prediction, reason)
+        
+        is_perishable = prediction["category"] == "perishable"
+        while True:
+            plan = plan_split_delivery(
+                prediction["predicted_kg"],
+                self._split_candidates(event, prediction, recipients),
+                is_perishable=is_perishable
+            )
+            if not plan["legs"]:
+                self.drop_route(prediction["event_id"])
+                return self._create_no_match_result(prediction, reason)
+            
+            # All legs are held together; if another route took one of the
+            # recipients meanwhile, plan again against the new loads
+            if self.ledger is None or self.ledger.reserve_many(
+                    prediction["event_id"], [(leg["recipient"], leg["volume_kg"]) for leg in plan["legs"]]):
+                break
+        
+        legs = [
+            {
+                "recipient_id": leg["recipient"]["recipient_id"],
+                "recipient_name": leg["recipient"]["name"],
+                "recipient_location": leg["recipient"]["location"],
+                "distance_km": leg["recipient"]["distance_km"],
+                "volume_kg": leg["volume_kg"],
+                "cost_score": leg["cost_score"]
+            }
+            for leg in plan["legs"]
+        ]
+        first = legs[0]
+        
+        route = {
+            "event_id": prediction["event_id"],
+            "event_name": prediction["event_name"],
+            "event_location": event["location"],
+            "recipient_id": first["recipient_id"],
+            "recipient_name": " + ".join(leg["recipient_name"] for leg in legs),
+            "recipient_location": first["recipient_location"],
+            "distance_km": first["distance_km"],
+            "volume_kg": plan["allocated_kg"],
+            "food_category": prediction["category"],
+            "urgency": prediction["urgency"],
+            "cost_score": plan["cost_score"],
+            "reasoning": self._reason_about_split(prediction, plan, legs),
+            "alternatives": [],
+            "unallocated_kg": plan["unallocated_kg"]
+        }
+        
+        # One leg is a partial delivery, not a split
+        if len(legs) > 1:
+            route["legs"] = legs
+        return route
+    
+    def _split_candidates(self, event: dict, prediction: dict, recipients: List[dict]) -> List[dict]:
+        """
+        Nearest recipients accepting the food with room for a split leg
+        
+        Room is counted net of every other event's hold, batch-planned ones
+        included, so legs only use capacity no planned event needs.
+        """
+        available = get_available_recipients(
+            self._loaded(recipients, prediction["event_id"]),
+            food_category=prediction["category"],
+            min_capacity_kg=config.SPLIT_DELIVERY_MIN_LEG_KG
+        )
+        candidates = [{**recipient, "distance_km": self._distance(event, recipient)} for recipient in available]
+        candidates.sort(key=lambda c: c["distance_km"])
+        return candidates[:config.SPLIT_DELIVERY_CANDIDATES]
+    
+    def _reason_about_split(self, prediction: dict, plan: dict, legs: List[dict]) -> str:
+        """
+        Use Nemotron to explain a split (or partial) delivery
+        """
+        leg_text = "\n".join(
+            f"- {leg['recipient_name']}: {leg['volume_kg']}kg, {leg['distance_km']:.1f}km (cost: {leg['cost_score']})"
+            for leg in legs
+        )
+        unallocated = f"\n- Not placed: {plan['unallocated_kg']}kg" if plan["unallocated_kg"] else ""
+        
+        user_prompt = f"""Analyze this split delivery:
+
+No single recipient can take {prediction['predicted_kg']}kg of {prediction['category']} food \
+({prediction['urgency']} urgency), so it is {"split" if len(legs) > 1 else "partly delivered"}:
+{leg_text}{unallocated}
+
+Explain in 1-2 sentences why this is the best use of the surplus."""
+        
+        if len(legs) > 1:
+            placement = f"is split across {len(legs)} nearby recipients"
+        else:
+            placement = f"goes to {legs[0]['recipient_name']}, the only recipient with room for part of it"
+        
+        return self.think(
+            self.system_prompt,
+            user_prompt,
+            temperature=0.6,
+            fallback=lambda: (
+                f"No single recipient had room for {prediction['predicted_kg']}kg, so the "
+                f"{prediction['category']} food {placement} "
+                f"({plan['allocated_kg']}kg placed, total cost {plan['cost_score']})."
+            )
+        )
     
     def _reason_about_route(self, 
                            prediction: dict,
@@ -177,7 +516,17 @@ Selected Match:
 
 Explain in 1-2 sentences why this is the optimal match."""
         
-        reasoning = self.think(self.system_prompt, user_prompt, temperature=0.6)
+        reasoning = self.think(
+            self.system_prompt,
+            user_prompt,
+            temperature=0.6,
+            fallback=lambda: (
+                f"Selected {best_candidate['name']} as the lowest-cost match "
+                f"({best_candidate['distance_km']:.1f}km, cost {best_candidate['cost_score']}) "
+                f"for {prediction['predicted_kg']}kg of {prediction['category']} food "
+                f"with {prediction['urgency']} urgency."
+            )
+        )
         return reasoning
     
     def _create_no_match_result(self, prediction: dict, reason: str) -> dict:
@@ -199,8 +548,16 @@ Explain in 1-2 sentences why this is the optimal match."""
         if route["recipient_id"] is None:
             return self.log(f"⚠️  {route['event_name']}: {route['reasoning']}")
         
+        if route.get("legs"):
+            return self.log(
+                f"✂️  {route['event_name']} → {len(route['legs'])} recipients ({route['recipient_name']}): "
+                f"{route['volume_kg']}kg {route['food_category']}"
+                + (f", {route['unallocated_kg']}kg not placed" if route["unallocated_kg"] else "")
+            )
+        
         return self.log(
             f"✅ {route['event_name']} → {route['recipient_name']}: "
             f"{route['distance_km']:.1f}km, {route['volume_kg']}kg {route['food_category']}"
+            + (f", {route['unallocated_kg']}kg not placed" if route.get("unallocated_kg") else "")
         )
 
@@ -54,6 +54,17 @@ def geocode_address(address, zipcode):
         pass
     return None
 
+def stream_llm_response(client, system_prompt, user_prompt, temperature, agent="App Search"):
+    """Call Nemotron with streaming, showing the raw reply as it arrives"""
+    placeholder = st.empty()
+    chunks = []
+    for chunk in client.chat_with_system(system_prompt, user_prompt, temperature=temperature,
+                                         stream=True, agent=agent):
+        chunks.append(chunk)
+        placeholder.code("".join(chunks), language="json")
+    placeholder.empty()
+    return "".join(chunks).strip()
+
 def search_events_in_zipcode(zipcode, start_date=None, end_date=None):
     """Search for events in a zipcode area using NVIDIA Nemotron LLM"""
     try:
@@ -79,7 +90,7 @@ Find 3-5 real upcoming events and return them in JSON format:
 ]
 Only return valid JSON. Use actual event information if possible, or realistic events based on the area."""
         
-        response = client.chat_with_system(system_prompt, user_prompt, temperature=0.3)
+        response = stream_llm_response(client, system_prompt, user_prompt, temperature=0.3)
         
         # Extract JSON from response
         if "```json" in response:
@@ -128,7 +139,7 @@ Only return valid JSON. Use actual event information if possible, or realistic e
             
             user_prompt = f"""Generate 3-5 realistic upcoming events that might occur in zipcode {zipcode}{date_constraint}. 
 Return JSON array with name, location (venue name), date (YYYY-MM-DD format within the specified range), estimated_attendees."""
-            response = client.chat_with_system(system_prompt, user_prompt, temperature=0.5)
+            response = stream_llm_response(client, system_prompt, user_prompt, temperature=0.5)
             
             if "```json" in response:
                 json_str = response.split("```json")[1].split("```")[0].strip()
@@ -187,7 +198,7 @@ Find 3-5 real organizations and return them in JSON format:
 ]
 Only return valid JSON. Use actual organization information if possible."""
         
-        response = client.chat_with_system(system_prompt, user_prompt, temperature=0.3)
+        response = stream_llm_response(client, system_prompt, user_prompt, temperature=0.3)
         
         # Extract JSON from response
         if "```json" in response:
@@ -229,7 +240,7 @@ Only return valid JSON. Use actual organization information if possible."""
             system_prompt = """You are a data extraction specialist. Generate realistic food bank information based on location."""
             user_prompt = f"""Generate 3-5 realistic food banks, soup kitchens, or food pantries that might exist in zipcode {zipcode}.
 Return JSON array with name, location (address), estimated_capacity_kg."""
-            response = client.chat_with_system(system_prompt, user_prompt, temperature=0.5)
+            response = stream_llm_response(client, system_prompt, user_prompt, temperature=0.5)
             
             if "```json" in response:
                 json_str = response.split("```json")[1].split("```")[0].strip()
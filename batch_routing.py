@@ -0,0 +1,313 @@
+"""
+Global min-cost assignment of surplus to recipients
+
+RoutingAgent.find_route picks each event's cheapest recipient on its own,
+so two large events can both be sent to the same pantry. The batch router
+plans every event at once as a min-cost flow: each event supplies its
+predicted kg, each recipient can take capacity_kg - current_load_kg, and
+an event -> recipient edge costs calculate_routing_cost spread over the
+event's kg. The flow may split an event across recipients; each event is
+then rounded to the recipient carrying most of its flow that still has
+room for all of it, and events that fit nowhere are left to the greedy
+per-event path.
+"""
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from screening import distance_matrix, events_frame, recipients_frame, routing_costs, surplus_scores
+from tools import estimate_food_volumes
+
+# Flow amounts below this (kg) count as zero
+EPSILON = 1e-9
+INFINITY = float("inf")
+
+
+class MinCostFlow:
+    """
+    Successive-shortest-path min-cost flow with Dijkstra and node potentials
+    
+    Supply is pushed from one source node at a time. Each search stops as
+    soon as the sink is reached, so an event whose cheapest recipient still
+    has room costs a handful of heap operations; only contended recipients
+    make the search reroute earlier flow.
+    
+    Args:
+        nodes: Number of nodes
+    """
+    
+    def __init__(self, nodes: int):
+        # Edge: [to, residual capacity, cost, index of reverse edge in graph[to]]
+        self.graph: List[List[list]] = [[] for _ in range(nodes)]
+        
+        # Positions of each node's edges with residual capacity left, so
+        # searches skip the (mostly empty) reverse edges
+        self._open: List[Dict[int, None]] = [{} for _ in range(nodes)]
+        
+        # Node potentials, stored relative to a shift shared by all nodes:
+        # raising every unsettled node by the sink distance is then free
+        self._raw = [0.0] * nodes
+        
+        # Nodes a failed search settled: augmenting paths never touch them,
+        # so they stay cut off from the sink for good
+        self._dead = set()
+    
+    def add_edge(self, u: int, v: int, capacity: float, cost: float) -> Tuple[int, int]:
+        """
+        Add a directed edge (and its zero-capacity reverse)
+        
+        Returns:
+            (u, position) of the edge in graph[u], for reading its flow later
+        """
+        self.graph[u].append([v, capacity, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0.0, -cost, len(self.graph[u]) - 1])
+        if capacity > EPSILON:
+            self._open[u][len(self.graph[u]) - 1] = None
+        return u, len(self.graph[u]) - 1
+    
+    def flow(self, edge: Tuple[int, int]) -> float:
+        """Flow currently on an edge returned by add_edge"""
+        u, position = edge
+        v, _, _, reverse = self.graph[u][position]
+        return self.graph[v][reverse][1]
+    
+    def push(self, source: int, sink: int, amount: float) -> float:
+        """
+        Send up to amount from source to sink along cheapest paths
+        
+        Returns:
+            Amount actually sent (less than asked when the sink is cut off)
+        """
+        sent = 0.0
+        while amount - sent > EPSILON:
+            prev = self._shortest_path(source, sink)
+            if prev is None:
+                break
+            
+            # Bottleneck along the path, then augment
+            bottleneck = amount - sent
+            v = sink
+            while v != source:
+                u, position = prev[v]
+                bottleneck = min(bottleneck, self.graph[u][position][1])
+                v = u
+            v = sink
+            while v != source:
+                u, position = prev[v]
+                edge = self.graph[u][position]
+                edge[1] -= bottleneck
+                if edge[1] <= EPSILON:
+                    self._open[u].pop(position, None)
+                self.graph[v][edge[3]][1] += bottleneck
+                self._open[v][edge[3]] = None
+                v = u
+            sent += bottleneck
+        return sent
+    
+    def _shortest_path(self, source: int, sink: int) -> Optional[Dict[int, Tuple[int, int]]]:
+        """
+        Dijkstra on reduced costs from source, stopping at sink
+        
+        Returns:
+            node -> (previous node, edge position) along the shortest path
+            tree, or None if the sink is unreachable
+        """
+        raw, graph, dead, open_edges = self._raw, self.graph, self._dead, self._open
+        if source in dead:
+            return None
+        
+        dist = {source: 0.0}
+        prev: Dict[int, Tuple[int, int]] = {}
+        settled = {}
+        heap = [(0.0, source)]
+        
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled[u] = d
+            if u == sink:
+                break
+            
+            potential_u, edges = raw[u], graph[u]
+            for position in open_edges[u]:
+                v, _, cost, _ = edges[position]
+                if v in settled or v in dead:
+                    continue
+                # Reduced cost (the shared shift cancels out); clamp rounding noise
+                reduced = cost + potential_u - raw[v]
+                nd = d + reduced if reduced > 0 else d
+                if nd < dist.get(v, INFINITY):
+                    dist[v] = nd
+                    prev[v] = (u, position)
+                    heapq.heappush(heap, (nd, v))
+        
+        if sink not in settled:
+            dead.update(settled)
+            return None
+        
+        # Settled nodes move by their distance, everything else by the sink's
+        sink_distance = settled[sink]
+        for v, d in settled.items():
+            raw[v] += d - sink_distance
+        return prev
+
+
+class BatchRouter:
+    """
+    Plans every event's recipient together instead of one event at a time
+    
+    Args:
+        candidates: Cheapest eligible recipients kept per event as flow edges
+        chunk_rows: Events per vectorized cost chunk
+    """
+    
+    def __init__(self,
+                 candidates: int = config.BATCH_ROUTING_CANDIDATES,
+                 chunk_rows: int = config.DISTANCE_MATRIX_CHUNK_ROWS):
+        self.candidates = max(1, candidates)
+        self.chunk_rows = max(1, chunk_rows)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {}
+        self._volumes: Dict[str, float] = {}
+    
+    def plan(self, events: List[dict], recipients: List[dict]) -> Dict[str, Optional[str]]:
+        """
+        Assign each event with surplus to one recipient, minimizing total cost
+        
+        Predicted kg and category come from the same surplus tools the
+        Prediction Agent uses, so the plan matches its predictions.
+        
+        Args:
+            events: Event dictionaries
+            recipients: Recipient dictionaries
+        
+        Returns:
+            event_id -> planned recipient_id, for every event with surplus
+            (None where no recipient has room for the whole surplus)
+        """
+        started = time.perf_counter()
+        if len(events) == 0 or len(recipients) == 0:
+            with self._lock:
+                self._stats = {"events": 0, "recipients": len(recipients), "edges": 0, "unplaced": 0,
+                               "total_cost": 0.0, "seconds": 0.0}
+                self._volumes = {}
+            return {}
+        
+        event_rows = events_frame(events)
+        recipient_rows = recipients_frame(recipients)
+        
+        volumes = estimate_food_volumes(event_rows["attendees"].to_numpy(), surplus_scores(event_rows))
+        predicted_kg, category = volumes["predicted_kg"], volumes["category"]
+        routable = np.flatnonzero((category != "none") & (predicted_kg > 0))
+        
+        capacity = recipient_rows["capacity_kg"].to_numpy(dtype=np.float64)
+        available = capacity - recipient_rows["current_load_kg"].to_numpy(dtype=np.float64)
+        edges = self._candidate_edges(event_rows, recipient_rows, routable, predicted_kg, category,
+                                      capacity, available)
+        
+        # Nodes: routable events, then recipients, then the sink
+        n_events, n_recipients = len(routable), len(recipient_rows)
+        sink = n_events + n_recipients
+        network = MinCostFlow(sink + 1)
+        for j in range(n_recipients):
+            if available[j] > 0:
+                network.add_edge(n_events + j, sink, float(available[j]), 0.0)
+        
+        flow_edges = []  # per event: [(recipient, cost, edge)], cheapest first
+        for node, (i, row) in enumerate(zip(routable, edges)):
+            volume = float(predicted_kg[i])
+            flow_edges.append([
+                (j, cost, network.add_edge(node, n_events + j, volume, cost / volume))
+                for j, cost in row
+            ])
+        
+        # Largest surpluses first: they have the fewest recipients to fit in
+        order = sorted(range(n_events), key=lambda node: -predicted_kg[routable[node]])
+        for node in order:
+            network.push(node, sink, float(predicted_kg[routable[node]]))
+        
+        # Round the (possibly split) flow to one recipient per event
+        remaining = available.copy()
+        assignments: Dict[str, Optional[str]] = {}
+        volumes: Dict[str, float] = {}
+        recipient_ids = recipient_rows["recipient_id"].tolist()
+        total_cost, unplaced = 0.0, 0
+        for node in order:
+            i = routable[node]
+            volume = predicted_kg[i]
+            ranked = sorted(flow_edges[node], key=lambda item: -network.flow(item[2]))
+            chosen = next(((j, cost) for j, cost, _ in ranked if remaining[j] >= volume), None)
+            if chosen is None:
+                assignments[event_rows["event_id"].iat[i]] = None
+                unplaced += 1
+                continue
+            
+            j, cost = chosen
+            remaining[j] -= volume
+            total_cost += cost
+            assignments[event_rows["event_id"].iat[i]] = recipient_ids[j]
+            volumes[event_rows["event_id"].iat[i]] = float(volume)
+        
+        with self._lock:
+            self._stats = {
+                "events": n_events,
+                "recipients": n_recipients,
+                "edges": sum(len(row) for row in edges),
+                "unplaced": unplaced,
+                "total_cost": round(total_cost, 2),
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+            self._volumes = volumes
+        return assignments
+    
+    def _candidate_edges(self, events, recipients, routable, predicted_kg, category,
+                         capacity, available) -> List[List[Tuple[int, float]]]:
+        """
+        Each routable event's cheapest eligible recipients
+        
+        Eligibility matches RoutingAgent: accepts the food category and has
+        room for the whole volume against the current loads.
+        
+        Returns:
+            Per routable event, [(recipient position, routing cost)] cheapest
+            first (equal costs in recipient order)
+        """
+        accepts_perishable = recipients["accepts_perishable"].to_numpy(dtype=bool)
+        accepts_non_perishable = recipients["accepts_non_perishable"].to_numpy(dtype=bool)
+        
+        edges = []
+        for start in range(0, len(routable), self.chunk_rows):
+            rows = routable[start:start + self.chunk_rows]
+            volume = predicted_kg[rows][:, None]
+            perishable = (category[rows] == "perishable")[:, None]
+            non_perishable = (category[rows] == "non_perishable")[:, None]
+            
+            accepts = np.where(perishable, accepts_perishable[None, :],
+                               np.where(non_perishable, accepts_non_perishable[None, :], True))
+            eligible = accepts & (available[None, :] >= volume)
+            
+            cost = routing_costs(distance_matrix(events.iloc[rows], recipients),
+                                 volume, capacity[None, :], perishable)
+            cost = np.where(eligible, cost, np.inf)
+            ranked = np.argsort(cost, axis=1, kind="stable")[:, :self.candidates]
+            
+            for r in range(len(rows)):
+                edges.append([
+                    (int(j), float(cost[r, j])) for j in ranked[r] if np.isfinite(cost[r, j])
+                ])
+        return edges
+    
+    def stats(self) -> Dict[str, float]:
+        """Size, cost and timing of the last plan"""
+        with self._lock:
+            return dict(self._stats)
+    
+    def volumes(self) -> Dict[str, float]:
+        """Predicted kg of each event the last plan assigned, to reserve at its recipient"""
+        with self._lock:
+            return dict(self._volumes)
@@ -0,0 +1,172 @@
+"""
+Recipient capacity ledger shared by every routing decision in a run
+
+Recipient records are never updated as deliveries are assigned, so the
+capacity filters kept seeing the original current_load_kg and one pantry
+could be promised the same free space many times over. The ledger holds
+each recipient's free kg and the reservations made against it: a route
+reserves its volume atomically (check and hold under one lock) and the
+hold is released if the route is dropped, so concurrent routing workers
+can never over-commit a recipient.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+def _capacity_and_load(recipient: dict) -> Tuple[float, float]:
+    return recipient.get("capacity_kg", 0), recipient.get("current_load_kg", 0)
+
+
+class CapacityLedger:
+    """
+    Free capacity per recipient, reserved as routes are created
+    
+    Reservations are keyed by a holder (the event_id): an event holds one
+    reservation, or one per leg of a split delivery, and reserving again
+    moves them. A batch routing plan holds each planned event's volume up
+    front, so routes made meanwhile cannot take it. Recipients not passed
+    in are tracked from the first recipient dict reserved against.
+    
+    Args:
+        recipients: Recipient dictionaries (capacity_kg, current_load_kg)
+    """
+    
+    def __init__(self, recipients: List[dict]):
+        self._lock = threading.Lock()
+        self._base: Dict[str, Tuple[float, float]] = {
+            recipient["recipient_id"]: _capacity_and_load(recipient) for recipient in recipients
+        }
+        self._reserved: Dict[str, float] = {}  # recipient_id -> kg held
+        self._holds: Dict[str, List[Tuple[str, float]]] = {}  # holder -> [(recipient_id, kg)]
+        
+        self.reservations = 0
+        self.releases = 0
+        self.conflicts = 0
+    
+    def loaded(self, recipients: List[dict], exclude: Optional[str] = None) -> List[dict]:
+        """
+        Recipients as the capacity tools should see them right now
+        
+        Args:
+            recipients: Recipient dictionaries
+            exclude: Holder whose own reservations stay free (the event
+                being routed, which may keep or move them)
+        
+        Returns:
+            The same list when nothing is reserved; otherwise copies of the
+            recipients holding reservations with those kg added to
+            current_load_kg (others are passed through unchanged)
+        """
+        with self._lock:
+            reserved = dict(self._reserved)
+            for recipient_id, volume_kg in self._holds.get(exclude, []):
+                reserved[recipient_id] -= volume_kg
+        
+        reserved = {recipient_id: kg for recipient_id, kg in reserved.items() if kg > 1e-9}
+        if not reserved:
+            return recipients
+        return [
+            recipient if recipient["recipient_id"] not in reserved
+            else {**recipient,
+                  "current_load_kg": recipient.get("current_load_kg", 0) + reserved[recipient["recipient_id"]]}
+            for recipient in recipients
+        ]
+    
+    def reserve(self, holder: str, recipient: dict, volume_kg: float, force: bool = False) -> bool:
+        """
+        Hold volume_kg of a recipient's capacity, if it is still free
+        
+        Any reservation the holder already has is replaced (the event is
+        being re-routed); it is kept if the new one is refused.
+        
+        Args:
+            holder: Who the capacity is held for (event_id)
+            recipient: Recipient dictionary
+            volume_kg: Kg to hold
+            force: Record the hold even if it over-commits (for routes
+                already delivered, e.g. restored from a checkpoint)
+        
+        Returns:
+            True if the capacity is now held for the holder
+        """
+        return self.reserve_many(holder, [(recipient, volume_kg)], force=force)
+    
+    def reserve_many(self, holder: str, legs: List[Tuple[dict, float]], force: bool = False) -> bool:
+        """
+        Hold capacity at several recipients at once (a split delivery)
+        
+        Either every leg is held, replacing the holder's earlier
+        reservation, or nothing changes.
+        
+        Args:
+            holder: Who the capacity is held for (event_id)
+            legs: (recipient dict, kg) per leg, at distinct recipients
+            force: Record the holds even if they over-commit
+        
+        Returns:
+            True if every leg is now held for the holder
+        """
+        with self._lock:
+            own: Dict[str, float] = {}
+            for recipient_id, volume_kg in self._holds.get(holder, []):
+                own[recipient_id] = own.get(recipient_id, 0) + volume_kg
+            
+            for recipient, volume_kg in legs:
+                capacity, load = self._base.setdefault(recipient["recipient_id"], _capacity_and_load(recipient))
+                held = self._reserved.get(recipient["recipient_id"], 0) - own.get(recipient["recipient_id"], 0)
+                
+                # Same arithmetic as check_recipient_capacity on a loaded() copy
+                if not force and capacity - (load + held) < volume_kg:
+                    self.conflicts += 1
+                    return False
+            
+            self._release(holder)
+            for recipient, volume_kg in legs:
+                recipient_id = recipient["recipient_id"]
+                self._reserved[recipient_id] = self._reserved.get(recipient_id, 0) + volume_kg
+            self._holds[holder] = [(recipient["recipient_id"], volume_kg) for recipient, volume_kg in legs]
+            self.reservations += 1
+            return True
+    
+    def release(self, holder: str) -> List[str]:
+        """
+        Give back the holder's reservation (its route was dropped)
+        
+        Returns:
+            The recipient_ids it was held at (empty if there was no hold)
+        """
+        with self._lock:
+            return self._release(holder)
+    
+    def _release(self, holder: str) -> List[str]:
+        hold = self._holds.pop(holder, None)
+        if hold is None:
+            return []
+        
+        for recipient_id, volume_kg in hold:
+            remaining = self._reserved[recipient_id] - volume_kg
+            if remaining > 1e-9:
+                self._reserved[recipient_id] = remaining
+            else:
+                del self._reserved[recipient_id]
+        self.releases += 1
+        return [recipient_id for recipient_id, _ in hold]
+    
+    def available_kg(self, recipient_id: str) -> Optional[float]:
+        """Free kg left at a recipient after reservations (None if unknown)"""
+        with self._lock:
+            if recipient_id not in self._base:
+                return None
+            capacity, load = self._base[recipient_id]
+            return capacity - (load + self._reserved.get(recipient_id, 0))
+    
+    def stats(self) -> Dict[str, float]:
+        """Reservations made, released and refused so far"""
+        with self._lock:
+            return {
+                "reservations": self.reservations,
+                "releases": self.releases,
+                "conflicts": self.conflicts,
+                "held": sum(len(hold) for hold in self._holds.values()),
+                "reserved_kg": round(sum(self._reserved.values()), 2)
+            }
@@ -0,0 +1,122 @@
+"""
+Per-event checkpoint store for orchestrator runs
+
+Each event's results (prediction, route, message) are written to a
+local SQLite file as soon as the event finishes. A run restarted with
+resume=True loads them back and only processes the remaining events, so
+a crash late in a long run does not throw away the LLM calls already
+paid for.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+import config
+from incremental import event_fingerprint, recipients_fingerprint
+
+
+class CheckpointStore:
+    """
+    SQLite-backed store of completed event results, keyed by run id
+    
+    A run id is a hash of the input events' and recipients' content, so
+    re-running the same inputs finds the earlier run's checkpoints while a
+    data refresh or a changed recipient load/capacity starts a new run.
+    A run's rows are deleted once it finishes, and runs abandoned for
+    longer than ``max_age_seconds`` are pruned when the store opens.
+    """
+    
+    def __init__(self,
+                 path: str = config.CHECKPOINT_PATH,
+                 max_age_seconds: float = config.CHECKPOINT_MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS event_results (
+                   run_id TEXT NOT NULL,
+                   event_id TEXT NOT NULL,
+                   result TEXT NOT NULL,
+                   completed_at REAL NOT NULL,
+                   PRIMARY KEY (run_id, event_id)
+               )"""
+        )
+        if max_age_seconds:
+            self.prune(max_age_seconds)
+    
+    @staticmethod
+    def run_id_for(events: List[dict], recipients: List[dict]) -> str:
+        """Stable id for a run over these events and recipients"""
+        payload = json.dumps(
+            {
+                "events": [[event["event_id"], event_fingerprint(event)] for event in events],
+                "recipients": recipients_fingerprint(recipients)
+            },
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
+    def start_run(self, run_id: str, resume: bool = False) -> Dict[str, dict]:
+        """
+        Begin a run, keeping earlier checkpoints only when resuming
+        
+        Returns:
+            Dict of event_id -> stored result for events already completed
+        """
+        if not resume:
+            self.clear(run_id)
+            return {}
+        return self.completed(run_id)
+    
+    def save_event(self, run_id: str, event_id: str, result: dict):
+        """Persist one finished event's results"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO event_results VALUES (?, ?, ?, ?)",
+                (run_id, event_id, json.dumps(result, default=str), time.time())
+            )
+    
+    def completed(self, run_id: str) -> Dict[str, dict]:
+        """Results of every event checkpointed for the run"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT event_id, result FROM event_results WHERE run_id = ? ORDER BY completed_at",
+                (run_id,)
+            ).fetchall()
+        return {event_id: json.loads(result) for event_id, result in rows}
+    
+    def clear(self, run_id: str):
+        """Drop every checkpoint for the run"""
+        with self._lock:
+            self._conn.execute("DELETE FROM event_results WHERE run_id = ?", (run_id,))
+    
+    def finish_run(self, run_id: str):
+        """The run completed, so there is nothing left to resume: drop its checkpoints"""
+        self.clear(run_id)
+    
+    def prune(self, max_age_seconds: float) -> int:
+        """
+        Drop runs whose last checkpoint is older than max_age_seconds
+        
+        Returns:
+            Number of checkpoint rows deleted
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                """DELETE FROM event_results WHERE run_id IN (
+                       SELECT run_id FROM event_results GROUP BY run_id HAVING MAX(completed_at) < ?
+                   )""",
+                (time.time() - max_age_seconds,)
+            )
+            return cursor.rowcount
@@ -9,7 +9,37 @@ load_dotenv()
 # NVIDIA Nemotron Configuration
 NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY", "")
 NEMOTRON_MODEL = "nvidia/nemotron-nano-12b-v2-vl"  # NVIDIA hosted model
-NVIDIA_ENDPOINT = "https://integrate.api.nvidia.com/v1/chat/completions"
+NVIDIA_ENDPOINT = os.getenv(
+    "NVIDIA_ENDPOINT",
+    "https://integrate.api.nvidia.com/v1/chat/completions"
+)  # Override to point at mock_nemotron_server.py for offline load tests
+
+# LLM Transport Configuration
+LLM_TIMEOUT_SECONDS = 30
+LLM_POOL_SIZE = 10  # Keep-alive connections per host
+LLM_POOL_HOSTS = 4  # Distinct hosts with a cached connection pool
+LLM_POOL_BLOCK = True  # Wait for a free connection rather than exceed the pool
+LLM_MAX_CONCURRENCY = 8  # In-flight async requests; keep <= LLM_POOL_SIZE
+
+# LLM Rate Limiting, Retries and Circuit Breaker
+LLM_RATE_LIMIT_PER_SECOND = 5.0
+LLM_RATE_LIMIT_BURST = 10
+LLM_MAX_RETRIES = 4
+LLM_BACKOFF_BASE_SECONDS = 0.5
+LLM_BACKOFF_MAX_SECONDS = 20.0
+LLM_BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failures before failing fast
+LLM_BREAKER_RESET_SECONDS = 30.0  # Wait before letting a probe request through
+
+# LLM Response Cache
+LLM_CACHE_ENABLED = os.getenv("FEASTGUARD_LLM_CACHE", "1") != "0"
+LLM_CACHE_PATH = ".cache/llm_responses.sqlite3"
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_COALESCE_ENABLED = True  # Share one request between identical concurrent prompts
+
+# LLM Metrics (per-call timing records)
+LLM_METRICS_MAX_RECORDS = 10_000  # Raw records kept; totals keep counting past this
+LLM_METRICS_SAMPLE_SIZE = 1_000  # Most recent TTFTs kept for the p95
 
 # System Configuration
 MAX_EVENTS = 50
@@ -52,6 +82,64 @@ SURPLUS_THRESHOLDS = {
 # Agent Configuration
 AGENT_TEMPERATURE = 0.7
 AGENT_MAX_ITERATIONS = 5
+WORKFLOW_MAX_WORKERS = 8  # Events processed in parallel by the workflow
+
+# Pipelined Mode (--mode pipeline)
+PIPELINE_QUEUE_SIZE = 4  # Max events waiting between two stages
+PIPELINE_STAGE_WORKERS = {
+    "prediction": 1,
+    "routing": 1,
+    "outreach": 1
+}
+
+# Run Checkpoints (main.py --resume)
+CHECKPOINT_ENABLED = True
+CHECKPOINT_PATH = ".cache/checkpoints.sqlite3"
+CHECKPOINT_MAX_AGE_SECONDS = 7 * 24 * 3600  # Unfinished runs older than this are pruned
+
+# Agent Log Sink
+LOG_LEVEL = "INFO"
+LOG_RING_SIZE = 2000  # Most recent log records kept in memory
+
+# Pre-screening: no-surplus events get template reasoning, not a Nemotron call
+PRESCREEN_ENABLED = True
+
+# Batched Prediction
+PREDICTION_BATCH_SIZE = 15  # Events packed into one Nemotron request
+PREDICTION_BATCH_TOKENS_PER_EVENT = 160  # max_tokens budget per event in a batch
+
+# Reasoning Reuse Across Similar Events
+REASONING_CACHE_ENABLED = True
+REASONING_CACHE_ATTENDEE_BAND = 250  # Attendees per bucket
+REASONING_CACHE_DURATION_BAND_HOURS = 1
+REASONING_CACHE_MAX_REUSE = 10  # Reuses before re-asking Nemotron (0 = unlimited)
+
+# Distance Matrices
+DISTANCE_MATRIX_CHUNK_ROWS = 256  # Events per broadcast chunk (bounds peak memory)
+
+# Persistent Distance Matrices (memory-mapped, reused across runs)
+DISTANCE_STORE_ENABLED = True
+DISTANCE_STORE_DIR = ".cache/distances"
+
+# Recipient Spatial Index
+SPATIAL_INDEX_CELL_KM = 10  # Grid cell size, about the usual search radius
+ROUTING_INDEX_MIN_RECIPIENTS = 200  # Below this, routing scans recipients linearly
+
+# Capacity Ledger (route reservations shared by all routing decisions)
+CAPACITY_LEDGER_ENABLED = True
+
+# Split Deliveries (surplus too large for any single recipient)
+SPLIT_DELIVERY_ENABLED = True
+SPLIT_DELIVERY_MAX_LEGS = 4  # Most recipients one surplus is split across
+SPLIT_DELIVERY_MIN_LEG_KG = 10  # Recipients with less free capacity are skipped
+SPLIT_DELIVERY_CANDIDATES = 20  # Nearest eligible recipients considered
+
+# Batch Routing (global min-cost assignment, batch_routing.py)
+BATCH_ROUTING_ENABLED = True
+BATCH_ROUTING_CANDIDATES = 10  # Cheapest eligible recipients per event considered
+
+# Numeric Screening (screening.py)
+SCREENING_CELL_BUDGET = 2_000_000  # Event x recipient cells per chunk (~80 bytes each at peak)
 
 # UI Configuration
 MAP_CENTER = [39.7392, -104.9903]  # Denver, CO
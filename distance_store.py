@@ -0,0 +1,203 @@
+"""
+Persistent, memory-mapped distance matrices reused across runs
+
+Event x recipient (and recipient x recipient) distances are stored as
+float32 .npy files under .cache/distances and opened with mmap, so a run
+over the same locations reads them from the page cache instead of
+recomputing haversines. Each file is keyed by a hash of its row and
+column location sets; when those change, only the new or moved rows and
+columns are computed and everything else is copied from the previous
+file.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from tools import DistanceMatrix, haversine_matrix
+
+Point = Tuple[str, float, float]  # (id, lat, lon)
+
+
+def _points(items: List[dict], id_key: str) -> List[Point]:
+    """Id and location of every event or recipient, in list order"""
+    points = []
+    for item in items:
+        lat, lon = item.get("location", [0, 0])
+        points.append((item[id_key], float(lat), float(lon)))
+    return points
+
+
+class DistanceStore:
+    """
+    Directory of memory-mapped distance matrices, one per kind
+    
+    Only the latest matrix of each kind ("events" or "recipients") is
+    kept; it is the base the next changed location set is updated from.
+    
+    Args:
+        directory: Where the .npy matrices and their JSON sidecars live
+    """
+    
+    KINDS = ("events", "recipients")
+    
+    def __init__(self, directory: str = config.DISTANCE_STORE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+        self.rows_computed = 0
+        self.columns_computed = 0
+        self.cells_reused = 0
+    
+    @staticmethod
+    def key_for(rows: List[Point], columns: List[Point]) -> str:
+        """Hash of the row and column location sets"""
+        payload = json.dumps({"rows": rows, "columns": columns}, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
+    def _path(self, kind: str, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{kind}-{key}{suffix}")
+    
+    def event_matrix(self, events: List[dict], recipients: List[dict]) -> DistanceMatrix:
+        """Distances from every event to every recipient"""
+        return self._matrix("events", _points(events, "event_id"), _points(recipients, "recipient_id"))
+    
+    def recipient_matrix(self, recipients: List[dict]) -> DistanceMatrix:
+        """Distances between every pair of recipients"""
+        points = _points(recipients, "recipient_id")
+        return self._matrix("recipients", points, points)
+    
+    def _matrix(self, kind: str, rows: List[Point], columns: List[Point]) -> DistanceMatrix:
+        key = self.key_for(rows, columns)
+        path = self._path(kind, key, ".npy")
+        
+        with self._lock:
+            if os.path.exists(path):
+                self.hits += 1
+            else:
+                self._build(kind, key, rows, columns)
+        
+        return DistanceMatrix(
+            np.load(path, mmap_mode="r"),
+            [point[0] for point in rows],
+            [point[0] for point in columns]
+        )
+    
+    def _latest(self, kind: str) -> Optional[dict]:
+        """Sidecar of the last matrix written for this kind, if still on disk"""
+        pointer = os.path.join(self.directory, f"latest-{kind}.json")
+        try:
+            with open(pointer, "r") as f:
+                key = json.load(f)["key"]
+            with open(self._path(kind, key, ".json"), "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError, KeyError):
+            return None
+        return meta if os.path.exists(self._path(kind, key, ".npy")) else None
+    
+    def _build(self, kind: str, key: str, rows: List[Point], columns: List[Point]):
+        """
+        Write the matrix for a new location set
+        
+        Rows and columns whose id and location match the previous matrix
+        are copied from it; only the rest are computed.
+        """
+        previous = self._latest(kind)
+        old_rows: Dict[Point, int] = {}
+        old_columns: Dict[Point, int] = {}
+        old = None
+        if previous is not None:
+            old_rows = {tuple(point): i for i, point in enumerate(previous["rows"])}
+            old_columns = {tuple(point): j for j, point in enumerate(previous["columns"])}
+            old = np.load(self._path(kind, previous["key"], ".npy"), mmap_mode="r")
+        
+        row_from = np.array([old_rows.get(point, -1) for point in rows], dtype=np.intp)
+        column_from = np.array([old_columns.get(point, -1) for point in columns], dtype=np.intp)
+        kept_columns = np.flatnonzero(column_from >= 0)
+        new_columns = np.flatnonzero(column_from < 0)
+        
+        lat2 = np.array([point[1] for point in columns], dtype=np.float64)
+        lon2 = np.array([point[2] for point in columns], dtype=np.float64)
+        
+        tmp_path = self._path(kind, key, ".tmp.npy")
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32,
+                                        shape=(len(rows), len(columns)))
+        
+        chunk_rows = max(1, config.DISTANCE_MATRIX_CHUNK_ROWS)
+        for start in range(0, len(rows), chunk_rows):
+            chunk = np.arange(start, min(start + chunk_rows, len(rows)))
+            lat1 = np.array([rows[i][1] for i in chunk], dtype=np.float64)
+            lon1 = np.array([rows[i][2] for i in chunk], dtype=np.float64)
+            
+            kept = chunk[row_from[chunk] >= 0]
+            fresh = chunk[row_from[chunk] < 0]
+            
+            # Unchanged rows: copy unchanged columns, compute new columns only
+            if len(kept) and old is not None:
+                if len(kept_columns):
+                    out[np.ix_(kept, kept_columns)] = old[np.ix_(row_from[kept], column_from[kept_columns])]
+                if len(new_columns):
+                    local = kept - start
+                    out[np.ix_(kept, new_columns)] = haversine_matrix(
+                        lat1[local], lon1[local], lat2[new_columns], lon2[new_columns]
+                    )
+                self.cells_reused += len(kept) * len(kept_columns)
+            
+            # New or moved rows: compute every column
+            if len(fresh):
+                local = fresh - start
+                out[fresh] = haversine_matrix(lat1[local], lon1[local], lat2, lon2)
+        
+        out.flush()
+        del out
+        os.replace(tmp_path, self._path(kind, key, ".npy"))
+        
+        with open(self._path(kind, key, ".json"), "w") as f:
+            json.dump({"key": key, "rows": rows, "columns": columns}, f, separators=(",", ":"))
+        with open(os.path.join(self.directory, f"latest-{kind}.json"), "w") as f:
+            json.dump({"key": key}, f)
+        
+        self.builds += 1
+        self.rows_computed += int((row_from < 0).sum())
+        self.columns_computed += len(new_columns)
+        
+        # Keep only the latest matrix of each kind
+        if previous is not None and previous["key"] != key:
+            del old
+            for suffix in (".npy", ".json"):
+                try:
+                    os.remove(self._path(kind, previous["key"], suffix))
+                except OSError:
+                    pass
+    
+    def stats(self) -> Dict[str, int]:
+        """Matrix reuse counters since startup"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "builds": self.builds,
+                "rows_computed": self.rows_computed,
+                "columns_computed": self.columns_computed,
+                "cells_reused": self.cells_reused
+            }
+
+
+# Global store instance
+_store = None
+_store_lock = threading.Lock()
+
+def get_distance_store() -> DistanceStore:
+    """Get or create the global distance store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DistanceStore()
+    return _store
@@ -0,0 +1,168 @@
+"""
+Incremental re-runs against the previous run's results
+
+Every event record in results.jsonl carries two fingerprints: one of the
+event's inputs and one of the recipients it could have been routed to.
+On an incremental run the previous results file is rotated aside and
+compared against the new inputs:
+
+- event and recipients unchanged: the record is carried forward as-is,
+  original completed_at included, with no LLM calls
+- event unchanged, recipients changed: the prediction is reused and only
+  routing re-runs; the outreach message is reused too if the route came
+  out the same
+- event changed (or new): processed from scratch
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from results_writer import read_results
+
+# Route fields the outreach messages are built from
+MESSAGE_ROUTE_FIELDS = (
+    "recipient_id", "recipient_name", "event_name", "volume_kg",
+    "food_category", "urgency", "distance_km", "legs"
+)
+
+
+def fingerprint(payload) -> str:
+    """Stable short hash of a JSON-serializable value"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def event_fingerprint(event: dict) -> str:
+    """Fingerprint of everything the Prediction Agent sees about an event"""
+    return fingerprint(event)
+
+
+def recipients_fingerprint(recipients: List[dict]) -> str:
+    """Fingerprint of the recipients an event's surplus could be routed to"""
+    return fingerprint(sorted(recipients, key=lambda r: r["recipient_id"]))
+
+
+def rotate_results(path: str) -> Optional[str]:
+    """
+    Move the previous results file aside before a new run overwrites it
+    
+    A file without a summary record is from a run that crashed; it is left
+    to be overwritten rather than rotated over the last complete baseline
+    (it only becomes the baseline when there is no other).
+    
+    Returns:
+        Path of the baseline to compare against (e.g. results.prev.jsonl),
+        or None if there are no previous results
+    """
+    root, ext = os.path.splitext(path)
+    previous = f"{root}.prev{ext}"
+    has_baseline = os.path.exists(previous)
+    
+    if not os.path.exists(path):
+        return previous if has_baseline else None
+    if has_baseline and not list(read_results(path, "summary")):
+        return previous
+    os.replace(path, previous)
+    return previous
+
+
+def load_previous(path: Optional[str]) -> Dict[str, dict]:
+    """
+    Event records from a previous results file that can be compared
+    
+    Returns:
+        Dict of event_id -> record, for records that carry fingerprints
+    """
+    if path is None or not os.path.exists(path):
+        return {}
+    return {
+        record["event_id"]: record
+        for record in read_results(path, "event")
+        if record.get("fingerprints")
+    }
+
+
+class IncrementalPlan:
+    """
+    Decides what can be reused from the previous run's records
+    
+    Args:
+        previous: Dict of event_id -> record from load_previous()
+    """
+    
+    def __init__(self, previous: Dict[str, dict]):
+        self.previous = previous
+        self._lock = threading.Lock()
+        
+        self.carried = 0
+        self.predictions_reused = 0
+        self.messages_reused = 0
+    
+    def _matching(self, event: dict) -> Optional[dict]:
+        """Previous record for the event, if the event itself is unchanged"""
+        record = self.previous.get(event["event_id"])
+        if record is None or record["fingerprints"].get("event") != event_fingerprint(event):
+            return None
+        return record
+    
+    def has_prediction(self, event: dict) -> bool:
+        """Whether the event's previous prediction is still valid"""
+        record = self._matching(event)
+        return record is not None and record["prediction"] is not None
+    
+    def carried_record(self,
+                       event: dict,
+                       relevant_recipients: Callable[[dict], List[dict]]) -> Optional[dict]:
+        """
+        The previous record, if neither the event nor its recipients changed
+        
+        Args:
+            event: Event dictionary
+            relevant_recipients: Given the previous prediction, returns the
+                recipients it could be routed to under the current data
+        """
+        record = self._matching(event)
+        if record is None or record["prediction"] is None:
+            return None
+        relevant = relevant_recipients(record["prediction"])
+        if record["fingerprints"].get("recipients") != recipients_fingerprint(relevant):
+            return None
+        
+        with self._lock:
+            self.carried += 1
+        return record
+    
+    def prediction_for(self, event: dict) -> Optional[dict]:
+        """The previous prediction for an unchanged event, or None"""
+        record = self._matching(event)
+        if record is None or record["prediction"] is None:
+            return None
+        
+        with self._lock:
+            self.predictions_reused += 1
+        return record["prediction"]
+    
+    def messages_for(self, route: dict) -> Optional[List[dict]]:
+        """The previous outreach messages, if the new route matches the old one"""
+        record = self.previous.get(route["event_id"])
+        if record is None or record["route"] is None or record["message"] is None:
+            return None
+        if any(record["route"].get(field) != route.get(field) for field in MESSAGE_ROUTE_FIELDS):
+            return None
+        
+        messages = record.get("messages") or [record["message"]]
+        with self._lock:
+            self.messages_reused += len(messages)
+        return messages
+    
+    def stats(self) -> Dict[str, int]:
+        """What this run reused from the previous one"""
+        with self._lock:
+            return {
+                "previous_events": len(self.previous),
+                "carried_forward": self.carried,
+                "predictions_reused": self.predictions_reused,
+                "messages_reused": self.messages_reused
+            }
@@ -0,0 +1,196 @@
+"""
+Persistent content-addressed cache for Nemotron responses
+
+Responses are stored in a local SQLite file keyed by a hash of the
+request (endpoint, model, messages, temperature, max_tokens), so
+re-running the workflow on unchanged events turns repeat prompts into
+local lookups. The endpoint is part of the key so that replies from a
+mock server are never served to runs against the real API.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import config
+
+
+class ResponseCache:
+    """
+    Disk-backed LLM response cache with TTL and size-based eviction
+    
+    Entries older than ``ttl_seconds`` are treated as misses and purged.
+    When the stored responses exceed ``max_bytes`` the least recently
+    used entries are evicted first.
+    """
+    
+    def __init__(self,
+                 path: str = config.LLM_CACHE_PATH,
+                 max_bytes: int = config.LLM_CACHE_MAX_BYTES,
+                 ttl_seconds: float = config.LLM_CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   key TEXT PRIMARY KEY,
+                   response TEXT NOT NULL,
+                   size_bytes INTEGER NOT NULL,
+                   created_at REAL NOT NULL,
+                   accessed_at REAL NOT NULL
+               )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+        )
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM responses"
+        ).fetchone()[0]
+    
+    @staticmethod
+    def make_key(model: str,
+                 messages: List[Dict[str, str]],
+                 temperature: float,
+                 max_tokens: int,
+                 endpoint: str) -> str:
+        """Stable content hash for a chat completion request to an endpoint"""
+        payload = json.dumps(
+            {
+                "endpoint": endpoint,
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, size_bytes, created_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            response, size_bytes, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size_bytes
+                self.evictions += 1
+                self.misses += 1
+                return None
+            
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return response
+    
+    def put(self, key: str, response: str):
+        """Store a response, evicting old entries if the cache is over budget"""
+        now = time.time()
+        size_bytes = len(response.encode("utf-8"))
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size_bytes FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, response, size_bytes, now, now)
+            )
+            self._total_bytes += size_bytes - (previous[0] if previous else 0)
+            self._evict_locked(now)
+    
+    def evict(self):
+        """Purge expired entries and trim the cache to its size budget"""
+        with self._lock:
+            self._evict_locked(time.time())
+    
+    def _evict_locked(self, now: float):
+        if self.ttl_seconds:
+            expired = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM responses WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            ).fetchone()
+            if expired[0]:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+                self.evictions += expired[0]
+                self._total_bytes -= expired[1]
+        
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            # Walk entries oldest-access first until we are back under budget
+            to_delete = []
+            freed = 0
+            overflow = self._total_bytes - self.max_bytes
+            cursor = self._conn.execute(
+                "SELECT key, size_bytes FROM responses ORDER BY accessed_at ASC"
+            )
+            for key, size_bytes in cursor:
+                to_delete.append((key,))
+                freed += size_bytes
+                if freed >= overflow:
+                    break
+            cursor.close()
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+            self.evictions += len(to_delete)
+            self._total_bytes -= freed
+    
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current cache size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "size_bytes": self._total_bytes
+            }
+
+
+# Global cache instance
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> ResponseCache:
+    """Get or create the global response cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -2,25 +2,386 @@
 LLM Client for NVIDIA Nemotron via NVIDIA API
 """
 import os
+import json
+import time
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Generator, Tuple, Union
 import requests
-from typing import List, Dict, Optional, Generator
 import config
+import llm_cache
+import llm_coalesce
+import llm_metrics
+import llm_resilience
+import llm_transport
+from llm_resilience import LLMUnavailableError
+
+class MeteredStream:
+    """
+    Streamed reply that keeps the timing record of its own call
+    
+    metrics.last() is whichever call finished most recently in the
+    process, which under concurrency may not be this one; ``metrics`` here
+    is set from the generator's return value once the stream is exhausted.
+    
+    Args:
+        chunks: Generator yielding content chunks and returning its record
+    """
+    
+    def __init__(self, chunks: Generator[str, None, Optional[dict]]):
+        self._chunks = chunks
+        self.metrics: Optional[dict] = None
+    
+    def __iter__(self) -> Iterator[str]:
+        return self
+    
+    def __next__(self) -> str:
+        try:
+            return next(self._chunks)
+        except StopIteration as stop:
+            self.metrics = stop.value
+            raise
+
 
 class NemotronClient:
     """Wrapper for Nemotron API calls via NVIDIA API"""
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = config.LLM_MAX_CONCURRENCY):
         self.api_key = config.NVIDIA_API_KEY
         self.model = config.NEMOTRON_MODEL
         self.endpoint = config.NVIDIA_ENDPOINT
+        self.transport = llm_transport.get_transport()
+        self.cache = llm_cache.get_cache() if config.LLM_CACHE_ENABLED else None
+        self.metrics = llm_metrics.get_metrics()
+        
+        # Identical prompts sent concurrently share one HTTP request
+        self.coalescer = llm_coalesce.SingleFlight() if config.LLM_COALESCE_ENABLED else None
+        
+        # Shared across threads: pace requests, retry transient failures,
+        # and fail fast while the endpoint is unhealthy
+        self.rate_limiter = llm_resilience.TokenBucket()
+        self.circuit_breaker = llm_resilience.CircuitBreaker()
+        self.max_retries = config.LLM_MAX_RETRIES
+        self.retries = 0
+        self._retries_lock = threading.Lock()
+        
+        # Async calls run the blocking request on a dedicated worker pool,
+        # gated by one semaphore per event loop
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._semaphores = weakref.WeakKeyDictionary()
         
         if not self.api_key:
             raise ValueError("NVIDIA_API_KEY not found in environment")
     
+    def _headers(self, stream: bool = False) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "accept": "text/event-stream" if stream else "application/json",
+            "content-type": "application/json"
+        }
+    
+    def _payload(self,
+                 messages: List[Dict[str, str]],
+                 temperature: float,
+                 max_tokens: int,
+                 stream: bool = False) -> dict:
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": stream,
+            "frequency_penalty": 0,
+            "presence_penalty": 0,
+            "top_p": 1
+        }
+    
+    def _send(self, payload: dict, timeout: float,
+              stream: bool = False) -> Tuple[requests.Response, int]:
+        """
+        POST a request with rate limiting, retries and circuit breaking
+        
+        429s and 5xx responses, timeouts and connection errors are retried
+        with jittered exponential backoff (never sooner than Retry-After).
+        Other 4xx responses are returned for the caller to raise.
+        
+        Returns:
+            (response, number of retries it took)
+        
+        Raises:
+            CircuitOpenError: The breaker is open; no request was sent
+            LLMUnavailableError: Retries were exhausted
+        """
+        attempt = 0
+        while True:
+            try:
+                self.circuit_breaker.before_call()
+            except LLMUnavailableError as e:
+                e.retries = attempt
+                raise
+            self.rate_limiter.acquire()
+            
+            retry_after = None
+            throttled = False
+            try:
+                response = self.transport.post(
+                    self.endpoint,
+                    headers=self._headers(stream=stream),
+                    json=payload,
+                    timeout=timeout,
+                    stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"{type(e).__name__}: {e}"
+                self.circuit_breaker.record_failure()
+            else:
+                if response.status_code == 429:
+                    throttled = True
+                    retry_after = llm_resilience.parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after:
+                        self.rate_limiter.pause(retry_after)
+                    error = "429 Too Many Requests"
+                    response.close()
+                    if self.circuit_breaker.state != self.circuit_breaker.CLOSED:
+                        # A throttled half-open probe is not a recovery
+                        self.circuit_breaker.record_failure()
+                elif response.status_code >= 500:
+                    error = f"{response.status_code} Server Error"
+                    response.close()
+                    self.circuit_breaker.record_failure()
+                else:
+                    # Any other 4xx still means the endpoint is up
+                    self.circuit_breaker.record_success()
+                    return response, attempt
+            
+            if attempt >= self.max_retries:
+                # Persistent throttling counts against endpoint health too
+                if throttled:
+                    self.circuit_breaker.record_failure()
+                exhausted = LLMUnavailableError(
+                    f"Nemotron request failed after {attempt + 1} attempts: {error}"
+                )
+                exhausted.retries = attempt
+                raise exhausted
+            
+            time.sleep(max(llm_resilience.backoff_delay(attempt), retry_after or 0))
+            attempt += 1
+            with self._retries_lock:
+                self.retries += 1
+    
+    def _complete(self,
+                  messages: List[Dict[str, str]],
+                  temperature: float,
+                  max_tokens: int,
+                  timeout: float,
+                  agent: Optional[str] = None) -> str:
+        """Issue one blocking chat completion request"""
+        start = time.perf_counter()
+        try:
+            response, retries = self._send(self._payload(messages, temperature, max_tokens), timeout)
+        except LLMUnavailableError as e:
+            self._record_failure(start, agent, e, stream=False)
+            raise
+        
+        try:
+            response.raise_for_status()
+            result = response.json()
+        except requests.RequestException as e:
+            self._record_failure(start, agent, e, stream=False,
+                                 status=response.status_code, retries=retries)
+            raise
+        wall = time.perf_counter() - start
+        
+        # Without streaming the first token arrives with the whole body
+        usage = result.get("usage") or {}
+        self.metrics.record(
+            wall_seconds=wall,
+            ttft_seconds=wall,
+            completion_tokens=usage.get("completion_tokens", 0),
+            stream=False,
+            agent=agent,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            status=response.status_code,
+            retries=retries
+        )
+        return result["choices"][0]["message"]["content"].strip()
+    
+    def _record_failure(self,
+                        start: float,
+                        agent: Optional[str],
+                        error: Exception,
+                        stream: bool,
+                        status: Optional[int] = None,
+                        retries: Optional[int] = None):
+        """Account for a call that produced no reply"""
+        wall = time.perf_counter() - start
+        self.metrics.record(
+            wall_seconds=wall,
+            ttft_seconds=wall,
+            completion_tokens=0,
+            stream=stream,
+            agent=agent,
+            status=status,
+            retries=retries if retries is not None else getattr(error, "retries", 0),
+            error=f"{type(error).__name__}: {error}"
+        )
+    
+    def _stream_complete(self,
+                         messages: List[Dict[str, str]],
+                         temperature: float,
+                         max_tokens: int,
+                         timeout: float,
+                         agent: Optional[str] = None) -> Generator[str, None, dict]:
+        """Issue one streaming request, yield content chunks, return its metrics record"""
+        start = time.perf_counter()
+        first_token_at = None
+        chunk_count = 0
+        prompt_tokens = 0
+        completion_tokens = None
+        
+        try:
+            response, retries = self._send(
+                self._payload(messages, temperature, max_tokens, stream=True),
+                timeout,
+                stream=True
+            )
+        except LLMUnavailableError as e:
+            self._record_failure(start, agent, e, stream=True)
+            raise
+        with response:
+            try:
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                self._record_failure(start, agent, e, stream=True,
+                                     status=response.status_code, retries=retries)
+                raise
+            for line in response.iter_lines(decode_unicode=True):
+                # Server-sent events: "data: {...}" lines, blank keep-alives
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                
+                chunk = json.loads(data)
+                usage = chunk.get("usage")
+                if usage:
+                    prompt_tokens = usage.get("prompt_tokens", prompt_tokens)
+                    completion_tokens = usage.get("completion_tokens", completion_tokens)
+                
+                choices = chunk.get("choices") or []
+                content = (choices[0].get("delta") or {}).get("content") if choices else None
+                if not content:
+                    continue
+                
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                chunk_count += 1
+                yield content
+        
+        wall = time.perf_counter() - start
+        return self.metrics.record(
+            wall_seconds=wall,
+            ttft_seconds=(first_token_at - start) if first_token_at else wall,
+            completion_tokens=completion_tokens if completion_tokens is not None else chunk_count,
+            stream=True,
+            agent=agent,
+            prompt_tokens=prompt_tokens,
+            status=response.status_code,
+            retries=retries
+        )
+    
+    def _cached_complete(self,
+                         messages: List[Dict[str, str]],
+                         temperature: float,
+                         max_tokens: int,
+                         timeout: float,
+                         use_cache: bool,
+                         agent: Optional[str] = None) -> str:
+        """
+        Serve from the response cache when possible, else call the API
+        
+        Concurrent misses for the same request are coalesced: one caller
+        sends it (and fills the cache) while the rest wait for its reply.
+        """
+        if not use_cache:
+            return self._complete(messages, temperature, max_tokens, timeout, agent)
+        
+        start = time.perf_counter()
+        key = llm_cache.ResponseCache.make_key(self.model, messages, temperature, max_tokens,
+                                              self.endpoint)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._record_local(start, agent, llm_metrics.SOURCE_CACHE, stream=False)
+                return cached
+        
+        def fetch() -> str:
+            content = self._complete(messages, temperature, max_tokens, timeout, agent)
+            if self.cache is not None:
+                self.cache.put(key, content)
+            return content
+        
+        if self.coalescer is None:
+            return fetch()
+        content, shared = self.coalescer.do(key, fetch)
+        if shared:
+            self._record_local(start, agent, llm_metrics.SOURCE_COALESCED, stream=False)
+        return content
+    
+    def _record_local(self, start: float, agent: Optional[str], source: str, stream: bool) -> dict:
+        """Account for a reply served without a request of our own"""
+        wall = time.perf_counter() - start
+        return self.metrics.record(
+            wall_seconds=wall,
+            ttft_seconds=wall,
+            completion_tokens=0,
+            stream=stream,
+            agent=agent,
+            source=source
+        )
+    
+    def _cached_stream(self,
+                       messages: List[Dict[str, str]],
+                       temperature: float,
+                       max_tokens: int,
+                       timeout: float,
+                       use_cache: bool,
+                       agent: Optional[str] = None) -> Generator[str, None, dict]:
+        """Streaming counterpart of _cached_complete; returns the call's metrics record"""
+        key = None
+        if self.cache is not None and use_cache:
+            start = time.perf_counter()
+            key = self.cache.make_key(self.model, messages, temperature, max_tokens, self.endpoint)
+            cached = self.cache.get(key)
+            if cached is not None:
+                record = self._record_local(start, agent, llm_metrics.SOURCE_CACHE, stream=True)
+                yield cached
+                return record
+        
+        chunks = []
+        stream = MeteredStream(self._stream_complete(messages, temperature, max_tokens, timeout, agent))
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        
+        if key is not None:
+            self.cache.put(key, "".join(chunks).strip())
+        return stream.metrics
+    
     def chat(self, 
              messages: List[Dict[str, str]], 
              temperature: float = 0.7,
-             max_tokens: int = 800) -> str:
+             max_tokens: int = 800,
+             timeout: float = config.LLM_TIMEOUT_SECONDS,
+             use_cache: bool = True,
+             stream: bool = False,
+             agent: Optional[str] = None) -> Union[str, MeteredStream]:
         """
         Simple chat completion call
         
@@ -28,38 +389,26 @@ class NemotronClient:
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature
             max_tokens: Max response length
+            timeout: Request timeout in seconds
+            use_cache: Set False to bypass the response cache and sample fresh
+            stream: Yield content chunks as they arrive instead of one string
+            agent: Name of the calling agent, for per-agent usage accounting
             
         Returns:
-            Response content string
+            Response content string, or a MeteredStream of chunks when streaming
         """
-        response = requests.post(
-            self.endpoint,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "accept": "application/json",
-                "content-type": "application/json"
-            },
-            json={
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                "stream": False,
-                "frequency_penalty": 0,
-                "presence_penalty": 0,
-                "top_p": 1
-            },
-            timeout=30
-        )
-        
-        response.raise_for_status()
-        result = response.json()
-        return result["choices"][0]["message"]["content"].strip()
+        if stream:
+            return MeteredStream(self._cached_stream(messages, temperature, max_tokens, timeout, use_cache, agent))
+        return self._cached_complete(messages, temperature, max_tokens, timeout, use_cache, agent)
     
     def chat_with_system(self,
                         system_prompt: str,
                         user_prompt: str,
-                        temperature: float = 0.7) -> str:
+                        temperature: float = 0.7,
+                        use_cache: bool = True,
+                        stream: bool = False,
+                        max_tokens: int = 800,
+                        agent: Optional[str] = None) -> Union[str, MeteredStream]:
         """
         Convenience method for system + user prompt
         """
@@ -67,7 +416,101 @@ class NemotronClient:
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
-        return self.chat(messages, temperature=temperature)
+        return self.chat(messages, temperature=temperature, max_tokens=max_tokens,
+                         use_cache=use_cache, stream=stream, agent=agent)
+    
+    async def achat(self,
+                    messages: List[Dict[str, str]],
+                    temperature: float = 0.7,
+                    max_tokens: int = 800,
+                    timeout: float = config.LLM_TIMEOUT_SECONDS,
+                    use_cache: bool = True,
+                    agent: Optional[str] = None) -> str:
+        """
+        Async chat completion call
+        
+        At most ``max_concurrency`` requests are in flight per event loop;
+        further callers wait on the semaphore instead of queueing sockets.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Sampling temperature
+            max_tokens: Max response length
+            timeout: Request timeout in seconds
+            use_cache: Set False to bypass the response cache and sample fresh
+            agent: Name of the calling agent, for per-agent usage accounting
+        
+        Returns:
+            Response content string
+        """
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore(loop):
+            return await loop.run_in_executor(
+                self._get_executor(),
+                functools.partial(self._cached_complete, messages, temperature,
+                                  max_tokens, timeout, use_cache, agent)
+            )
+    
+    async def achat_with_system(self,
+                                system_prompt: str,
+                                user_prompt: str,
+                                temperature: float = 0.7,
+                                use_cache: bool = True,
+                                agent: Optional[str] = None) -> str:
+        """
+        Async convenience method for system + user prompt
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        return await self.achat(messages, temperature=temperature, use_cache=use_cache,
+                                agent=agent)
+    
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """Semaphore bounding in-flight requests on the given loop"""
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Worker threads that run blocking requests for the async API"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix="nemotron"
+                    )
+        return self._executor
+    
+    def pool_stats(self) -> Dict[str, float]:
+        """Connection reuse and pool wait counters for the shared transport"""
+        return self.transport.stats.snapshot()
+    
+    def cache_stats(self) -> Dict[str, float]:
+        """Hit/miss counters for the response cache (empty when disabled)"""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def coalesce_stats(self) -> Dict[str, int]:
+        """Requests sent vs. callers that shared an in-flight request"""
+        return self.coalescer.stats() if self.coalescer is not None else {}
+    
+    def resilience_stats(self) -> Dict[str, float]:
+        """Retry, throttling and circuit breaker counters"""
+        stats = llm_resilience.resilience_stats(self.rate_limiter, self.circuit_breaker)
+        stats["retries"] = self.retries
+        return stats
+    
+    def latency_stats(self) -> Dict[str, float]:
+        """Time-to-first-token and tokens/sec across calls made so far"""
+        return self.metrics.summary()
+    
+    def agent_usage(self, since: int = 0) -> Dict[str, dict]:
+        """Per-agent calls, wall time and tokens (from a metrics.mark() on)"""
+        return self.metrics.by_agent(since)
 
 
 # Global client instance
@@ -79,4 +522,3 @@ def get_client() -> NemotronClient:
     if _client is None:
         _client = NemotronClient()
     return _client
-
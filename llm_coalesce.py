@@ -0,0 +1,85 @@
+"""
+Single-flight coalescing for identical in-flight Nemotron requests
+
+When several workers send the same prompt at the same time only the
+first one (the leader) calls the endpoint; the others wait for and share
+its result, or its exception.
+"""
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Call:
+    """One in-flight request that followers can wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Thread-safe de-duplication of concurrent calls by key"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        
+        self.leaders = 0
+        self.coalesced = 0
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` unless a call with the same key is already in flight
+        
+        Args:
+            key: Identity of the request (e.g. the response cache key)
+            fn: Zero-argument callable that performs the request
+        
+        Returns:
+            (result, shared) where shared is True if another caller's
+            request was reused
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+    
+    def in_flight(self) -> int:
+        """Number of distinct requests currently running"""
+        with self._lock:
+            return len(self._calls)
+    
+    def stats(self) -> Dict[str, int]:
+        """Leader/follower counters"""
+        with self._lock:
+            return {
+                "requests": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls)
+            }
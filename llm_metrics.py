@@ -0,0 +1,273 @@
+"""
+Per-call latency and token metrics for Nemotron requests
+
+Every request records wall time, time-to-first-token, generation
+throughput, token usage, HTTP status and retries, tagged with the agent
+that made it. That separates endpoint latency from time spent in our own
+code, and shows which agent dominates run time and API spend.
+
+Raw records are kept in a bounded window; per-agent totals are updated as
+calls are recorded, so a long-running process (e.g. the Streamlit app)
+does not grow without bound and still reports every call.
+"""
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional
+
+import config
+
+UNTAGGED_AGENT = "Untagged"
+
+# Where a call's reply came from
+SOURCE_API = "api"
+SOURCE_CACHE = "cache"
+SOURCE_COALESCED = "coalesced"
+
+
+# Run-scoped totals kept for this many of the most recent mark() calls
+MAX_MARKS = 32
+
+
+class _Totals:
+    """Running per-agent usage over the calls recorded since some point"""
+    
+    def __init__(self, sample_size: int):
+        self.agents: Dict[str, dict] = {}
+        
+        # Calls that reached the API and produced a reply
+        self.served = {
+            "calls": 0,
+            "streamed_calls": 0,
+            "wall_seconds": 0.0,
+            "ttft_seconds": 0.0,
+            "max_ttft_seconds": 0.0,
+            "tokens_per_second": 0.0,
+            "completion_tokens": 0
+        }
+        self.ttft_sample = deque(maxlen=sample_size)
+    
+    def add(self, record: dict):
+        totals = self.agents.setdefault(record["agent"], {
+            "calls": 0,
+            "api_calls": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "failed": 0,
+            "retries": 0,
+            "wall_seconds": 0.0,
+            "max_wall_seconds": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0
+        })
+        totals["calls"] += 1
+        totals["retries"] += record["retries"]
+        totals["wall_seconds"] += record["wall_seconds"]
+        totals["max_wall_seconds"] = max(totals["max_wall_seconds"], record["wall_seconds"])
+        if record["error"] is not None:
+            totals["failed"] += 1
+        elif record["source"] == SOURCE_CACHE:
+            totals["cache_hits"] += 1
+        elif record["source"] == SOURCE_COALESCED:
+            totals["coalesced"] += 1
+        else:
+            totals["api_calls"] += 1
+            totals["prompt_tokens"] += record["prompt_tokens"]
+            totals["completion_tokens"] += record["completion_tokens"]
+            
+            served = self.served
+            served["calls"] += 1
+            served["streamed_calls"] += 1 if record["stream"] else 0
+            served["wall_seconds"] += record["wall_seconds"]
+            served["ttft_seconds"] += record["ttft_seconds"]
+            served["max_ttft_seconds"] = max(served["max_ttft_seconds"], record["ttft_seconds"])
+            served["tokens_per_second"] += record["tokens_per_second"]
+            served["completion_tokens"] += record["completion_tokens"]
+            self.ttft_sample.append(record["ttft_seconds"])
+    
+    def summary(self) -> Dict[str, float]:
+        served = self.served
+        calls = served["calls"]
+        if not calls:
+            return {"calls": 0}
+        
+        # p95 over the most recent sample_size calls
+        ttfts = sorted(self.ttft_sample)
+        return {
+            "calls": calls,
+            "streamed_calls": served["streamed_calls"],
+            "total_wall_seconds": round(served["wall_seconds"], 3),
+            "avg_ttft_seconds": round(served["ttft_seconds"] / calls, 4),
+            "p95_ttft_seconds": ttfts[min(len(ttfts) - 1, int(len(ttfts) * 0.95))],
+            "max_ttft_seconds": served["max_ttft_seconds"],
+            "avg_tokens_per_second": round(served["tokens_per_second"] / calls, 2),
+            "completion_tokens": served["completion_tokens"]
+        }
+    
+    def by_agent(self) -> Dict[str, dict]:
+        usage = {agent: dict(totals) for agent, totals in self.agents.items()}
+        total_wall = sum(t["wall_seconds"] for t in usage.values())
+        for totals in usage.values():
+            totals["avg_wall_seconds"] = round(totals["wall_seconds"] / totals["calls"], 4)
+            totals["share_of_wall"] = round(totals["wall_seconds"] / total_wall, 3) if total_wall else 0.0
+            totals["wall_seconds"] = round(totals["wall_seconds"], 3)
+            totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"]
+        
+        return dict(sorted(usage.items(), key=lambda item: item[1]["wall_seconds"], reverse=True))
+
+
+class LLMMetrics:
+    """
+    Thread-safe collector of per-call LLM timing records
+    
+    Records are numbered from 0 in the order they arrive; mark() returns
+    the next number, and ``since`` arguments count in the same numbering
+    even after older records have dropped out of the window.
+    
+    Args:
+        max_records: Raw records kept (the oldest are dropped)
+        sample_size: Most recent TTFTs kept for the p95
+    """
+    
+    def __init__(self,
+                 max_records: int = config.LLM_METRICS_MAX_RECORDS,
+                 sample_size: int = config.LLM_METRICS_SAMPLE_SIZE):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=max_records)
+        self._count = 0  # Records ever stored; the next record's number
+        self._sample_size = sample_size
+        self._totals = _Totals(sample_size)
+        self._marks: Dict[int, _Totals] = {}  # mark() position -> totals since then
+    
+    def __len__(self) -> int:
+        """Records stored so far, including those dropped from the window"""
+        with self._lock:
+            return self._count
+    
+    def record(self,
+               wall_seconds: float,
+               ttft_seconds: float,
+               completion_tokens: int,
+               stream: bool,
+               agent: Optional[str] = None,
+               prompt_tokens: int = 0,
+               status: Optional[int] = None,
+               retries: int = 0,
+               source: str = SOURCE_API,
+               error: Optional[str] = None) -> dict:
+        """
+        Store one call's timings
+        
+        Args:
+            wall_seconds: Time from request start to last byte
+            ttft_seconds: Time from request start to first content token
+            completion_tokens: Generated tokens (from usage, or chunk count when streaming)
+            stream: Whether the call was streamed
+            agent: Name of the calling agent
+            prompt_tokens: Prompt tokens from the response usage field
+            status: Final HTTP status (None if no response was received)
+            retries: Retries spent on the request
+            source: SOURCE_API, or SOURCE_CACHE / SOURCE_COALESCED when no
+                request of our own was sent
+            error: Failure description when the call did not produce a reply
+        
+        Returns:
+            The stored record
+        """
+        generation_seconds = wall_seconds - ttft_seconds if stream else wall_seconds
+        tokens_per_second = (completion_tokens / generation_seconds
+                             if generation_seconds > 0 else 0.0)
+        
+        record = {
+            "agent": agent or UNTAGGED_AGENT,
+            "source": source,
+            "stream": stream,
+            "status": status,
+            "retries": retries,
+            "wall_seconds": round(wall_seconds, 4),
+            "ttft_seconds": round(ttft_seconds, 4),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "tokens_per_second": round(tokens_per_second, 2),
+            "error": error
+        }
+        with self._lock:
+            self._records.append(record)
+            self._count += 1
+            self._totals.add(record)
+            for totals in self._marks.values():
+                totals.add(record)
+        return record
+    
+    def records(self, since: int = 0) -> List[dict]:
+        """
+        Copy of the records still in the window, from number ``since`` on
+        
+        Records older than the window (LLM_METRICS_MAX_RECORDS) are gone;
+        summary() and by_agent() still count them.
+        """
+        with self._lock:
+            return self._window(since)
+    
+    def _window(self, since: int) -> List[dict]:
+        first = self._count - len(self._records)
+        return list(islice(self._records, max(since - first, 0), None))
+    
+    def mark(self) -> int:
+        """Position to pass as ``since`` to scope stats to a single run"""
+        with self._lock:
+            if self._count not in self._marks:
+                self._marks[self._count] = _Totals(self._sample_size)
+                while len(self._marks) > MAX_MARKS:
+                    del self._marks[min(self._marks)]
+            return self._count
+    
+    def last(self) -> Optional[dict]:
+        """Most recent record, if any"""
+        with self._lock:
+            return self._records[-1] if self._records else None
+    
+    def _totals_since(self, since: int) -> _Totals:
+        """Totals from record ``since`` on (rebuilt from the window if it is not a mark)"""
+        if since <= 0:
+            return self._totals
+        if since in self._marks:
+            return self._marks[since]
+        
+        totals = _Totals(self._sample_size)
+        for record in self._window(since):
+            totals.add(record)
+        return totals
+    
+    def summary(self, since: int = 0) -> Dict[str, float]:
+        """Aggregate latency and throughput across calls that reached the API"""
+        with self._lock:
+            return self._totals_since(since).summary()
+    
+    def by_agent(self, since: int = 0) -> Dict[str, dict]:
+        """
+        Per-agent call counts, time and token spend
+        
+        Args:
+            since: Only count records from this mark() onwards
+        
+        Returns:
+            Dict of agent name -> usage totals, busiest agent first
+        """
+        with self._lock:
+            return self._totals_since(since).by_agent()
+    
+    def reset(self):
+        """Drop all records and totals (record numbering carries on)"""
+        with self._lock:
+            self._records.clear()
+            self._totals = _Totals(self._sample_size)
+            self._marks.clear()
+
+
+# Global metrics instance
+_metrics = LLMMetrics()
+
+def get_metrics() -> LLMMetrics:
+    """Get the global LLM metrics collector"""
+    return _metrics
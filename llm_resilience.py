@@ -0,0 +1,169 @@
+"""
+Rate limiting, retry and circuit breaking for Nemotron calls
+
+Keeps one 429 or 5xx from killing a whole run: requests are paced by a
+token bucket (which also honours Retry-After), transient failures are
+retried with jittered exponential backoff, and a circuit breaker fails
+fast once the endpoint is clearly unhealthy so agents can drop to their
+template/heuristic paths instead of waiting on timeouts.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import config
+
+
+class LLMUnavailableError(Exception):
+    """Nemotron could not produce a reply (retries exhausted or circuit open)"""
+    
+    retries = 0  # Retries spent before giving up
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling the endpoint while the circuit breaker is open"""
+
+
+class TokenBucket:
+    """
+    Client-side token bucket rate limiter
+    
+    Args:
+        rate_per_second: Sustained request rate
+        burst: Max requests allowed back-to-back after an idle period
+    """
+    
+    def __init__(self,
+                 rate_per_second: float = config.LLM_RATE_LIMIT_PER_SECOND,
+                 burst: int = config.LLM_RATE_LIMIT_BURST):
+        self.rate = rate_per_second
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    elapsed = now - self._updated_at
+                    self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                    self._updated_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        if waited:
+                            self.throttled += 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                
+                self.throttled_seconds += wait
+            waited = True
+            time.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Hold all callers for `seconds` (used for server Retry-After)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    Open -> half-open after `reset_seconds`, letting one probe through;
+    the probe's outcome closes or re-opens the circuit.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self,
+                 failure_threshold: int = config.LLM_BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = config.LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        
+        self.times_opened = 0
+        self.rejected = 0
+    
+    def before_call(self):
+        """Raise CircuitOpenError if the call should not be attempted"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            
+            self.rejected += 1
+            raise CircuitOpenError("Nemotron circuit breaker is open; skipping call")
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+def backoff_delay(attempt: int,
+                  base_seconds: float = config.LLM_BACKOFF_BASE_SECONDS,
+                  max_seconds: float = config.LLM_BACKOFF_MAX_SECONDS) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    return random.uniform(0, min(max_seconds, base_seconds * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def resilience_stats(limiter: TokenBucket, breaker: CircuitBreaker) -> Dict[str, float]:
+    """Snapshot of limiter and breaker counters"""
+    return {
+        "throttled_requests": limiter.throttled,
+        "throttled_seconds": round(limiter.throttled_seconds, 3),
+        "circuit_state": breaker.state,
+        "circuit_opened": breaker.times_opened,
+        "circuit_rejected": breaker.rejected
+    }
@@ -0,0 +1,150 @@
+"""
+Pooled HTTP transport shared by every Nemotron call
+
+All LLM traffic goes through one keep-alive connection pool so repeated
+calls skip the TCP+TLS handshake. Each thread gets its own
+``requests.Session`` (sessions are not thread-safe), but every session
+mounts the same adapter, so the underlying connections are shared.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import config
+
+
+class PoolStats:
+    """Thread-safe counters for connection reuse and pool waits"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.reused_connections = 0
+            self.new_connections = 0
+            self.pool_waits = 0
+            self.pool_wait_seconds = 0.0
+
+    def record_checkout(self, reused: bool, waited: bool, wait_seconds: float):
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.reused_connections += 1
+            else:
+                self.new_connections += 1
+            if waited:
+                self.pool_waits += 1
+                self.pool_wait_seconds += wait_seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return a copy of the counters"""
+        with self._lock:
+            reuse_rate = self.reused_connections / self.requests if self.requests else 0.0
+            return {
+                "requests": self.requests,
+                "reused_connections": self.reused_connections,
+                "new_connections": self.new_connections,
+                "reuse_rate": round(reuse_rate, 3),
+                "pool_waits": self.pool_waits,
+                "pool_wait_seconds": round(self.pool_wait_seconds, 3),
+            }
+
+
+class _CountingPoolMixin:
+    """Records whether each checked-out connection was reused or had to wait"""
+
+    stats: PoolStats = None
+
+    def _get_conn(self, timeout: Optional[float] = None):
+        # An empty queue means every connection is checked out; with
+        # block=True the caller waits for one to come back
+        waited = bool(self.block and self.pool is not None and self.pool.empty())
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout=timeout)
+        wait_seconds = time.perf_counter() - start if waited else 0.0
+
+        reused = getattr(conn, "sock", None) is not None
+        if self.stats is not None:
+            self.stats.record_checkout(reused, waited, wait_seconds)
+        return conn
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report into a PoolStats"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+        stats = self.stats
+        http_pool = type("CountingHTTPConnectionPool",
+                         (_CountingPoolMixin, HTTPConnectionPool), {"stats": stats})
+        https_pool = type("CountingHTTPSConnectionPool",
+                          (_CountingPoolMixin, HTTPSConnectionPool), {"stats": stats})
+        self.poolmanager.pool_classes_by_scheme = {"http": http_pool, "https": https_pool}
+
+
+class HTTPTransport:
+    """
+    Shared keep-alive transport with per-thread sessions
+
+    Args:
+        pool_size: Max connections kept open per host
+        pool_block: Wait for a free connection instead of opening extras
+    """
+
+    def __init__(self,
+                 pool_size: int = config.LLM_POOL_SIZE,
+                 pool_block: bool = config.LLM_POOL_BLOCK):
+        self.pool_size = pool_size
+        self.stats = PoolStats()
+        self._adapter = PooledAdapter(
+            self.stats,
+            pool_connections=config.LLM_POOL_HOSTS,
+            pool_maxsize=pool_size,
+            pool_block=pool_block,
+        )
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """Session bound to the calling thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            self._local.session = session
+        return session
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST through the calling thread's pooled session"""
+        return self.session.post(url, **kwargs)
+
+    def close(self):
+        """Drop all pooled connections"""
+        self._adapter.close()
+
+
+# Global transport instance
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> HTTPTransport:
+    """Get or create the global pooled transport"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HTTPTransport()
+    return _transport
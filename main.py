@@ -2,11 +2,17 @@
 FeastGuard.AI - Main Runner
 Multi-agent food redistribution system powered by NVIDIA Nemotron
 """
+import argparse
 import json
 import sys
 from pathlib import Path
+import config
 from orchestrator import FeastGuardOrchestrator
 from agents import OutreachAgent
+from results_writer import JSONLResultsWriter, read_results
+from agent_log import configure_log_sink
+from incremental import load_previous, rotate_results
+from screening import interesting_event_ids, screen_events
 
 
 def load_json(filepath: str) -> list:
@@ -37,6 +43,84 @@ def select_top_events(events: list, num: int = 5) -> list:
     return sorted_events[:num]
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Run the FeastGuard.AI multi-agent workflow")
+    parser.add_argument(
+        "--batch-predictions",
+        action="store_true",
+        help="Pack several events into each Prediction Agent Nemotron call"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Events per batched prediction call (default: config.PREDICTION_BATCH_SIZE)"
+    )
+    parser.add_argument(
+        "--no-prescreen",
+        action="store_true",
+        help="Send every event through Nemotron reasoning, even ones the surplus score rules out"
+    )
+    parser.add_argument(
+        "--greedy-routing",
+        action="store_true",
+        help="Route each event to its own cheapest recipient instead of planning all events together"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.WORKFLOW_MAX_WORKERS,
+        help="Events processed in parallel (default: config.WORKFLOW_MAX_WORKERS)"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=FeastGuardOrchestrator.MODES,
+        default="graph",
+        help="graph: parallel per-event subgraphs; pipeline: agent stages joined by bounded queues"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip events already completed by an interrupted run over the same events"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only reprocess events (or recipients) changed since the previous --output file; "
+             "unchanged results are carried forward"
+    )
+    parser.add_argument(
+        "--output",
+        default="results.jsonl",
+        help="JSONL results file, appended one record per event as the run goes (default: results.jsonl)"
+    )
+    parser.add_argument(
+        "--log-file",
+        default=None,
+        help="Also write every agent log record as a JSON line to this file"
+    )
+    parser.add_argument(
+        "--log-level",
+        default=config.LOG_LEVEL,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Minimum agent log level (default: config.LOG_LEVEL)"
+    )
+    parser.add_argument(
+        "--screen",
+        action="store_true",
+        help="Pick the events for the agents by numeric screening (largest routable surplus) "
+             "instead of the demo heuristic"
+    )
+    parser.add_argument(
+        "--num-events",
+        type=int,
+        default=5,
+        help="Number of top events to process (default: 5)"
+    )
+    return parser.parse_args()
+
+
 def print_header():
     """Print application header"""
     print("""
@@ -51,24 +135,17 @@ def print_header():
     """)
 
 
-def print_agent_logs(logs: list):
-    """Pretty print agent logs"""
-    print("\n📋 AGENT ACTIVITY LOG:")
-    print("─" * 60)
-    for log in logs:
-        print(log)
-
-
-def print_detailed_results(state: dict):
-    """Print detailed results"""
+def print_detailed_results(results_file: str):
+    """Print detailed results, streaming them back from the JSONL output"""
     print("\n\n" + "="*60)
     print("📊 DETAILED RESULTS")
     print("="*60)
     
     # Predictions
     print("\n🔍 PREDICTIONS:")
-    for pred in state["predictions"]:
-        if pred["has_surplus"]:
+    for record in read_results(results_file, "event"):
+        pred = record["prediction"]
+        if pred and pred["has_surplus"]:
             print(f"\n  Event: {pred['event_name']}")
             print(f"  └─ Surplus: {pred['predicted_kg']}kg ({pred['category']})")
             print(f"  └─ Urgency: {pred['urgency']} (confidence: {pred['confidence']:.0%})")
@@ -76,11 +153,14 @@ def print_detailed_results(state: dict):
     
     # Routes
     print("\n\n🚚 ROUTES:")
-    for route in state["routes"]:
-        if route.get("recipient_id"):
+    for record in read_results(results_file, "event"):
+        route = record["route"]
+        if route and route.get("recipient_id"):
             print(f"\n  {route['event_name']} → {route['recipient_name']}")
             print(f"  └─ Distance: {route['distance_km']:.1f}km")
             print(f"  └─ Volume: {route['volume_kg']}kg {route['food_category']}")
+            for leg in route.get("legs") or []:
+                print(f"  └─ Leg: {leg['recipient_name']}, {leg['volume_kg']}kg, {leg['distance_km']:.1f}km")
             print(f"  └─ Reasoning: {route['reasoning'][:120]}...")
             if route['alternatives']:
                 print(f"  └─ Alternatives: {', '.join([a['name'] for a in route['alternatives']])}")
@@ -88,12 +168,14 @@ def print_detailed_results(state: dict):
     # Messages
     print("\n\n📧 OUTREACH MESSAGES:")
     outreach_agent = OutreachAgent()
-    for msg in state["messages"]:
-        print(outreach_agent.format_message_for_display(msg))
+    for record in read_results(results_file, "event"):
+        for message in record.get("messages") or ([record["message"]] if record["message"] else []):
+            print(outreach_agent.format_message_for_display(message))
 
 
 def main():
     """Main execution"""
+    args = parse_args()
     print_header()
     
     # Check for data files
@@ -112,55 +194,94 @@ def main():
     
     print(f"   Loaded {len(all_events)} events, {len(recipients)} recipients")
     
-    # Select top 5 events for demo
-    events = select_top_events(all_events, num=5)
-    print(f"   Selected top 5 events for processing\n")
+    # Select top events for demo
+    if args.screen:
+        # LLM-free pass over every event; only the most promising reach the agents
+        screened = screen_events(all_events, recipients)
+        by_id = {event["event_id"]: event for event in all_events}
+        events = [by_id[event_id] for event_id in interesting_event_ids(screened, args.num_events)]
+        print(f"   Screened {len(screened)} events numerically, "
+              f"{int(screened['recipient_id'].notna().sum())} with routable surplus")
+    else:
+        events = select_top_events(all_events, num=args.num_events)
+    print(f"   Selected top {len(events)} events for processing\n")
+    
+    # Agent logs stream to the console (and optionally a JSONL file) as
+    # they happen instead of being collected in memory
+    log_sink = configure_log_sink(path=args.log_file, level=args.log_level)
+    log_sink.attach_console()
+    
+    # Incremental mode compares against the previous results, kept aside
+    # as e.g. results.prev.jsonl before this run overwrites them
+    previous = None
+    if args.incremental:
+        previous_file = rotate_results(args.output)
+        previous = load_previous(previous_file)
+        print(f"♻️  Incremental run against {previous_file or 'no previous results'} "
+              f"({len(previous)} events)\n")
+    
+    # Results are written as each event finishes, so they survive a crash
+    writer = JSONLResultsWriter(args.output)
     
     # Initialize orchestrator
     print("🤖 Initializing multi-agent system...")
-    orchestrator = FeastGuardOrchestrator()
+    orchestrator = FeastGuardOrchestrator(
+        batch_predictions=args.batch_predictions,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        mode=args.mode,
+        result_sink=writer.write_event,
+        prescreen=not args.no_prescreen,
+        batch_routing=not args.greedy_routing
+    )
     print("   ✅ Prediction Agent ready")
     print("   ✅ Routing Agent ready")
     print("   ✅ Outreach Agent ready")
     
     # Run workflow
     print("\n🚀 Starting workflow...\n")
+    print("📋 AGENT ACTIVITY LOG:")
+    print("─" * 60)
     
     try:
-        final_state = orchestrator.run(events, recipients)
+        final_state = orchestrator.run(events, recipients, resume=args.resume, previous=previous)
+        counts = final_state["result_counts"]
         
-        # Print logs
-        print_agent_logs(final_state["agent_logs"])
+        # Close out the results file with the run summary
+        writer.write_summary({
+            "counts": counts,
+            "llm_usage": final_state.get("llm_usage", {}),
+            "reasoning_cache": orchestrator.prediction_agent.reasoning_cache_stats(),
+            "pipeline_stats": orchestrator.pipeline_stats,
+            "prescreened": orchestrator.prescreened,
+            "batch_routing": orchestrator.batch_router.stats() if orchestrator.batch_router else None,
+            "capacity_ledger": orchestrator.ledger.stats() if orchestrator.ledger else None,
+            "incremental": orchestrator.incremental.stats() if orchestrator.incremental else None,
+            "log_counts": final_state["log_counts"]
+        })
+        writer.close()
         
         # Print detailed results
-        print_detailed_results(final_state)
+        print_detailed_results(args.output)
         
         # Success message
         print("\n\n" + "="*60)
         print("✅ WORKFLOW COMPLETED SUCCESSFULLY")
         print("="*60)
-        print(f"\nProcessed {len(final_state['predictions'])} events")
-        print(f"Generated {len(final_state['routes'])} routes")
-        print(f"Created {len(final_state['messages'])} outreach messages")
-        
-        total_rescued = sum(r['volume_kg'] for r in final_state['routes'] if r.get('recipient_id'))
-        print(f"\n🎯 Total Food Rescued: {total_rescued:.0f}kg")
-        
-        # Export results
-        output_file = "results.json"
-        with open(output_file, 'w') as f:
-            json.dump({
-                "predictions": final_state["predictions"],
-                "routes": final_state["routes"],
-                "messages": final_state["messages"],
-                "logs": final_state["agent_logs"]
-            }, f, indent=2)
+        print(f"\nProcessed {counts.get('events', 0)} events")
+        print(f"Generated {counts.get('routes', 0)} routes")
+        print(f"Created {counts.get('messages', 0)} outreach messages")
         
-        print(f"📄 Results saved to: {output_file}")
+        print(f"\n🎯 Total Food Rescued: {counts.get('kg_rescued', 0):.0f}kg")
+        print(f"📄 Results saved to: {args.output}")
+        if args.log_file:
+            print(f"📝 Agent log saved to: {args.log_file}")
         
     except Exception as e:
+        writer.close()
         print(f"\n❌ Error during workflow execution:")
         print(f"   {str(e)}")
+        print(f"   Events finished so far are in {args.output}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
@@ -0,0 +1,395 @@
+"""
+Local Nemotron stand-in server for offline load testing
+
+Speaks the same /v1/chat/completions contract as config.NVIDIA_ENDPOINT
+(plain JSON and SSE streaming) and returns deterministic, templated
+completions, with configurable latency, error rates and 429 bursts.
+
+Usage:
+    python mock_nemotron_server.py --port 8000 --latency lognormal --latency-ms 400
+    export NVIDIA_ENDPOINT=http://127.0.0.1:8000/v1/chat/completions
+    export NVIDIA_API_KEY=local-standin
+    python main.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+class StandInBehaviour:
+    """
+    Latency, error and throttling knobs shared by all request handlers
+    
+    Args:
+        latency: Distribution name: fixed, uniform, normal or lognormal
+        latency_ms: Mean (median for lognormal) response latency
+        jitter_ms: Spread: half-width for uniform, stddev for normal,
+            sigma * latency_ms for lognormal
+        error_rate: Fraction of requests answered with a 500
+        burst_every: Start a 429 burst every N requests (0 disables)
+        burst_length: Requests per burst answered with 429
+        retry_after: Retry-After seconds sent with 429s
+        token_delay_ms: Delay between streamed chunks
+        seed: Seed for latency/error sampling
+    """
+    
+    LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+    
+    def __init__(self,
+                 latency: str = "fixed",
+                 latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0,
+                 error_rate: float = 0.0,
+                 burst_every: int = 0,
+                 burst_length: int = 0,
+                 retry_after: float = 1.0,
+                 token_delay_ms: float = 0.0,
+                 seed: int = 0):
+        if latency not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.retry_after = retry_after
+        self.token_delay_ms = token_delay_ms
+        
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "streamed": 0}
+    
+    def next_request(self) -> Dict[str, float]:
+        """Decide status and latency for the next request"""
+        with self._lock:
+            index = self.counts["requests"]
+            self.counts["requests"] += 1
+            
+            if self.burst_every and index % self.burst_every < self.burst_length:
+                status = 429
+            elif self._random.random() < self.error_rate:
+                status = 500
+            else:
+                status = 200
+            
+            key = {429: "throttled", 500: "errors", 200: "ok"}[status]
+            self.counts[key] += 1
+            return {"status": status, "latency_s": self._sample_latency() / 1000.0}
+    
+    def _sample_latency(self) -> float:
+        if self.latency == "fixed" or self.latency_ms <= 0:
+            return max(self.latency_ms, 0.0)
+        if self.latency == "uniform":
+            return max(0.0, self._random.uniform(self.latency_ms - self.jitter_ms,
+                                                 self.latency_ms + self.jitter_ms))
+        if self.latency == "normal":
+            return max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms))
+        sigma = self.jitter_ms / self.latency_ms if self.latency_ms else 0.0
+        return self._random.lognormvariate(math.log(self.latency_ms), sigma)
+    
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+def _field(text: str, label: str, default: str = "") -> str:
+    """Pull a '- Label: value' / 'Label: value' field out of a prompt"""
+    match = re.search(rf"{re.escape(label)}:\s*(.+)", text)
+    return match.group(1).strip() if match else default
+
+
+def _pick(options: List[str], digest: bytes, offset: int = 0) -> str:
+    return options[digest[offset] % len(options)]
+
+
+def generate_completion(messages: List[Dict[str, str]]) -> str:
+    """
+    Deterministic reply for a chat request
+    
+    The same messages always yield the same text; the template is chosen
+    from the prompt so each FeastGuard agent gets a plausible answer.
+    """
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    user = " ".join(m.get("content", "") for m in messages if m.get("role") != "system")
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).digest()
+    
+    event_ids = re.findall(r"event_id:\s*(\S+)", user)
+    if event_ids and "JSON array" in user:
+        # Batched prediction request
+        names = re.findall(r"Event:\s*(.+)", user)
+        return json.dumps([
+            {
+                "event_id": event_id,
+                "reasoning": (
+                    f"{names[i] if i < len(names) else event_id} shows "
+                    f"{_pick(['moderate', 'strong', 'limited'], digest, i % 32)} surplus potential "
+                    "given its catering style and headcount; plan redistribution accordingly."
+                )
+            }
+            for i, event_id in enumerate(event_ids)
+        ], indent=2)
+    
+    if "prediction specialist" in system:
+        event = _field(user, "Event", "this event")
+        catering = _field(user, "Catering Type", "mixed")
+        attendees = _field(user, "Attendees", "many")
+        tone = _pick(["likely", "quite likely", "possible"], digest)
+        return (
+            f"With {attendees} attendees and {catering} catering, surplus at {event} is {tone}. "
+            "Prepared dishes suggest a perishable share that should be redistributed promptly."
+        )
+    
+    if "logistics optimization" in system:
+        recipient = _field(user, "Recipient", "the selected recipient")
+        distance = _field(user, "Distance", "a short distance")
+        return (
+            f"{recipient} is the best match at {distance}, balancing travel time against "
+            "capacity utilisation for this surplus."
+        )
+    
+    if "communication specialist" in system:
+        urgency = _field(user, "Urgency", "medium")
+        return f"A concise, {urgency}-urgency tone with a clear pickup call-to-action."
+    
+    if "outreach message" in user:
+        recipient = _field(user, "Recipient", "Partner")
+        event = _field(user, "Event", "our event")
+        volume = _field(user, "Food Volume", "some")
+        return (
+            f"Hello {recipient}, we have about {volume} of surplus food from {event} ready for "
+            "pickup. Could your team confirm a collection window today? Thank you for helping "
+            "us keep good food out of the landfill."
+        )
+    
+    if "data extraction specialist" in system:
+        zipcode_match = re.search(r"zipcode\s+(\w+)", user)
+        zipcode = zipcode_match.group(1) if zipcode_match else "00000"
+        if "food bank" in user or "pantr" in user:
+            return json.dumps([
+                {"name": f"Community Pantry {i + 1}", "location": f"{100 + i} Main St",
+                 "type": "pantry", "estimated_capacity_kg": 150 + 50 * i}
+                for i in range(3)
+            ])
+        return json.dumps([
+            {"name": f"Local Gathering {i + 1}", "location": f"{zipcode} Convention Center",
+             "date": "2025-11-0{}".format(i + 1), "estimated_attendees": 200 + 100 * i}
+            for i in range(3)
+        ])
+    
+    return "Acknowledged. " + _pick(["Proceeding as planned.", "No issues found.", "Looks good."], digest)
+
+
+def _usage(messages: List[Dict[str, str]], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(len(m.get("content", "").split()) for m in messages)
+    completion_tokens = len(content.split())
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Handler for POST /v1/chat/completions and GET /stats"""
+    
+    protocol_version = "HTTP/1.1"
+    behaviour: StandInBehaviour = None
+    quiet = True
+    
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.behaviour.snapshot())
+        else:
+            self._send_json(404, {"error": "not found"})
+    
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": "not found"})
+            return
+        
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+        
+        decision = self.behaviour.next_request()
+        time.sleep(decision["latency_s"])
+        
+        if decision["status"] == 429:
+            self._send_json(429, {"error": "rate limited"},
+                            headers={"Retry-After": str(self.behaviour.retry_after)})
+            return
+        if decision["status"] == 500:
+            self._send_json(500, {"error": "simulated server error"})
+            return
+        
+        messages = body.get("messages", [])
+        content = generate_completion(messages)
+        completion_id = "chatcmpl-" + hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+        model = body.get("model", "stand-in")
+        
+        if body.get("stream"):
+            self._stream(completion_id, model, messages, content)
+            return
+        
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": _usage(messages, content)
+        })
+    
+    def _stream(self, completion_id: str, model: str, messages: List[dict], content: str):
+        with self.behaviour._lock:
+            self.behaviour.counts["streamed"] += 1
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        def write_event(payload: str):
+            data = f"data: {payload}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+        
+        for token in re.findall(r"\S+\s*", content):
+            if self.behaviour.token_delay_ms:
+                time.sleep(self.behaviour.token_delay_ms / 1000.0)
+            write_event(json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }))
+        
+        write_event(json.dumps({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "usage": _usage(messages, content)
+        }))
+        write_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+    
+    def _send_json(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host: str = "127.0.0.1",
+                port: int = 8000,
+                behaviour: Optional[StandInBehaviour] = None,
+                quiet: bool = True) -> ThreadingHTTPServer:
+    """Build (but don't start) a stand-in server; port 0 picks a free port"""
+    handler = type("BoundStandInHandler", (StandInHandler,), {
+        "behaviour": behaviour or StandInBehaviour(),
+        "quiet": quiet
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(port: int = 0, **behaviour_kwargs) -> ThreadingHTTPServer:
+    """
+    Start a stand-in server on a daemon thread (for benchmarks and scripts)
+    
+    Returns:
+        The running server; its endpoint is
+        f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    """
+    server = make_server(port=port, behaviour=StandInBehaviour(**behaviour_kwargs))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local Nemotron stand-in for offline load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", choices=StandInBehaviour.LATENCY_DISTRIBUTIONS, default="fixed",
+                        help="Latency distribution")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Mean latency (median for lognormal)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="Latency spread (uniform half-width / normal stddev / lognormal sigma*mean)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--burst-every", type=int, default=0,
+                        help="Start a 429 burst every N requests (0 disables)")
+    parser.add_argument("--burst-length", type=int, default=0,
+                        help="Consecutive 429 responses per burst")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                        help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--token-delay-ms", type=float, default=0.0,
+                        help="Delay between streamed chunks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    behaviour = StandInBehaviour(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        retry_after=args.retry_after,
+        token_delay_ms=args.token_delay_ms,
+        seed=args.seed
+    )
+    server = make_server(args.host, args.port, behaviour, quiet=not args.verbose)
+    endpoint = f"http://{args.host}:{server.server_address[1]}/v1/chat/completions"
+    
+    print("🧪 Nemotron stand-in server running")
+    print(f"   Endpoint: {endpoint}")
+    print(f"   Latency: {args.latency} ~{args.latency_ms:.0f}ms, errors: {args.error_rate:.0%}, "
+          f"429 bursts: {args.burst_length}/{args.burst_every or '-'}")
+    print("\n   export NVIDIA_ENDPOINT=" + endpoint)
+    print("   export NVIDIA_API_KEY=local-standin\n")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n📊 Requests served: {behaviour.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
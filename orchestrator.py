@@ -1,9 +1,22 @@
 """
 LangGraph Orchestrator - Multi-agent workflow coordinator
 """
-from typing import Dict, Literal
-from langgraph.graph import StateGraph, END
-from state import AgentState, create_initial_state
+import logging
+from typing import Callable, Dict, List, Literal, Optional, Union
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+import config
+import llm_metrics
+from agent_log import LazyText, get_log_sink, get_logger
+from batch_routing import BatchRouter
+from capacity_ledger import CapacityLedger
+from checkpoint import CheckpointStore
+from distance_store import get_distance_store
+from incremental import IncrementalPlan, event_fingerprint, recipients_fingerprint
+from pipeline import Pipeline
+from results_writer import event_record, record_output
+from state import (AgentState, EventState, add_counts, count_results,
+                   create_initial_state, create_event_state)
 from agents import PredictionAgent, RoutingAgent, OutreachAgent
 
 
@@ -11,39 +24,117 @@ class FeastGuardOrchestrator:
     """
     Orchestrates multi-agent workflow for food redistribution
     
-    Workflow:
+    Workflow (map-reduce):
     1. Load data
-    2. For each event:
+    2. Fan out: every event runs through its own subgraph in parallel
        - Prediction Agent analyzes surplus
        - If surplus exists:
          - Routing Agent finds best recipient
          - Outreach Agent generates message
-    3. Summarize results
+    3. Reduce: merge per-event results and summarize
+    
+    In "pipeline" mode the same agent nodes run as stages connected by
+    bounded queues instead, so one event can be predicted while another
+    is routed and a third gets its outreach message.
     """
     
-    def __init__(self):
+    MODES = ("graph", "pipeline")
+    
+    # Per-event results merged into AgentState (and checkpointed)
+    EVENT_RESULT_KEYS = ("predictions", "routes", "messages", "processed_events")
+    
+    def __init__(self, batch_predictions: bool = False, batch_size: Optional[int] = None,
+                 workers: int = config.WORKFLOW_MAX_WORKERS, mode: str = "graph",
+                 result_sink: Optional[Callable[[dict], None]] = None,
+                 prescreen: bool = config.PRESCREEN_ENABLED,
+                 batch_routing: bool = config.BATCH_ROUTING_ENABLED):
+        """
+        Args:
+            batch_predictions: Reason about several events per Nemotron call
+            batch_size: Events per batched call (defaults to config.PREDICTION_BATCH_SIZE)
+            workers: Event subgraphs allowed to run at the same time (graph mode)
+            mode: "graph" (parallel per-event subgraphs) or "pipeline"
+                (stages connected by bounded queues)
+            result_sink: Called with each event's record as soon as the event
+                finishes (may be called from worker threads). When set, per-event
+                results go only to the sink and the final state keeps just the
+                summary counters, so memory stays flat on large runs.
+            prescreen: Score every event up front and predict the no-surplus
+                ones with template reasoning, outside the graph and without
+                Nemotron calls
+            batch_routing: Plan every event's recipient together as a min-cost
+                flow before the graph runs; events the plan cannot place are
+                routed greedily one at a time
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown orchestrator mode: {mode}")
+        
         self.prediction_agent = PredictionAgent()
         self.routing_agent = RoutingAgent()
         self.outreach_agent = OutreachAgent()
         
+        self.batch_predictions = batch_predictions
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.mode = mode
+        self.pipeline_stats: Dict[str, dict] = {}
+        self.result_sink = result_sink
+        self.prescreen = prescreen
+        self.prescreened = 0
+        self.batch_router = BatchRouter() if batch_routing else None
+        self.ledger: Optional[CapacityLedger] = None
+        self._batched_predictions: Dict[str, dict] = {}
+        self._recipients: List[dict] = []
+        self.incremental: Optional[IncrementalPlan] = None
+        self._llm_mark = 0
+        self._log_mark: Dict[str, int] = {}
+        
+        # Logs go to the shared sink; graph state only carries counters
+        self.logger = get_logger("orchestrator")
+        
+        # Finished events are checkpointed so an interrupted run can resume
+        self.checkpoints = CheckpointStore() if config.CHECKPOINT_ENABLED else None
+        self._run_id: Optional[str] = None
+        
         # Build LangGraph workflow
         self.workflow = self._build_workflow()
     
     def _build_workflow(self) -> StateGraph:
         """
         Construct LangGraph state machine
+        
+        Events are fanned out with Send to parallel copies of the per-event
+        subgraph; their results are merged by the AgentState reducers
+        before the summary runs.
         """
         workflow = StateGraph(AgentState)
         
         # Add nodes
+        self.event_workflow = self._build_event_workflow()
+        workflow.add_node("process_event", self.process_event_node)
+        workflow.add_node("summary", self.summary_node)
+        
+        # Map: one subgraph run per event
+        workflow.add_conditional_edges(START, self.fan_out_events, ["process_event", "summary"])
+        
+        # Reduce: summary runs once every event has finished
+        workflow.add_edge("process_event", "summary")
+        workflow.add_edge("summary", END)
+        
+        return workflow.compile()
+    
+    def _build_event_workflow(self) -> StateGraph:
+        """
+        Construct the per-event subgraph: prediction -> routing -> outreach
+        """
+        workflow = StateGraph(EventState)
+        
         workflow.add_node("prediction", self.prediction_node)
         workflow.add_node("routing", self.routing_node)
         workflow.add_node("outreach", self.outreach_node)
-        workflow.add_node("skip", self.skip_node)  # New node for no-surplus events
-        workflow.add_node("summary", self.summary_node)
+        workflow.add_node("skip", self.skip_node)  # No-surplus events
         
-        # Define edges
-        workflow.set_entry_point("prediction")
+        workflow.add_edge(START, "prediction")
         
         # After prediction: check if we should route
         workflow.add_conditional_edges(
@@ -51,237 +142,569 @@ class FeastGuardOrchestrator:
             self.should_route,
             {
                 "route": "routing",
-                "skip": "skip",  # Go to skip node to increment counter
-                "done": "summary"
-            }
-        )
-        
-        # After skip: loop back to next event or finish
-        workflow.add_conditional_edges(
-            "skip",
-            self.should_continue,
-            {
-                "continue": "prediction",
-                "done": "summary"
+                "skip": "skip"
             }
         )
         
         # After routing: always do outreach
         workflow.add_edge("routing", "outreach")
-        
-        # After outreach: loop back to next event or finish
-        workflow.add_conditional_edges(
-            "outreach",
-            self.should_continue,
-            {
-                "continue": "prediction",
-                "done": "summary"
-            }
-        )
-        
-        # Summary is final
-        workflow.add_edge("summary", END)
+        workflow.add_edge("outreach", END)
+        workflow.add_edge("skip", END)
         
         return workflow.compile()
     
-    def prediction_node(self, state: AgentState) -> Dict:
+    def fan_out_events(self, state: AgentState) -> Union[List[Send], str]:
         """
-        Run Prediction Agent on current event
+        Send every event to its own subgraph run
+        """
+        events = state["events"]
+        done = set(state["processed_events"])  # Restored from a checkpoint
+        sends = [
+            Send("process_event", create_event_state(event, idx, len(events), state["recipients"]))
+            for idx, event in enumerate(events)
+            if event["event_id"] not in done
+        ]
+        return sends or "summary"
+    
+    def process_event_node(self, state: EventState) -> Dict:
         """
-        current_idx = state["current_event_idx"]
+        Run one event through the per-event subgraph
         
-        # Check if we're done
-        if current_idx >= len(state["events"]):
-            return {"workflow_status": "completed"}
+        Only the accumulated results are handed back; the event's inputs
+        stay private to its subgraph run.
+        """
+        try:
+            result = self.event_workflow.invoke(state)
+        except BaseException:
+            # A route made before the failure will not be delivered
+            self.routing_agent.drop_route(state["event"]["event_id"])
+            raise
+        output = {key: result[key] for key in self.EVENT_RESULT_KEYS}
+        self._checkpoint(state["event"], output)
+        return self._emit(state["event"], output)
+    
+    def _checkpoint(self, event: dict, output: Dict):
+        """Persist a finished event's results for --resume"""
+        if self.checkpoints is not None and self._run_id is not None:
+            self.checkpoints.save_event(self._run_id, event["event_id"], output)
+    
+    def _emit(self, event: dict, output: Dict, record: Optional[dict] = None) -> Dict:
+        """
+        Hand a finished event's results to the sink (if any)
         
-        event = state["events"][current_idx]
+        Args:
+            event: Event dictionary
+            output: The event's accumulated predictions/routes/messages
+            record: Previous run's record for an event carried forward
+                unchanged (written as-is, keeping its original timestamp)
         
-        # Log start
-        log_start = f"\n{'='*60}\n🔍 Processing Event {current_idx + 1}/{len(state['events'])}: {event['name']}\n{'='*60}"
+        Returns:
+            The AgentState update for the event: its counters, plus the full
+            results only when there is no sink to stream them to
+        """
+        update = {
+            "result_counts": count_results(output["predictions"], output["routes"], output["messages"]),
+            "processed_events": output["processed_events"]
+        }
+        if self.result_sink is None:
+            update.update(output)
+        else:
+            self.result_sink(record or event_record(event, output, self._fingerprints(event, output)))
+        return update
+    
+    def _fingerprints(self, event: dict, output: Dict) -> Dict[str, str]:
+        """Input fingerprints stored with each record for incremental re-runs"""
+        prediction = output["predictions"][0] if output["predictions"] else None
+        relevant = self.routing_agent.eligible_recipients(prediction, self._recipients) if prediction else []
+        return {
+            "event": event_fingerprint(event),
+            "recipients": recipients_fingerprint(relevant)
+        }
+    
+    def _log(self, state: Optional[EventState], agent, msg: str, *args,
+             level: int = logging.INFO, **fields):
+        """
+        Log through the shared sink with structured agent/event fields
         
-        # Run prediction
-        prediction = self.prediction_agent.analyze(event)
+        ``msg`` is %-formatted with ``args`` only if a handler renders it.
+        """
+        self.logger.log(level, msg, *args, extra={
+            "agent": agent.agent_name if agent is not None else None,
+            "event_id": state["event"]["event_id"] if state is not None else None,
+            "fields": fields
+        })
+    
+    def prediction_node(self, state: EventState) -> Dict:
+        """
+        Run Prediction Agent on this subgraph's event
+        """
+        event = state["event"]
         
-        # Format log
-        log_result = self.prediction_agent.format_log(prediction)
+        # Log start
+        self._log(state, None, "\n%s\n🔍 Processing Event %d/%d: %s\n%s",
+                  "=" * 60, state["event_idx"] + 1, state["total_events"], event["name"], "=" * 60)
+        
+        # Run prediction (reuse the batched result when one was computed up
+        # front, or the previous run's when the event is unchanged)
+        prediction = self._batched_predictions.get(event["event_id"])
+        if prediction is None and self.incremental is not None:
+            prediction = self.incremental.prediction_for(event)
+            if prediction is not None:
+                self._log(state, self.prediction_agent, "♻️  Event unchanged - reusing previous prediction")
+        if prediction is None:
+            prediction = self.prediction_agent.analyze(event)
+        
+        self._log(state, self.prediction_agent, "%s",
+                  LazyText(self.prediction_agent.format_log, prediction),
+                  has_surplus=prediction["has_surplus"], predicted_kg=prediction["predicted_kg"],
+                  category=prediction["category"], urgency=prediction["urgency"])
         
         return {
+            "current_prediction": prediction,
             "predictions": [prediction],
-            "agent_logs": [log_start, log_result],
             "processed_events": [event["event_id"]]
         }
     
     def routing_node(self, state: AgentState) -> Dict:
         """
-        Run Routing Agent on latest prediction
+        Run Routing Agent on this event's prediction
         """
-        current_idx = state["current_event_idx"]
-        event = state["events"][current_idx]
-        prediction = state["predictions"][-1]  # Latest prediction
-        
         # Run routing
         route = self.routing_agent.find_route(
-            prediction=prediction,
-            event=event,
+            prediction=state["current_prediction"],
+            event=state["event"],
             recipients=state["recipients"]
         )
         
         if route is None:
             # No surplus to route
-            return {
-                "agent_logs": [self.routing_agent.log("⚪ No routing needed (no surplus)")]
-            }
+            self._log(state, self.routing_agent, "%s",
+                      LazyText(self.routing_agent.log, "⚪ No routing needed (no surplus)"))
+            return {"current_route": None}
         
-        # Format log
-        log_result = self.routing_agent.format_log(route)
+        self._log(state, self.routing_agent, "%s", LazyText(self.routing_agent.format_log, route),
+                  level=logging.INFO if route["recipient_id"] is not None else logging.WARNING,
+                  recipient_id=route["recipient_id"], distance_km=route.get("distance_km"),
+                  volume_kg=route["volume_kg"])
         
         return {
-            "routes": [route],
-            "agent_logs": [log_result]
+            "current_route": route,
+            "routes": [route]
         }
     
     def skip_node(self, state: AgentState) -> Dict:
         """
-        Handle events with no surplus - increment counter and continue
+        Handle events with no surplus
         """
-        current_idx = state["current_event_idx"]
-        new_idx = current_idx + 1
-        
-        log_msg = f"⚪ No surplus detected - moving to next event"
-        
-        return {
-            "agent_logs": [log_msg],
-            "current_event_idx": new_idx
-        }
+        self.routing_agent.drop_route(state["event"]["event_id"])
+        self._log(state, None, "⚪ No surplus detected - nothing to route")
+        return {"current_route": None}
     
     def outreach_node(self, state: AgentState) -> Dict:
         """
-        Run Outreach Agent on latest route
+        Run Outreach Agent on this event's route
         """
-        current_idx = state["current_event_idx"]
-        new_idx = current_idx + 1
-        
-        # Get latest route
-        if not state["routes"]:
-            return {
-                "agent_logs": [self.outreach_agent.log("⚪ No message needed")],
-                "current_event_idx": new_idx  # ALWAYS increment!
-            }
-        
-        route = state["routes"][-1]
-        
-        # Generate message
-        message = self.outreach_agent.generate_message(route)
-        
-        if message is None:
-            return {
-                "agent_logs": [self.outreach_agent.log("⚪ No recipient matched")],
-                "current_event_idx": new_idx  # ALWAYS increment!
-            }
-        
-        # Format log
-        log_result = self.outreach_agent.format_log(message)
+        route = state["current_route"]
+        if route is None:
+            self._log(state, self.outreach_agent, "%s",
+                      LazyText(self.outreach_agent.log, "⚪ No message needed"))
+            return {"messages": []}
+        
+        # Generate messages, one per recipient (unless the previous run's
+        # route, and so its messages, came out the same)
+        messages = None
+        if self.incremental is not None:
+            messages = self.incremental.messages_for(route)
+            if messages is not None:
+                self._log(state, self.outreach_agent, "♻️  Route unchanged - reusing previous message")
+        if messages is None:
+            messages = self.outreach_agent.generate_messages(route)
+        
+        if not messages:
+            self._log(state, self.outreach_agent, "%s",
+                      LazyText(self.outreach_agent.log, "⚪ No recipient matched"))
+            return {"messages": []}
+        
+        for message in messages:
+            self._log(state, self.outreach_agent, "%s", LazyText(self.outreach_agent.format_log, message),
+                      recipient_id=message["recipient_id"], urgency=message["urgency_level"])
         
-        # Increment counter for next event
         return {
-            "messages": [message],
-            "agent_logs": [log_result],
-            "current_event_idx": new_idx
+            "messages": messages
         }
     
     def summary_node(self, state: AgentState) -> Dict:
         """
         Generate final summary
         """
-        predictions = state["predictions"]
-        routes = state["routes"]
-        messages = state["messages"]
+        # LLM spend for this run only, busiest agent first
+        llm_usage = llm_metrics.get_metrics().by_agent(since=self._llm_mark)
+        self._log(None, None, "%s", LazyText(self.format_summary, state["result_counts"], llm_usage))
         
-        # Calculate metrics
-        total_events = len(predictions)
-        events_with_surplus = sum(1 for p in predictions if p["has_surplus"])
-        successful_routes = sum(1 for r in routes if r.get("recipient_id") is not None)
-        total_kg_rescued = sum(r["volume_kg"] for r in routes if r.get("recipient_id") is not None)
+        return {
+            "llm_usage": llm_usage,
+            "log_counts": self._log_counts(),
+            "workflow_status": "completed"
+        }
+    
+    def format_summary(self, counts: Dict[str, float], llm_usage: Dict[str, dict]) -> str:
+        """
+        Format the run summary banner
+        
+        Metrics were counted per event, so results need not be kept in state.
+        """
+        usage_lines = "\n".join(
+            f"  - {agent}: {u['calls']} calls ({u['api_calls']} API, {u['cache_hits']} cached, "
+            f"{u['coalesced']} coalesced, {u['failed']} failed), {u['wall_seconds']:.1f}s "
+            f"({u['share_of_wall']:.0%}), {u['prompt_tokens']}+{u['completion_tokens']} tokens, "
+            f"{u['retries']} retries"
+            for agent, u in llm_usage.items()
+        ) or "  - No Nemotron calls"
+        
+        reuse = self.prediction_agent.reasoning_cache_stats()
+        reuse_line = (
+            f"Reasoning Reused Across Similar Events: {reuse['hits']}/{reuse['hits'] + reuse['misses']} "
+            f"({reuse['hit_rate']:.0%}, {reuse['buckets']} buckets)"
+            if reuse else "Reasoning Reuse: disabled"
+        )
         
-        perishable_count = sum(1 for r in routes if r.get("food_category") == "perishable" and r.get("recipient_id"))
-        non_perishable_count = sum(1 for r in routes if r.get("food_category") == "non_perishable" and r.get("recipient_id"))
+        prescreen_line = (
+            f"\nPre-screened Without Nemotron: {self.prescreened} no-surplus events"
+            if self.prescreen else ""
+        )
         
-        # Format summary
-        summary_log = f"""
+        batch_line = ""
+        if self.batch_router is not None:
+            planned = self.batch_router.stats()
+            batch_line = (
+                f"\nBatch Routing: {planned.get('events', 0) - planned.get('unplaced', 0)} events planned "
+                f"together (total cost {planned.get('total_cost', 0)}), {planned.get('unplaced', 0)} routed greedily"
+            )
+        
+        ledger_line = ""
+        if self.ledger is not None:
+            held = self.ledger.stats()
+            ledger_line = (
+                f"\nCapacity Reserved: {held['reserved_kg']:.0f}kg across {held['held']} deliveries "
+                f"({held['conflicts']} reservations refused, {held['releases']} released)"
+            )
+        
+        incremental_line = ""
+        if self.incremental is not None:
+            reused = self.incremental.stats()
+            incremental_line = (
+                f"\nIncremental: {reused['carried_forward']} events carried forward, "
+                f"{reused['predictions_reused']} predictions and {reused['messages_reused']} messages reused"
+            )
+        
+        return f"""
 {'='*60}
 📊 WORKFLOW SUMMARY
 {'='*60}
-Events Processed: {total_events}
-Events with Surplus: {events_with_surplus}
-Successful Routes: {successful_routes}
-Total Food Rescued: {total_kg_rescued:.0f}kg
+Events Processed: {counts.get("events", 0)}
+Events with Surplus: {counts.get("events_with_surplus", 0)}
+Successful Routes: {counts.get("successful_routes", 0)}
+Total Food Rescued: {counts.get("kg_rescued", 0):.0f}kg
 
 Food Categories:
-  - Perishable: {perishable_count} routes
-  - Non-perishable: {non_perishable_count} routes
+  - Perishable: {counts.get("perishable_routes", 0)} routes
+  - Non-perishable: {counts.get("non_perishable_routes", 0)} routes
 
-Messages Generated: {len(messages)}
+Messages Generated: {counts.get("messages", 0)}
+
+Nemotron Usage by Agent:
+{usage_lines}
+{reuse_line}{prescreen_line}{batch_line}{ledger_line}{incremental_line}
 {'='*60}
 """
-        
+    
+    def _log_counts(self) -> Dict[str, int]:
+        """Records logged during this run, by level"""
+        counts = get_log_sink().counts()
         return {
-            "agent_logs": [summary_log],
-            "workflow_status": "completed"
+            level: total - self._log_mark.get(level, 0)
+            for level, total in counts.items()
+            if total - self._log_mark.get(level, 0)
         }
     
-    def should_route(self, state: AgentState) -> Literal["route", "skip", "done"]:
+    def should_route(self, state: EventState) -> Literal["route", "skip"]:
         """
-        Decide if we should route or skip
+        Decide if this event's surplus should be routed
         """
-        current_idx = state["current_event_idx"]
-        num_events = len(state["events"])
-        
-        # Check if done processing
-        if current_idx >= num_events:
-            return "done"
-        
-        # Check if latest prediction has surplus
-        if state["predictions"]:
-            latest = state["predictions"][-1]
-            if latest["has_surplus"]:
-                return "route"
-        
-        # No surplus, increment and continue
+        if state["current_prediction"]["has_surplus"]:
+            return "route"
         return "skip"
     
-    def should_continue(self, state: AgentState) -> Literal["continue", "done"]:
-        """
-        Decide if we should process more events
-        """
-        current_idx = state["current_event_idx"]
-        num_events = len(state["events"])
-        
-        if current_idx >= num_events:
-            return "done"
-        
-        return "continue"
-    
-    def run(self, events: list, recipients: list) -> AgentState:
+    def run(self, events: list, recipients: list, resume: bool = False,
+            previous: Optional[Dict[str, dict]] = None) -> AgentState:
         """
         Run the complete workflow
         
         Args:
             events: List of event dictionaries
             recipients: List of recipient dictionaries
+            resume: Skip events completed by an earlier, interrupted run
+                over the same events and recipients
+            previous: Incremental mode: the previous run's records by
+                event_id (see incremental.load_previous); only what changed
+                since then is re-predicted, re-routed or re-messaged
             
         Returns:
             Final state with all results
         """
+        # Scope the per-agent LLM usage summary to this run
+        self._llm_mark = llm_metrics.get_metrics().mark()
+        self._log_mark = get_log_sink().counts()
+        
         # Create initial state
         initial_state = create_initial_state(events, recipients)
-        
-        # Execute workflow with increased recursion limit
-        # Each event can take 3-4 nodes (prediction, routing, outreach, skip)
-        # So 5 events * 4 = 20 nodes minimum, set to 100 for safety
-        final_state = self.workflow.invoke(
+        self._recipients = recipients
+        self.incremental = IncrementalPlan(previous) if previous is not None else None
+        
+        # Routes reserve recipient capacity as they are made, so parallel
+        # events cannot promise the same free space twice
+        self.ledger = CapacityLedger(recipients) if config.CAPACITY_LEDGER_ENABLED else None
+        self.routing_agent.use_ledger(self.ledger)
+        
+        # Event-recipient distances come from the memory-mapped store
+        if config.DISTANCE_STORE_ENABLED:
+            store = get_distance_store()
+            self.routing_agent.use_distances(store.event_matrix(events, recipients))
+            self._log(None, None, "📐 Distances: %d x %d from %s", len(events), len(recipients),
+                      store.directory, **store.stats())
+        
+        restored = {}
+        if self.checkpoints is not None:
+            self._run_id = CheckpointStore.run_id_for(events, recipients)
+            restored = self.checkpoints.start_run(self._run_id, resume=resume)
+        elif resume:
+            raise ValueError("Cannot resume: checkpoints are disabled (config.CHECKPOINT_ENABLED)")
+        
+        if restored:
+            self._log(None, None, "♻️  Resumed %d/%d events from checkpoint %s",
+                      len(restored), len(events), self._run_id, run_id=self._run_id)
+            for event in events:
+                if event["event_id"] in restored:
+                    self._hold_routes(restored[event["event_id"]])
+                    self._apply(initial_state, self._emit(event, restored[event["event_id"]]))
+        
+        # Incremental mode: unchanged events keep their previous results
+        carried = self._carry_forward(initial_state, [e for e in events if e["event_id"] not in restored])
+        
+        # Pre-screen: events the surplus score rules out skip the graph
+        prescreened = self._prescreen(
             initial_state,
-            config={"recursion_limit": 100}
+            [e for e in events if e["event_id"] not in restored and e["event_id"] not in carried]
         )
         
+        # Batch routing: recipients for every remaining event, planned together
+        self._plan_routes([
+            event for event in events
+            if event["event_id"] not in restored and event["event_id"] not in carried
+            and event["event_id"] not in prescreened
+        ], self.ledger.loaded(recipients) if self.ledger is not None else recipients)
+        
+        # Batch mode: one Nemotron call per batch_size events instead of per event
+        self._batched_predictions = {}
+        pending = [
+            event for event in events
+            if event["event_id"] not in restored and event["event_id"] not in carried
+            and event["event_id"] not in prescreened
+            and not (self.incremental is not None and self.incremental.has_prediction(event))
+        ]
+        if self.batch_predictions and pending:
+            predictions = self.prediction_agent.analyze_batch(pending, batch_size=self.batch_size)
+            self._batched_predictions = {p["event_id"]: p for p in predictions}
+        
+        if self.mode == "pipeline":
+            final_state = self._run_pipelined(initial_state)
+        else:
+            # Events run in parallel subgraphs, so the step count no longer
+            # grows with the number of events; workers caps concurrent events
+            final_state = self.workflow.invoke(
+                initial_state,
+                config={"max_concurrency": self.workers}
+            )
+        
+        if (restored or carried or prescreened) and self.result_sink is None:
+            self._order_by_events(final_state)
+        
+        # Every event finished and the summary is built: nothing to resume
+        if self.checkpoints is not None:
+            self.checkpoints.finish_run(self._run_id)
         return final_state
-
+    
+    def _carry_forward(self, state: AgentState, events: List[dict]) -> set:
+        """
+        Emit previous records for events whose inputs have not changed
+        
+        Returns:
+            Ids of the events carried forward
+        """
+        if self.incremental is None:
+            return set()
+        
+        carried = set()
+        for event in events:
+            record = self.incremental.carried_record(
+                event,
+                lambda prediction: self.routing_agent.eligible_recipients(prediction, self._recipients)
+            )
+            if record is not None:
+                output = record_output(record)
+                self._hold_routes(output)
+                self._apply(state, self._emit(event, output, record=record))
+                carried.add(event["event_id"])
+        
+        self._log(None, None, "♻️  Incremental run: %d/%d events unchanged, carried forward",
+                  len(carried), len(events), **self.incremental.stats())
+        return carried
+    
+    def _prescreen(self, state: AgentState, events: List[dict]) -> set:
+        """
+        Predict the events with no surplus without Nemotron or the graph
+        
+        Returns:
+            Ids of the events handled here
+        """
+        self.prescreened = 0
+        if not self.prescreen or not events:
+            return set()
+        
+        _, predictions = self.prediction_agent.prescreen(events)
+        by_id = {event["event_id"]: event for event in events}
+        for prediction in predictions:
+            event = by_id[prediction["event_id"]]
+            output = {
+                "predictions": [prediction],
+                "routes": [],
+                "messages": [],
+                "processed_events": [event["event_id"]]
+            }
+            self._log({"event": event}, self.prediction_agent, "%s",
+                      LazyText(self.prediction_agent.format_log, prediction), level=logging.DEBUG,
+                      has_surplus=False, surplus_score=prediction["surplus_score"], prescreened=True)
+            self._checkpoint(event, output)
+            self._apply(state, self._emit(event, output))
+        
+        self.prescreened = len(predictions)
+        self._log(None, None, "🔎 Pre-screen: %d/%d events have no surplus - skipping Nemotron for them",
+                  len(predictions), len(events))
+        return {prediction["event_id"] for prediction in predictions}
+    
+    def _hold_routes(self, output: Dict):
+        """Count routes made before this run (restored or carried) against capacity"""
+        if self.ledger is None:
+            return
+        for route in output["routes"]:
+            if route.get("recipient_id") is not None:
+                legs = route.get("legs") or [route]
+                self.ledger.reserve_many(
+                    route["event_id"],
+                    [({"recipient_id": leg["recipient_id"]}, leg["volume_kg"]) for leg in legs],
+                    force=True
+                )
+    
+    def _plan_routes(self, events: List[dict], recipients: List[dict]):
+        """
+        Hand the Routing Agent a global min-cost assignment for these events
+        
+        Each planned volume is held at its recipient straight away, so events
+        routed greedily in the meantime cannot take capacity the plan gave to
+        another event; an event keeps its hold if it is routed as planned.
+        """
+        if self.batch_router is None:
+            self.routing_agent.use_assignments(None)
+            return
+        
+        assignments = self.batch_router.plan(events, recipients)
+        if self.ledger is not None:
+            by_id = {recipient["recipient_id"]: recipient for recipient in recipients}
+            volumes = self.batch_router.volumes()
+            for event_id, recipient_id in assignments.items():
+                if recipient_id is not None and not self.ledger.reserve(event_id, by_id[recipient_id],
+                                                                        volumes[event_id]):
+                    assignments[event_id] = None
+        self.routing_agent.use_assignments(assignments)
+        
+        stats = self.batch_router.stats()
+        unplaced = sum(1 for recipient_id in assignments.values() if recipient_id is None)
+        self._log(None, None, "🧮 Batch routing: %d/%d events with surplus planned in %.2fs, %d left to greedy routing",
+                  len(assignments) - unplaced, len(assignments), stats["seconds"], unplaced, **stats)
+    
+    def _order_by_events(self, state: AgentState):
+        """Put restored and newly processed results back in event order"""
+        position = {event["event_id"]: idx for idx, event in enumerate(state["events"])}
+        for key in ("predictions", "routes", "messages"):
+            state[key] = sorted(state[key], key=lambda item: position.get(item["event_id"], 0))
+    
+    def _run_pipelined(self, state: AgentState) -> AgentState:
+        """
+        Run prediction, routing and outreach as queue-connected stages
+        
+        The stages call the same nodes as the graph workflow, so results
+        are identical; only the scheduling differs.
+        """
+        def predict(event_state: EventState) -> EventState:
+            return self._apply(event_state, self.prediction_node(event_state))
+        
+        def route(event_state: EventState) -> EventState:
+            if self.should_route(event_state) == "route":
+                return self._apply(event_state, self.routing_node(event_state))
+            return self._apply(event_state, self.skip_node(event_state))
+        
+        def outreach(event_state: EventState) -> tuple:
+            if self.should_route(event_state) == "route":
+                try:
+                    self._apply(event_state, self.outreach_node(event_state))
+                except BaseException:
+                    self.routing_agent.drop_route(event_state["event"]["event_id"])
+                    raise
+            output = {key: event_state[key] for key in self.EVENT_RESULT_KEYS}
+            self._checkpoint(event_state["event"], output)
+            return event_state["event_idx"], self._emit(event_state["event"], output)
+        
+        pipeline = Pipeline(
+            [("prediction", predict), ("routing", route), ("outreach", outreach)],
+            queue_size=config.PIPELINE_QUEUE_SIZE,
+            workers=config.PIPELINE_STAGE_WORKERS
+        )
+        events = state["events"]
+        done = set(state["processed_events"])  # Restored from a checkpoint
+        finished = pipeline.run(
+            create_event_state(event, idx, len(events), state["recipients"])
+            for idx, event in enumerate(events)
+            if event["event_id"] not in done
+        )
+        self.pipeline_stats = pipeline.stage_stats()
+        
+        # Reduce in input order, as the graph reducers would
+        for _, update in sorted(finished, key=lambda item: item[0]):
+            self._apply(state, update)
+        
+        self._log(None, None, "%s", LazyText(self.format_pipeline_stats, pipeline.elapsed),
+                  pipeline_stats=self.pipeline_stats)
+        return self._apply(state, self.summary_node(state))
+    
+    @staticmethod
+    def _apply(state: dict, update: Dict) -> dict:
+        """Merge a node's update into state (accumulating, like the graph reducers)"""
+        for key, value in update.items():
+            if isinstance(value, list) and isinstance(state.get(key), list):
+                state[key] = state[key] + value
+            elif key == "result_counts":
+                state[key] = add_counts(state.get(key), value)
+            else:
+                state[key] = value
+        return state
+    
+    def format_pipeline_stats(self, elapsed: float) -> str:
+        """Format per-stage queue depth and utilisation for logging"""
+        lines = [f"⚙️  Pipeline stages ({elapsed:.1f}s wall):"]
+        for name, stats in self.pipeline_stats.items():
+            lines.append(
+                f"  - {name}: {stats['processed']} events, {stats['utilisation']:.0%} busy "
+                f"x{stats['workers']}, queue depth avg {stats['avg_queue_depth']:.1f} / "
+                f"max {stats['max_queue_depth']}, blocked {stats['blocked_seconds']:.1f}s"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,162 @@
+"""
+Pipelined stage execution with bounded queues
+
+Each stage runs on its own worker thread(s) and hands items to the next
+stage through a bounded queue, so item n+1 can be in the first stage
+while item n is in the second. Throughput approaches that of the slowest
+stage rather than the sum of all stages; the bounded queues keep a fast
+stage from racing ahead of a slow one.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import config
+
+_DONE = object()  # End-of-input marker passed down the pipeline
+
+
+class StageStats:
+    """Per-stage counters: items, busy time and queue depth"""
+    
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0  # Waiting for room in the next queue
+        self.max_queue_depth = 0
+        self._depth_samples = 0
+        self._depth_total = 0
+        self._lock = threading.Lock()
+    
+    def sample_depth(self, depth: int):
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self._depth_samples += 1
+            self._depth_total += depth
+    
+    def add_item(self, busy: float, blocked: float):
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += busy
+            self.blocked_seconds += blocked
+    
+    def snapshot(self, elapsed: float) -> Dict[str, float]:
+        with self._lock:
+            capacity = elapsed * self.workers
+            return {
+                "workers": self.workers,
+                "processed": self.processed,
+                "busy_seconds": round(self.busy_seconds, 3),
+                "blocked_seconds": round(self.blocked_seconds, 3),
+                "utilisation": round(self.busy_seconds / capacity, 3) if capacity else 0.0,
+                "avg_queue_depth": round(self._depth_total / self._depth_samples, 2)
+                                   if self._depth_samples else 0.0,
+                "max_queue_depth": self.max_queue_depth
+            }
+
+
+class Pipeline:
+    """
+    Linear chain of stages connected by bounded queues
+    
+    Args:
+        stages: (name, fn) pairs; each fn takes the previous stage's output
+        queue_size: Max items waiting in front of each stage
+        workers: Worker threads per stage name (default 1)
+    """
+    
+    def __init__(self,
+                 stages: List[Tuple[str, Callable[[Any], Any]]],
+                 queue_size: int = config.PIPELINE_QUEUE_SIZE,
+                 workers: Optional[Dict[str, int]] = None):
+        workers = workers or {}
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.stats = [StageStats(name, max(1, workers.get(name, 1))) for name, _ in stages]
+        self.elapsed = 0.0
+    
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """
+        Push items through every stage
+        
+        Returns:
+            Final-stage outputs in completion order
+        
+        Raises:
+            The first exception raised by any stage, once the pipeline drains
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = []
+        results_lock = threading.Lock()
+        errors = []
+        remaining = [stats.workers for stats in self.stats]
+        remaining_lock = threading.Lock()
+        
+        def worker(idx: int):
+            _, fn = self.stages[idx]
+            stats = self.stats[idx]
+            inbox = queues[idx]
+            outbox = queues[idx + 1] if idx + 1 < len(queues) else None
+            
+            while True:
+                stats.sample_depth(inbox.qsize())
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                
+                # After a failure, keep draining so upstream never blocks
+                if errors:
+                    continue
+                
+                started = time.perf_counter()
+                try:
+                    output = fn(item)
+                except BaseException as e:
+                    errors.append(e)
+                    continue
+                busy = time.perf_counter() - started
+                
+                if outbox is None:
+                    with results_lock:
+                        results.append(output)
+                    stats.add_item(busy, 0.0)
+                else:
+                    put_at = time.perf_counter()
+                    outbox.put(output)
+                    stats.add_item(busy, time.perf_counter() - put_at)
+            
+            # The last worker out tells every worker of the next stage to stop
+            with remaining_lock:
+                remaining[idx] -= 1
+                last = remaining[idx] == 0
+            if last and outbox is not None:
+                for _ in range(self.stats[idx + 1].workers):
+                    outbox.put(_DONE)
+        
+        threads = [
+            threading.Thread(target=worker, args=(idx,), name=f"pipeline-{name}-{n}", daemon=True)
+            for idx, (name, _) in enumerate(self.stages)
+            for n in range(self.stats[idx].workers)
+        ]
+        
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stats[0].workers):
+            queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+        
+        if errors:
+            raise errors[0]
+        return results
+    
+    def stage_stats(self) -> Dict[str, dict]:
+        """Per-stage queue depth and utilisation for the last run"""
+        return {stats.name: stats.snapshot(self.elapsed) for stats in self.stats}
@@ -0,0 +1,159 @@
+"""
+Feature-bucket reasoning cache for the Prediction Agent
+
+Events with the same catering type, weather, duration and food types, and
+with attendee counts in the same band, get near-identical surplus
+reasoning. Food types are part of the key because the reasoning states
+whether the food is perishable.
+The first event in a bucket asks Nemotron; later ones reuse its reasoning
+with the event name (and attendee/duration figures) swapped in.
+"""
+import re
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import config
+import llm_coalesce
+
+
+class ReasoningBucketCache:
+    """
+    In-memory, thread-safe reuse of reasoning across similar events
+    
+    Args:
+        attendee_band: Attendees per bucket (e.g. 250 -> 0-249, 250-499, ...)
+        duration_band_hours: Hours per duration bucket
+        max_reuse: Times one stored reasoning may be reused before the next
+            event in its bucket asks Nemotron afresh (0 = unlimited)
+    """
+    
+    def __init__(self,
+                 attendee_band: int = config.REASONING_CACHE_ATTENDEE_BAND,
+                 duration_band_hours: float = config.REASONING_CACHE_DURATION_BAND_HOURS,
+                 max_reuse: int = config.REASONING_CACHE_MAX_REUSE):
+        self.attendee_band = max(1, attendee_band)
+        self.duration_band_hours = duration_band_hours or 1
+        self.max_reuse = max_reuse
+        
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, dict] = {}
+        # Similar events reasoned about concurrently wait for the first one
+        self._in_flight = llm_coalesce.SingleFlight()
+        
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+    
+    def bucket_key(self, event: dict) -> Tuple:
+        """Bucket an event by the features that drive surplus reasoning"""
+        return (
+            event["catering_type"],
+            event["weather"],
+            tuple(sorted(event.get("food_type") or [])),
+            int(event["duration_hours"] // self.duration_band_hours),
+            int(event["attendees"] // self.attendee_band)
+        )
+    
+    def lookup(self, event: dict) -> Optional[str]:
+        """Reasoning reused from a similar event, or None on a miss"""
+        key = self.bucket_key(event)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.max_reuse and entry["reuses"] >= self.max_reuse:
+                # Retire the entry so the next call refreshes the bucket
+                del self._entries[key]
+                self.refreshes += 1
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            entry["reuses"] += 1
+            self.hits += 1
+        return self._adapt(entry["reasoning"], entry["event"], event)
+    
+    def store(self, event: dict, reasoning: str):
+        """Remember an event's Nemotron reasoning for its bucket"""
+        with self._lock:
+            self._entries[self.bucket_key(event)] = {
+                "reasoning": reasoning,
+                "event": event,
+                "reuses": 0
+            }
+    
+    def get_or_reason(self,
+                      event: dict,
+                      reason: Callable[[], Tuple[str, bool]]) -> str:
+        """
+        Reuse bucket reasoning, or produce it with ``reason`` and store it
+        
+        Args:
+            event: Event being analyzed
+            reason: Returns (reasoning, cacheable); heuristic fallbacks
+                should report cacheable=False
+        
+        Returns:
+            Reasoning text for the event
+        """
+        reused = self.lookup(event)
+        if reused is not None:
+            return reused
+        
+        def leader() -> Tuple[str, bool, dict]:
+            reasoning, cacheable = reason()
+            if cacheable:
+                self.store(event, reasoning)
+            return reasoning, cacheable, event
+        
+        flight_key = "|".join(str(part) for part in self.bucket_key(event))
+        (reasoning, cacheable, source_event), shared = self._in_flight.do(flight_key, leader)
+        if not shared:
+            return reasoning
+        if not cacheable:
+            return reason()[0]
+        
+        with self._lock:
+            self.misses -= 1
+            self.hits += 1
+        return self._adapt(reasoning, source_event, event)
+    
+    def _adapt(self, reasoning: str, source: dict, event: dict) -> str:
+        """Swap the source event's name and figures for the new event's"""
+        if source is event or source["event_id"] == event["event_id"]:
+            return reasoning
+        
+        reasoning = reasoning.replace(source["name"], event["name"])
+        for field, units in (("attendees", "attendees|guests|people"),
+                             ("duration_hours", "hours?|hrs?")):
+            if source[field] != event[field]:
+                reasoning = re.sub(
+                    rf"\b{re.escape(self._figure(source[field]))}(?=[\s-]+(?:{units})\b)",
+                    self._figure(event[field]),
+                    reasoning
+                )
+        return reasoning
+    
+    @staticmethod
+    def _figure(value) -> str:
+        return f"{value:g}" if isinstance(value, float) else str(value)
+    
+    def clear(self):
+        """Forget all stored reasoning"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit rate and bucket granularity"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "refreshes": self.refreshes,
+                "buckets": len(self._entries),
+                "attendee_band": self.attendee_band,
+                "duration_band_hours": self.duration_band_hours,
+                "max_reuse": self.max_reuse
+            }
@@ -9,6 +9,7 @@ import json
 from pathlib import Path
 import pandas as pd
 from datetime import datetime
+from results_writer import read_results
 
 # Page config
 st.set_page_config(
@@ -62,14 +63,81 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def find_results_file():
+    """Prefer the streamed JSONL output, falling back to a legacy results.json"""
+    for candidate in ("results.jsonl", "results.json"):
+        path = Path(candidate)
+        if path.exists():
+            return path
+    return None
+
 @st.cache_data
-def load_results():
-    """Load results from JSON file"""
-    results_file = Path("results.json")
-    if results_file.exists():
+def load_results(results_file, modified_at):
+    """
+    Load results from the JSONL (or legacy JSON) file
+    
+    modified_at only keys the cache, so a run still writing the file is
+    picked up on the next rerun. A half-written last line is skipped.
+    """
+    if not results_file.endswith(".jsonl"):
         with open(results_file, 'r') as f:
             return json.load(f)
-    return None
+    
+    results = {"predictions": [], "routes": [], "messages": [], "complete": False}
+    for record in read_results(results_file):
+        if record.get("type") == "summary":
+            results.update(record)
+            results["complete"] = True
+            continue
+        if record["prediction"]:
+            results["predictions"].append(record["prediction"])
+        if record["route"]:
+            results["routes"].append(record["route"])
+        if record.get("messages"):
+            results["messages"].extend(record["messages"])  # Split delivery legs
+        elif record["message"]:
+            results["messages"].append(record["message"])
+    return results
+
+@st.cache_data
+def load_events_by_id():
+    """Load source events keyed by event_id (for live re-analysis)"""
+    events_file = Path("data/events.json")
+    if events_file.exists():
+        with open(events_file, 'r') as f:
+            return {e["event_id"]: e for e in json.load(f)}
+    return {}
+
+@st.cache_resource
+def get_prediction_agent():
+    """Shared Prediction Agent for live reasoning"""
+    from agents import PredictionAgent
+    return PredictionAgent()
+
+def stream_live_reasoning(event_id):
+    """Re-run surplus reasoning for one event, rendering tokens as they arrive"""
+    event = load_events_by_id().get(event_id)
+    if event is None:
+        st.warning(f"Event {event_id} not found in data/events.json")
+        return
+    
+    try:
+        agent = get_prediction_agent()
+    except ValueError as e:
+        st.error(f"❌ NVIDIA API key not configured: {str(e)}")
+        return
+    
+    stream = agent.stream_reasoning(event, use_cache=False)
+    st.write_stream(stream)
+    
+    # This call's own record: metrics.last() may belong to another session
+    last_call = stream.metrics
+    if last_call:
+        st.caption(
+            f"⏱️ First token {last_call['ttft_seconds']:.2f}s • "
+            f"{last_call['tokens_per_second']:.1f} tokens/s • "
+            f"total {last_call['wall_seconds']:.2f}s"
+        )
 
 def create_map(routes):
     """Create Folium map with routes"""
@@ -91,22 +159,22 @@ def create_map(routes):
                 tooltip=route['event_name']
             ).add_to(m)
             
-            # Recipient marker (green)
-            folium.Marker(
-                location=route['recipient_location'],
-                popup=f"<b>{route['recipient_name']}</b><br>{route['distance_km']:.1f}km away",
-                icon=folium.Icon(color='green', icon='home', prefix='fa'),
-                tooltip=route['recipient_name']
-            ).add_to(m)
-            
-            # Draw line between them
-            folium.PolyLine(
-                locations=[route['event_location'], route['recipient_location']],
-                color='#667eea',
-                weight=3,
-                opacity=0.7,
-                popup=f"{route['distance_km']:.1f}km"
-            ).add_to(m)
+            # Recipient marker (green) and line, one per leg of a split delivery
+            for leg in route.get('legs') or [route]:
+                folium.Marker(
+                    location=leg['recipient_location'],
+                    popup=f"<b>{leg['recipient_name']}</b><br>{leg['distance_km']:.1f}km away",
+                    icon=folium.Icon(color='green', icon='home', prefix='fa'),
+                    tooltip=leg['recipient_name']
+                ).add_to(m)
+                
+                folium.PolyLine(
+                    locations=[route['event_location'], leg['recipient_location']],
+                    color='#667eea',
+                    weight=3,
+                    opacity=0.7,
+                    popup=f"{leg['distance_km']:.1f}km"
+                ).add_to(m)
     
     return m
 
@@ -116,13 +184,18 @@ def main():
     st.markdown('<p style="text-align: center; color: #666; font-size: 1.2rem;">Multi-Agent Food Redistribution powered by NVIDIA Nemotron</p>', unsafe_allow_html=True)
     
     # Load results
-    results = load_results()
+    results_file = find_results_file()
+    results = load_results(str(results_file), results_file.stat().st_mtime) if results_file else None
     
     if not results:
         st.error("❌ No results found. Please run `python main.py` first to generate results.")
         st.info("💡 The workflow will analyze events, find optimal routes, and generate outreach messages.")
         return
     
+    if not results.get("complete", True):
+        st.info(f"⏳ Workflow still running (or interrupted): showing the "
+                f"{len(results['predictions'])} events finished so far. Rerun to refresh.")
+    
     predictions = results.get('predictions', [])
     routes = results.get('routes', [])
     messages = results.get('messages', [])
@@ -212,6 +285,9 @@ def main():
                     
                     st.markdown("**🤖 AI Reasoning:**")
                     st.markdown(f'<div class="reasoning-box">{pred["reasoning"]}</div>', unsafe_allow_html=True)
+                    
+                    if st.button("🔄 Re-analyze live", key=f"live_{pred['event_id']}"):
+                        stream_live_reasoning(pred['event_id'])
             else:
                 with st.expander(f"✅ **{pred['event_name']}** - No significant surplus"):
                     st.markdown(f"**Confidence:** {pred['confidence']:.0%}")
@@ -0,0 +1,114 @@
+"""
+Incremental JSONL results output
+
+One record is appended (and flushed) per completed event, followed by a
+single summary record when the run finishes:
+
+    {"type": "event", "event_id": ..., "prediction": {...}, "route": {...}, "message": {...}}
+    {"type": "summary", "counts": {...}, "llm_usage": {...}, "log_counts": {...}}
+
+Memory stays flat on large runs, a crash keeps everything written so
+far, and readers can follow the file while the run is still going.
+"""
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+
+class JSONLResultsWriter:
+    """Thread-safe, line-flushed writer of per-event result records"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.events_written = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+    
+    def write_event(self, record: dict):
+        """Append one completed event's prediction, route and message"""
+        self._write({"type": "event", **record})
+        self.events_written += 1
+    
+    def write_summary(self, summary: dict):
+        """Append the final run summary record"""
+        self._write({"type": "summary", "completed_at": datetime.now().isoformat(), **summary})
+    
+    def _write(self, record: dict):
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+    
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+    
+    def __enter__(self) -> "JSONLResultsWriter":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def event_record(event: dict, output: dict, fingerprints: Optional[Dict[str, str]] = None) -> dict:
+    """
+    Build the JSONL record for one finished event
+    
+    Args:
+        event: Event dictionary
+        output: The event's accumulated predictions/routes/messages
+        fingerprints: Input fingerprints used by incremental re-runs
+    
+    Returns:
+        Record with the event's prediction and (if any) route and message
+    """
+    record = {
+        "event_id": event["event_id"],
+        "event_name": event["name"],
+        "prediction": output["predictions"][0] if output["predictions"] else None,
+        "route": output["routes"][0] if output["routes"] else None,
+        "message": output["messages"][0] if output["messages"] else None,
+        "completed_at": datetime.now().isoformat()
+    }
+    if len(output["messages"]) > 1:
+        record["messages"] = output["messages"]  # Split delivery: one per leg
+    if fingerprints is not None:
+        record["fingerprints"] = fingerprints
+    return record
+
+
+def record_output(record: dict) -> dict:
+    """The predictions/routes/messages an event record was built from"""
+    return {
+        "predictions": [record["prediction"]] if record["prediction"] else [],
+        "routes": [record["route"]] if record["route"] else [],
+        "messages": record.get("messages") or ([record["message"]] if record["message"] else []),
+        "processed_events": [record["event_id"]]
+    }
+
+
+def read_results(path: str, record_type: Optional[str] = None) -> Iterator[dict]:
+    """
+    Stream records from a results JSONL file
+    
+    A truncated last line (the run is still writing, or crashed mid-write)
+    is skipped rather than raised.
+    
+    Args:
+        path: Results file
+        record_type: Only yield records of this type ("event" or "summary")
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith("\n"):
+                    raise
+                return
+            if record_type is None or record.get("type") == record_type:
+                yield record
@@ -14,7 +14,7 @@ if [[ "$VIRTUAL_ENV" == "" ]]; then
 fi
 
 # Check if results exist
-if [ ! -f "results.json" ]; then
+if [ ! -f "results.jsonl" ] && [ ! -f "results.json" ]; then
     echo "📊 No results found. Running workflow first..."
     echo ""
     python main.py
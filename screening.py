@@ -0,0 +1,251 @@
+"""
+LLM-free numeric screening of whole event calendars
+
+Runs the same surplus scoring, volume estimate, recipient filtering and
+routing-cost ranking as the tool functions, but over NumPy arrays for an
+entire event table at once, with no agents and no Nemotron calls. Results
+match the scalar tools exactly, so a regional calendar of hundreds of
+thousands of events can be screened in seconds and only the interesting
+ones sent through the LLM agents.
+
+Usage:
+    python screening.py --events data/events.json --recipients data/recipients.json --top 20
+"""
+import argparse
+import json
+import time
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+import config
+from tools import (calculate_surplus_scores, encode_categories, estimate_food_volumes,
+                   exact_round, haversine_matrix)
+
+# Scalar-tool defaults for missing event fields
+EVENT_DEFAULTS = {
+    "attendees": 0,
+    "duration_hours": 0,
+    "catering_type": "plated",
+    "weather": "mild"
+}
+
+Table = Union[List[dict], pd.DataFrame]
+
+
+def load_table(path: str) -> pd.DataFrame:
+    """Load an event or recipient table from JSON (list of dicts) or CSV"""
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    with open(path, "r") as f:
+        return pd.DataFrame(json.load(f))
+
+
+def _split_location(frame: pd.DataFrame) -> pd.DataFrame:
+    """Add lat/lon columns from a [lat, lon] location column"""
+    if "lat" in frame and "lon" in frame:
+        return frame
+    location = np.array(frame["location"].tolist(), dtype=np.float64).reshape(-1, 2)
+    return frame.assign(lat=location[:, 0], lon=location[:, 1])
+
+
+def events_frame(events: Table) -> pd.DataFrame:
+    """Event table with the columns screening needs, defaults filled in"""
+    frame = events.copy() if isinstance(events, pd.DataFrame) else pd.DataFrame(events)
+    for column, default in EVENT_DEFAULTS.items():
+        frame[column] = frame[column].fillna(default) if column in frame else default
+    if "name" not in frame:
+        frame["name"] = frame["event_id"]
+    return _split_location(frame).reset_index(drop=True)
+
+
+def recipients_frame(recipients: Table) -> pd.DataFrame:
+    """Recipient table with the columns screening needs, defaults filled in"""
+    frame = recipients.copy() if isinstance(recipients, pd.DataFrame) else pd.DataFrame(recipients)
+    for column, default in (("capacity_kg", 0), ("current_load_kg", 0),
+                            ("accepts_perishable", False), ("accepts_non_perishable", False)):
+        frame[column] = frame[column].fillna(default) if column in frame else default
+    return _split_location(frame).reset_index(drop=True)
+
+
+def surplus_scores(events: pd.DataFrame) -> np.ndarray:
+    """tools.calculate_surplus_scores over an event table"""
+    return calculate_surplus_scores(
+        events["attendees"].to_numpy(),
+        events["duration_hours"].to_numpy(),
+        encode_categories(events["catering_type"].to_numpy(), config.CATERING_FACTORS),
+        encode_categories(events["weather"].to_numpy(), config.WEATHER_FACTORS)
+    )
+
+
+def distance_matrix(events: pd.DataFrame, recipients: pd.DataFrame) -> np.ndarray:
+    """tools.calculate_distance for every event x recipient pair (float64)"""
+    return haversine_matrix(events["lat"].to_numpy(), events["lon"].to_numpy(),
+                            recipients["lat"].to_numpy(), recipients["lon"].to_numpy())
+
+
+def routing_costs(distance_km: np.ndarray,
+                  volume_kg: np.ndarray,
+                  capacity_kg: np.ndarray,
+                  is_perishable: np.ndarray) -> np.ndarray:
+    """Vectorized tools.calculate_routing_cost (broadcasting arguments)"""
+    distance_cost = np.where(is_perishable, distance_km * 2.0, distance_km)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        utilization = np.where(capacity_kg > 0, volume_kg / capacity_kg, 0.0)
+    
+    utilization_penalty = np.where(
+        utilization < 0.3, 5.0 * (0.3 - utilization),
+        np.where(utilization > 0.9, 5.0 * (utilization - 0.9), 0.0)
+    )
+    return exact_round(distance_cost + utilization_penalty, 2)
+
+
+def _route_chunk(events: pd.DataFrame,
+                 recipients: pd.DataFrame,
+                 predicted_kg: np.ndarray,
+                 category: np.ndarray) -> dict:
+    """Filter and rank recipients for one chunk of events, as RoutingAgent does"""
+    capacity = recipients["capacity_kg"].to_numpy(dtype=np.float64)
+    available = capacity - recipients["current_load_kg"].to_numpy(dtype=np.float64)
+    accepts_perishable = recipients["accepts_perishable"].to_numpy(dtype=bool)
+    accepts_non_perishable = recipients["accepts_non_perishable"].to_numpy(dtype=bool)
+    
+    volume = predicted_kg[:, None]
+    perishable = (category == "perishable")[:, None]
+    non_perishable = (category == "non_perishable")[:, None]
+    routable = ((category != "none") & (predicted_kg > 0))[:, None]
+    
+    # get_available_recipients (food type, >= 50% capacity), then
+    # check_recipient_capacity (room for the full volume)
+    accepts = np.where(perishable, accepts_perishable[None, :],
+                       np.where(non_perishable, accepts_non_perishable[None, :], True))
+    eligible = (routable & accepts
+                & (available[None, :] >= volume * 0.5)
+                & (available[None, :] >= volume))
+    
+    distance = distance_matrix(events, recipients)
+    cost = routing_costs(distance, volume, capacity[None, :], perishable)
+    cost = np.where(eligible, cost, np.inf)
+    
+    # Stable sort keeps recipient order between equal costs, like list.sort;
+    # three padding columns of "no recipient" keep the top 3 defined
+    cost = np.hstack([cost, np.full((len(events), 3), np.inf)])
+    ranked = np.argsort(cost, axis=1, kind="stable")[:, :3]
+    rows = np.arange(len(events))[:, None]
+    ranked_ok = np.isfinite(cost[rows, ranked])
+    
+    recipient_ids = np.append(recipients["recipient_id"].to_numpy(dtype=object), [None] * 3)
+    distance = np.hstack([distance, np.full((len(events), 3), np.nan)])
+    best = ranked[:, 0]
+    has_match = ranked_ok[:, 0]
+    return {
+        "candidates": eligible.sum(axis=1),
+        "recipient_id": np.where(has_match, recipient_ids[best], None),
+        "distance_km": np.where(has_match, distance[rows[:, 0], best], np.nan),
+        "cost_score": np.where(has_match, cost[rows[:, 0], best], np.nan),
+        "alternative_1": np.where(ranked_ok[:, 1], recipient_ids[ranked[:, 1]], None),
+        "alternative_2": np.where(ranked_ok[:, 2], recipient_ids[ranked[:, 2]], None)
+    }
+
+
+def screen_events(events: Table,
+                  recipients: Table,
+                  cell_budget: int = config.SCREENING_CELL_BUDGET) -> pd.DataFrame:
+    """
+    Score, size and route every event without any LLM calls
+    
+    Args:
+        events: Event dicts or DataFrame (location or lat/lon columns)
+        recipients: Recipient dicts or DataFrame
+        cell_budget: Event x recipient cells per chunk; each chunk builds
+            several float64 matrices of this size, so this bounds peak memory
+    
+    Returns:
+        One row per event, in input order: event_id, event_name,
+        surplus_score, predicted_kg, category, urgency, has_surplus,
+        candidates, recipient_id, distance_km, cost_score, and the
+        next-best recipient ids alternative_1 and alternative_2 (None
+        where there is no such recipient, as in the scalar routing path)
+    """
+    events = events_frame(events)
+    recipients = recipients_frame(recipients)
+    
+    scores = surplus_scores(events)
+    volumes = estimate_food_volumes(events["attendees"].to_numpy(), scores)
+    predicted_kg, category, urgency = volumes["predicted_kg"], volumes["category"], volumes["urgency"]
+    
+    chunk_size = max(1, cell_budget // max(len(recipients), 1))
+    parts = [
+        _route_chunk(events.iloc[start:start + chunk_size], recipients,
+                     predicted_kg[start:start + chunk_size], category[start:start + chunk_size])
+        for start in range(0, max(len(events), 1), chunk_size)
+    ]
+    
+    return pd.DataFrame({
+        "event_id": events["event_id"],
+        "event_name": events["name"],
+        "surplus_score": scores,
+        "predicted_kg": predicted_kg,
+        "category": category,
+        "urgency": urgency,
+        "has_surplus": category != "none",
+        "candidates": np.concatenate([part["candidates"] for part in parts]),
+        "recipient_id": _ids(parts, "recipient_id"),
+        "distance_km": np.concatenate([part["distance_km"] for part in parts]),
+        "cost_score": np.concatenate([part["cost_score"] for part in parts]),
+        "alternative_1": _ids(parts, "alternative_1"),
+        "alternative_2": _ids(parts, "alternative_2")
+    })
+
+
+def _ids(parts: List[dict], column: str) -> pd.Series:
+    """Recipient id column kept as objects, so missing ids stay None rather than NaN"""
+    return pd.Series(np.concatenate([part[column] for part in parts]), dtype=object)
+
+
+def interesting_event_ids(screened: pd.DataFrame, limit: Optional[int] = None) -> List[str]:
+    """
+    Events worth sending through the LLM agents
+    
+    Returns:
+        Ids of events with surplus and a recipient to route it to, largest
+        predicted surplus first
+    """
+    routable = screened[screened["has_surplus"] & screened["recipient_id"].notna()]
+    ranked = routable.sort_values("predicted_kg", ascending=False, kind="stable")
+    return ranked["event_id"].head(limit).tolist() if limit else ranked["event_id"].tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen events numerically, without agents or LLM calls")
+    parser.add_argument("--events", default="data/events.json", help="Events JSON or CSV")
+    parser.add_argument("--recipients", default="data/recipients.json", help="Recipients JSON or CSV")
+    parser.add_argument("--top", type=int, default=20, help="Interesting events to list (default: 20)")
+    parser.add_argument("--output", default=None, help="Write every screened row to this CSV file")
+    args = parser.parse_args()
+    
+    events = load_table(args.events)
+    recipients = load_table(args.recipients)
+    
+    started = time.perf_counter()
+    screened = screen_events(events, recipients)
+    elapsed = time.perf_counter() - started
+    
+    routable = screened["recipient_id"].notna()
+    print(f"🔢 Screened {len(screened)} events x {len(recipients)} recipients in {elapsed:.2f}s")
+    print(f"   With surplus: {int(screened['has_surplus'].sum())}, routable: {int(routable.sum())}, "
+          f"{screened.loc[routable, 'predicted_kg'].sum():.0f}kg")
+    
+    top = screened.set_index("event_id").loc[interesting_event_ids(screened, args.top)]
+    print(f"\nTop {len(top)} events for the agents:")
+    print(top[["event_name", "predicted_kg", "category", "recipient_id", "distance_km", "cost_score"]].to_string())
+    
+    if args.output:
+        screened.to_csv(args.output, index=False)
+        print(f"\n📄 Screened rows saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,37 @@
 """
 State schema for LangGraph workflow
 """
-from typing import TypedDict, List, Annotated, Literal
+from typing import TypedDict, Dict, List, Annotated, Literal, Optional
 import operator
 
+
+def add_counts(left: Dict[str, float], right: Dict[str, float]) -> Dict[str, float]:
+    """Reducer that sums result counters from parallel branches"""
+    merged = dict(left or {})
+    for key, value in (right or {}).items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def count_results(predictions: List[dict], routes: List[dict], messages: List[dict]) -> Dict[str, float]:
+    """
+    Summary counters for a set of results
+    
+    Lets the summary be computed without keeping every result in state
+    (see FeastGuardOrchestrator's result_sink).
+    """
+    routed = [r for r in routes if r.get("recipient_id") is not None]
+    return {
+        "events": len(predictions),
+        "events_with_surplus": sum(1 for p in predictions if p["has_surplus"]),
+        "routes": len(routes),
+        "successful_routes": len(routed),
+        "kg_rescued": sum(r["volume_kg"] for r in routed),
+        "perishable_routes": sum(1 for r in routed if r.get("food_category") == "perishable"),
+        "non_perishable_routes": sum(1 for r in routed if r.get("food_category") == "non_perishable"),
+        "messages": len(messages)
+    }
+
 class AgentState(TypedDict):
     """
     Shared state across all agents in the workflow
@@ -14,23 +42,52 @@ class AgentState(TypedDict):
     events: List[dict]
     recipients: List[dict]
     
-    # Agent outputs (accumulated)
+    # Agent outputs (accumulated; left empty when results stream to a sink)
     predictions: Annotated[List[dict], operator.add]
     routes: Annotated[List[dict], operator.add]
     messages: Annotated[List[dict], operator.add]
     
+    # Summary counters, summed across events
+    result_counts: Annotated[Dict[str, float], add_counts]
+    
     # Workflow control
-    current_event_idx: int
     processed_events: Annotated[List[str], operator.add]  # event_ids
     
-    # Logging for visibility (accumulated)
-    agent_logs: Annotated[List[str], operator.add]
+    # Records logged to the agent log sink, by level (set by the summary node)
+    log_counts: Dict[str, int]
+    
+    # Per-agent Nemotron calls, time and tokens (set by the summary node)
+    llm_usage: Dict[str, dict]
     
     # Metadata
     workflow_status: Literal["running", "completed", "error"]
     total_events: int
 
 
+class EventState(TypedDict):
+    """
+    State of one event's prediction -> routing -> outreach subgraph
+    
+    Events are fanned out to parallel copies of the subgraph; the
+    accumulated lists are merged back into AgentState when they finish.
+    """
+    # Input data
+    event: dict
+    event_idx: int
+    total_events: int
+    recipients: List[dict]
+    
+    # Per-event results
+    current_prediction: Optional[dict]
+    current_route: Optional[dict]
+    
+    # Merged into AgentState (accumulated)
+    predictions: Annotated[List[dict], operator.add]
+    routes: Annotated[List[dict], operator.add]
+    messages: Annotated[List[dict], operator.add]
+    processed_events: Annotated[List[str], operator.add]
+
+
 def create_initial_state(events: List[dict], recipients: List[dict]) -> AgentState:
     """
     Create initial state for workflow
@@ -48,10 +105,38 @@ def create_initial_state(events: List[dict], recipients: List[dict]) -> AgentSta
         "predictions": [],
         "routes": [],
         "messages": [],
-        "current_event_idx": 0,
+        "result_counts": {},
         "processed_events": [],
-        "agent_logs": [],
+        "log_counts": {},
+        "llm_usage": {},
         "workflow_status": "running",
         "total_events": len(events)
     }
 
+
+def create_event_state(event: dict, event_idx: int, total_events: int,
+                       recipients: List[dict]) -> EventState:
+    """
+    Create the input state for one event's subgraph
+    
+    Args:
+        event: Event dictionary
+        event_idx: Position of the event in the run (for logging)
+        total_events: Number of events in the run
+        recipients: List of recipient dictionaries
+        
+    Returns:
+        Initial EventState
+    """
+    return {
+        "event": event,
+        "event_idx": event_idx,
+        "total_events": total_events,
+        "recipients": recipients,
+        "current_prediction": None,
+        "current_route": None,
+        "predictions": [],
+        "routes": [],
+        "messages": [],
+        "processed_events": []
+    }
@@ -2,7 +2,11 @@
 Quick test script for individual agents
 """
 import json
+import os
+import tempfile
 from agents import PredictionAgent, RoutingAgent, OutreachAgent
+from distance_store import get_distance_store
+from llm_cache import ResponseCache
 
 
 def test_prediction_agent():
@@ -47,8 +51,9 @@ def test_routing_agent(prediction):
     
     event = events[0]
     
-    # Run routing
+    # Run routing (distances read from the persistent matrix)
     agent = RoutingAgent()
+    agent.use_distances(get_distance_store().event_matrix(events, recipients))
     result = agent.find_route(prediction, event, recipients)
     
     if result and result.get('recipient_id'):
@@ -95,6 +100,27 @@ def test_outreach_agent(route):
     print("\n✅ Outreach Agent Test Complete")
 
 
+def test_response_cache_endpoints():
+    """Replies cached from one endpoint (e.g. the mock server) miss on another"""
+    print("\n\n💾 Testing Response Cache Endpoints...")
+    print("-" * 60)
+    
+    messages = [{"role": "user", "content": "Analyze this event"}]
+    mock = "http://127.0.0.1:8000/v1/chat/completions"
+    real = "https://integrate.api.nvidia.com/v1/chat/completions"
+    
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(path=os.path.join(directory, "responses.sqlite3"))
+        cache.put(ResponseCache.make_key("nemotron", messages, 0.7, 800, mock), "mock reply")
+        
+        assert cache.get(ResponseCache.make_key("nemotron", messages, 0.7, 800, mock)) == "mock reply"
+        assert cache.get(ResponseCache.make_key("nemotron", messages, 0.7, 800, real)) is None
+        cache._conn.close()
+    
+    print("  Mock reply served to the mock endpoint only")
+    print("\n✅ Response Cache Test Complete")
+
+
 def main():
     """Run all agent tests"""
     print("""
@@ -110,6 +136,8 @@ def main():
         print("   Please set your NVIDIA API key in .env file\n")
     
     try:
+        test_response_cache_endpoints()
+        
         # Test agents in sequence
         prediction = test_prediction_agent()
         
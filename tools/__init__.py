@@ -1,19 +1,35 @@
 """
 Tool functions for FeastGuard.AI agents
 """
-from .surplus_calculator import calculate_surplus_score, estimate_food_volume
-from .distance_calculator import calculate_distance, get_distance_matrix, calculate_routing_cost
+from .surplus_calculator import (calculate_surplus_score, estimate_food_volume, encode_categories,
+                                 calculate_surplus_scores, estimate_food_volumes)
+from .distance_calculator import (calculate_distance, get_distance_matrix, calculate_routing_cost,
+                                  haversine_matrix, build_distance_matrix, DistanceMatrix,
+                                  find_nearby_recipients)
+from .spatial_index import RecipientIndex
 from .capacity_checker import check_recipient_capacity, get_available_recipients
+from .split_planner import plan_split_delivery
 from .message_generator import generate_outreach_message
+from .rounding import exact_round
 
 __all__ = [
     "calculate_surplus_score",
     "estimate_food_volume",
+    "encode_categories",
+    "calculate_surplus_scores",
+    "estimate_food_volumes",
     "calculate_distance",
     "get_distance_matrix",
+    "haversine_matrix",
+    "build_distance_matrix",
+    "DistanceMatrix",
+    "find_nearby_recipients",
+    "RecipientIndex",
     "calculate_routing_cost",
     "check_recipient_capacity",
     "get_available_recipients",
-    "generate_outreach_message"
+    "plan_split_delivery",
+    "generate_outreach_message",
+    "exact_round"
 ]
 
@@ -2,7 +2,14 @@
 Distance calculation tool functions
 """
 import math
-from typing import List, Tuple
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+import config
+
+EARTH_RADIUS_KM = 6371  # Same radius as calculate_distance
 
 def calculate_distance(loc1: Tuple[float, float], loc2: Tuple[float, float]) -> float:
     """
@@ -34,34 +41,141 @@ def calculate_distance(loc1: Tuple[float, float], loc2: Tuple[float, float]) ->
     return round(distance, 2)
 
 
-def get_distance_matrix(events: List[dict], recipients: List[dict]) -> dict:
+def haversine_matrix(lat1: np.ndarray, lon1: np.ndarray,
+                     lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
     """
-    Calculate distance matrix between all events and recipients
+    calculate_distance between every pair of two sets of points, broadcast
+    
+    NumPy's trig functions may differ from math's in the last bit, so the
+    few distances that close to a rounding tie are recomputed with the
+    scalar function; every value matches calculate_distance exactly.
+    
+    Args:
+        lat1, lon1: Row point coordinates, shape (n,)
+        lat2, lon2: Column point coordinates, shape (m,)
+    
+    Returns:
+        (n, m) float64 array of distances in km, rounded to 2 decimals
+    """
+    lat1 = np.asarray(lat1, dtype=np.float64)[:, None]
+    lon1 = np.asarray(lon1, dtype=np.float64)[:, None]
+    lat2 = np.asarray(lat2, dtype=np.float64)[None, :]
+    lon2 = np.asarray(lon2, dtype=np.float64)[None, :]
+    
+    dlat = np.radians(lat2 - lat1)
+    dlon = np.radians(lon2 - lon1)
+    
+    a = (np.sin(dlat / 2) ** 2 +
+         np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) *
+         np.sin(dlon / 2) ** 2)
+    
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    distance = EARTH_RADIUS_KM * c
+    rounded = np.round(distance, 2)
+    
+    scaled = distance * 100
+    for i, j in zip(*np.nonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)):
+        rounded[i, j] = calculate_distance((lat1[i, 0], lon1[i, 0]), (lat2[0, j], lon2[0, j]))
+    return rounded
+
+
+class DistanceMatrix(Mapping):
+    """
+    Dense events x recipients distance matrix with id -> index maps
+    
+    Also a read-only mapping of (event_id, recipient_id) -> distance, so it
+    stands in for the dict get_distance_matrix used to build. Values are
+    stored as float32 and read back rounded to 2 decimals, which restores
+    calculate_distance's value exactly for any distance on Earth.
+    """
+    
+    def __init__(self, distances: np.ndarray, event_ids: List[str], recipient_ids: List[str]):
+        self.distances = distances
+        self.event_ids = list(event_ids)
+        self.recipient_ids = list(recipient_ids)
+        self.event_index: Dict[str, int] = {event_id: i for i, event_id in enumerate(self.event_ids)}
+        self.recipient_index: Dict[str, int] = {recipient_id: j for j, recipient_id in enumerate(self.recipient_ids)}
+    
+    def __getitem__(self, key: Tuple[str, str]) -> float:
+        try:
+            event_id, recipient_id = key
+            i, j = self.event_index[event_id], self.recipient_index[recipient_id]
+        except (KeyError, TypeError, ValueError):
+            raise KeyError(key) from None
+        return round(float(self.distances[i, j]), 2)
+    
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for event_id in self.event_ids:
+            for recipient_id in self.recipient_ids:
+                yield event_id, recipient_id
+    
+    def __len__(self) -> int:
+        return len(self.event_ids) * len(self.recipient_ids)
+    
+    def row(self, event_id: str) -> np.ndarray:
+        """Distances from one event to every recipient, in recipient order"""
+        return self.distances[self.event_index[event_id]]
+
+
+def build_distance_matrix(events: List[dict],
+                          recipients: List[dict],
+                          chunk_rows: int = config.DISTANCE_MATRIX_CHUNK_ROWS,
+                          dtype=np.float32) -> DistanceMatrix:
+    """
+    Calculate distances between all events and recipients as a dense array
+    
+    Rows are computed chunk_rows events at a time, so the float64 working
+    arrays stay small however many events there are.
     
     Args:
         events: List of event dictionaries with location
         recipients: List of recipient dictionaries with location
+        chunk_rows: Events per broadcast chunk
+        dtype: Storage dtype of the matrix (float32 halves the memory)
     
     Returns:
-        Dict mapping (event_id, recipient_id) to distance
+        DistanceMatrix of shape (len(events), len(recipients))
     """
-    distance_matrix = {}
+    event_locations = np.array([event.get("location", [0, 0]) for event in events],
+                               dtype=np.float64).reshape(-1, 2)
+    recipient_locations = np.array([recipient.get("location", [0, 0]) for recipient in recipients],
+                                   dtype=np.float64).reshape(-1, 2)
     
-    for event in events:
-        event_loc = tuple(event.get("location", [0, 0]))
-        
-        for recipient in recipients:
-            recipient_loc = tuple(recipient.get("location", [0, 0]))
-            
-            key = (event["event_id"], recipient["recipient_id"])
-            distance_matrix[key] = calculate_distance(event_loc, recipient_loc)
+    distances = np.empty((len(events), len(recipients)), dtype=dtype)
+    chunk_rows = max(1, chunk_rows)
+    for start in range(0, len(events), chunk_rows):
+        chunk = event_locations[start:start + chunk_rows]
+        distances[start:start + len(chunk)] = haversine_matrix(
+            chunk[:, 0], chunk[:, 1], recipient_locations[:, 0], recipient_locations[:, 1]
+        )
     
-    return distance_matrix
+    return DistanceMatrix(
+        distances,
+        [event["event_id"] for event in events],
+        [recipient["recipient_id"] for recipient in recipients]
+    )
+
+
+def get_distance_matrix(events: List[dict], recipients: List[dict]) -> Mapping:
+    """
+    Calculate distance matrix between all events and recipients
+    
+    Args:
+        events: List of event dictionaries with location
+        recipients: List of recipient dictionaries with location
+    
+    Returns:
+        Mapping of (event_id, recipient_id) to distance, backed by a dense
+        DistanceMatrix (see build_distance_matrix)
+    """
+    return build_distance_matrix(events, recipients)
 
 
 def find_nearby_recipients(event_location: Tuple[float, float], 
                           recipients: List[dict], 
-                          max_distance_km: float = 10) -> List[dict]:
+                          max_distance_km: float = 10,
+                          index=None) -> List[dict]:
     """
     Find recipients within max distance of event
     
@@ -69,10 +183,18 @@ def find_nearby_recipients(event_location: Tuple[float, float],
         event_location: (lat, lon) tuple
         recipients: List of recipient dicts
         max_distance_km: Maximum distance threshold
+        index: Optional RecipientIndex built over recipients; only the grid
+            cells near the event are then measured
     
     Returns:
         List of recipients within range, sorted by distance
     """
+    if index is not None:
+        return [
+            {**recipients[idx], "distance_km": distance}
+            for distance, idx in index.within(event_location, max_distance_km)
+        ]
+    
     nearby = []
     
     for recipient in recipients:
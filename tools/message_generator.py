@@ -2,9 +2,7 @@
 Message generation tool (Nemotron integration)
 """
 import os
-import requests
-from typing import Optional
-import config
+import llm_client
 
 def generate_outreach_message(recipient_name: str,
                               event_name: str,
@@ -44,8 +42,6 @@ def _generate_with_nemotron(recipient_name: str, event_name: str,
     """
     Generate message using NVIDIA Nemotron via NVIDIA API
     """
-    api_key = config.NVIDIA_API_KEY
-    
     urgency_context = {
         "high": "This is time-sensitive perishable food that must be picked up within 2 hours.",
         "medium": "Please confirm availability for pickup today.",
@@ -74,34 +70,13 @@ The message should:
 Generate only the message text, no subject line or signatures."""
 
     try:
-        response = requests.post(
-            config.NVIDIA_ENDPOINT,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "accept": "application/json",
-                "content-type": "application/json"
-            },
-            json={
-                "model": config.NEMOTRON_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.7,
-                "max_tokens": 300,
-                "stream": False,
-                "frequency_penalty": 0,
-                "presence_penalty": 0,
-                "top_p": 1
-            },
-            timeout=10
+        return llm_client.get_client().chat(
+            [{"role": "user", "content": prompt}],
+            temperature=0.7,
+            max_tokens=300,
+            timeout=10,
+            agent="Outreach Agent"
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
-        else:
-            # Fallback to template
-            return _generate_template_message(
-                recipient_name, event_name, volume, category, pickup_time, urgency
-            )
     except Exception as e:
         print(f"Nemotron API error: {e}")
         return _generate_template_message(
@@ -0,0 +1,44 @@
+"""
+Array rounding that matches Python's round()
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+def _two_product(a: np.ndarray, b: float) -> Tuple[np.ndarray, np.ndarray]:
+    """a * b as an unevaluated sum p + err, exactly (Dekker's algorithm)"""
+    def split(x):
+        c = 134217729.0 * x  # 2**27 + 1
+        hi = c - (c - x)
+        return hi, x - hi
+    
+    p = a * b
+    a_hi, a_lo = split(a)
+    b_hi, b_lo = split(np.float64(b))
+    err = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, err
+
+
+def exact_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    Round like Python's round(), elementwise
+    
+    np.round scales by 10**ndigits before rounding, so a value within an
+    ulp of a .5 tie can round the other way from round(), which looks at
+    the exact binary value. Those near ties are settled exactly: compare
+    values * 2 * 10**ndigits, computed without rounding error, against
+    the odd integer between the two candidates (half to even on a tie).
+    """
+    scale = 10.0 ** ndigits
+    rounded = np.round(values, ndigits)
+    scaled = values * scale
+    floor = np.floor(scaled)
+    near_tie = np.abs(scaled - floor - 0.5) < 1e-6
+    if near_tie.any():
+        low = floor[near_tie]
+        p, err = _two_product(values[near_tie], 2 * scale)
+        above = (p - (2 * low + 1)) + err  # Exact sign: p is within 2x of 2*low + 1
+        up = (above > 0) | ((above == 0) & (low % 2 == 1))
+        rounded[near_tie] = np.where(up, low + 1, low) / scale
+    return rounded
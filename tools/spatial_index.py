@@ -0,0 +1,131 @@
+"""
+Grid spatial index over recipient locations
+"""
+import math
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+import config
+from .distance_calculator import EARTH_RADIUS_KM, calculate_distance
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+HALF_CIRCUMFERENCE_KM = EARTH_RADIUS_KM * math.pi
+
+# calculate_distance rounds to 2 decimals, so a point reported at exactly
+# the radius can be up to 0.005km beyond it
+ROUNDING_MARGIN_KM = 0.01
+
+
+class RecipientIndex:
+    """
+    Buckets recipients into lat/lon grid cells for radius and k-nearest queries
+    
+    A query only measures recipients in the cells overlapping the search
+    circle's bounding box, so its cost grows with the recipients nearby,
+    not the directory size. Distances are calculate_distance's, so results
+    match a linear scan exactly.
+    
+    Args:
+        recipients: Recipient dicts with location
+        cell_km: Grid cell size (roughly the typical search radius)
+    """
+    
+    def __init__(self, recipients: List[dict], cell_km: float = config.SPATIAL_INDEX_CELL_KM):
+        self.recipients = recipients
+        self.locations = [tuple(r.get("location", [0, 0])) for r in recipients]
+        
+        # Whole number of cells around the globe so longitude wraps cleanly
+        self.lon_cells = max(1, math.ceil(360 / (cell_km / KM_PER_DEGREE)))
+        self.cell_deg = 360 / self.lon_cells
+        self.cell_km = self.cell_deg * KM_PER_DEGREE
+        
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for idx, location in enumerate(self.locations):
+            self.cells[self._cell(location)].append(idx)
+    
+    def _cell(self, location: Tuple[float, float]) -> Tuple[int, int]:
+        lat, lon = location
+        return (math.floor((lat + 90) / self.cell_deg),
+                math.floor((lon + 180) / self.cell_deg) % self.lon_cells)
+    
+    def _candidate_cells(self, location: Tuple[float, float], radius_km: float) -> Iterator[List[int]]:
+        """Recipient buckets in the cells overlapping the circle's bounding box"""
+        lat, lon = location
+        delta = (radius_km + ROUNDING_MARGIN_KM) / EARTH_RADIUS_KM  # Angular radius
+        delta_deg = math.degrees(delta)
+        
+        lat_lo = math.floor((lat - delta_deg + 90) / self.cell_deg)
+        lat_hi = math.floor((lat + delta_deg + 90) / self.cell_deg)
+        
+        if abs(lat) + delta_deg >= 90:
+            lon_span = self.lon_cells  # Circle reaches a pole: every longitude
+        else:
+            # Widest longitude offset of any point within delta of (lat, lon)
+            dlon_deg = math.degrees(math.asin(min(1.0, math.sin(delta) / math.cos(math.radians(lat)))))
+            lon_lo = math.floor((lon - dlon_deg + 180) / self.cell_deg)
+            lon_span = math.floor((lon + dlon_deg + 180) / self.cell_deg) - lon_lo + 1
+        
+        if (lat_hi - lat_lo + 1) * min(lon_span, self.lon_cells) > len(self.cells):
+            # Box covers more cells than are occupied: filter the occupied ones
+            for (cell_lat, cell_lon), bucket in self.cells.items():
+                if lat_lo <= cell_lat <= lat_hi and (
+                        lon_span >= self.lon_cells or (cell_lon - lon_lo) % self.lon_cells < lon_span):
+                    yield bucket
+            return
+        
+        lon_range = (range(self.lon_cells) if lon_span >= self.lon_cells
+                     else [(lon_lo + k) % self.lon_cells for k in range(lon_span)])
+        for cell_lat in range(lat_lo, lat_hi + 1):
+            for cell_lon in lon_range:
+                bucket = self.cells.get((cell_lat, cell_lon))
+                if bucket:
+                    yield bucket
+    
+    def within(self, location: Tuple[float, float], radius_km: float) -> List[Tuple[float, int]]:
+        """
+        Recipients no further than radius_km from location
+        
+        Returns:
+            (distance_km, recipient position) pairs, nearest first (ties in
+            directory order, like a stable sort of a linear scan)
+        """
+        location = tuple(location)
+        hits = []
+        for bucket in self._candidate_cells(location, radius_km):
+            for idx in bucket:
+                distance = calculate_distance(location, self.locations[idx])
+                if distance <= radius_km:
+                    hits.append((distance, idx))
+        hits.sort()
+        return hits
+    
+    def iter_nearest(self, location: Tuple[float, float]) -> Iterator[Tuple[float, int]]:
+        """
+        Every recipient, nearest first, measured lazily
+        
+        Searches circles of doubling radius; each round only yields the
+        recipients beyond the previous circle, so the order is global.
+        """
+        location = tuple(location)
+        radius = self.cell_km
+        previous = -1.0
+        while True:
+            for distance, idx in self.within(location, radius):
+                if distance > previous:
+                    yield distance, idx
+            if radius >= HALF_CIRCUMFERENCE_KM:
+                return
+            previous = radius
+            radius *= 2
+    
+    def nearest(self, location: Tuple[float, float], k: int) -> List[Tuple[float, int]]:
+        """The k nearest recipients as (distance_km, recipient position) pairs"""
+        found = []
+        for hit in self.iter_nearest(location):
+            found.append(hit)
+            if len(found) >= k:
+                break
+        return found
+    
+    def __len__(self) -> int:
+        return len(self.recipients)
@@ -0,0 +1,87 @@
+"""
+Split-delivery planning tool functions
+"""
+import math
+from typing import List
+import config
+from .distance_calculator import calculate_routing_cost
+
+
+def plan_split_delivery(volume_kg: float,
+                        candidates: List[dict],
+                        is_perishable: bool = False,
+                        max_legs: int = config.SPLIT_DELIVERY_MAX_LEGS,
+                        min_leg_kg: float = config.SPLIT_DELIVERY_MIN_LEG_KG) -> dict:
+    """
+    Pack one surplus into the cheapest combination of recipients
+    
+    Greedy bin packing: while surplus is left, take the recipient with the
+    lowest routing cost per kg it can hold, unless one recipient could take
+    everything left for less than two more legs would cost.
+    
+    Args:
+        volume_kg: Surplus to place
+        candidates: Recipients that accept the food, each with distance_km
+            (nearest first; earlier ones win ties)
+        is_perishable: Whether food is perishable (urgent)
+        max_legs: Most recipients one surplus is split across
+        min_leg_kg: Recipients with less free capacity are skipped
+    
+    Returns:
+        Dict with legs (recipient, volume_kg, cost_score), allocated_kg,
+        unallocated_kg and cost_score (sum over legs)
+    """
+    pool = []
+    for recipient in candidates:
+        free = recipient.get("capacity_kg", 0) - recipient.get("current_load_kg", 0)
+        if free >= min_leg_kg:
+            pool.append((recipient, free))
+    
+    remaining = volume_kg
+    legs = []
+    
+    def leg_cost(entry) -> float:
+        recipient, free = entry
+        return calculate_routing_cost(
+            distance_km=recipient["distance_km"],
+            volume_kg=min(free, remaining),
+            capacity_kg=recipient.get("capacity_kg", 0),
+            is_perishable=is_perishable
+        )
+    
+    while remaining >= 0.01 and pool and len(legs) < max_legs:
+        costs = [leg_cost(entry) for entry in pool]
+        
+        # Most kg per unit of cost
+        best = min(range(len(pool)),
+                   key=lambda i: costs[i] / min(pool[i][1], remaining) if costs[i] > 0 else 0.0)
+        
+        # A recipient that takes everything left beats a partial leg plus
+        # at least one more
+        closing = [i for i in range(len(pool)) if pool[i][1] >= remaining]
+        if closing and pool[best][1] < remaining:
+            cheapest_closing = min(closing, key=lambda i: costs[i])
+            others = [costs[i] for i in range(len(pool)) if i != best]
+            if costs[cheapest_closing] <= costs[best] + min(others):
+                best = cheapest_closing
+        
+        # Partial legs round down to 10g, so a leg never exceeds free capacity
+        recipient, free = pool.pop(best)
+        if free >= remaining:
+            leg_kg = min(round(remaining, 2), free)
+        else:
+            leg_kg = min(math.floor(free * 100) / 100, free)
+        legs.append({
+            "recipient": recipient,
+            "volume_kg": leg_kg,
+            "cost_score": costs[best]
+        })
+        remaining -= leg_kg
+    
+    allocated = round(sum(leg["volume_kg"] for leg in legs), 2)
+    return {
+        "legs": legs,
+        "allocated_kg": allocated,
+        "unallocated_kg": round(max(volume_kg - allocated, 0), 2),
+        "cost_score": round(sum(leg["cost_score"] for leg in legs), 2)
+    }
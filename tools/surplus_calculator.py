@@ -1,7 +1,12 @@
 """
 Surplus prediction tool functions
 """
+from typing import Dict, Iterable
+
+import numpy as np
+
 import config
+from .rounding import exact_round
 
 def calculate_surplus_score(event: dict) -> float:
     """
@@ -70,6 +75,104 @@ def estimate_food_volume(event: dict, surplus_score: float) -> dict:
     }
 
 
+def encode_categories(values: Iterable, categories: Iterable[str]) -> np.ndarray:
+    """
+    Integer codes for string values against a fixed list of categories
+    
+    Args:
+        values: catering_type or weather values, one per event
+        categories: Known categories (e.g. config.CATERING_FACTORS keys)
+    
+    Returns:
+        Array of category indexes, -1 for values not in the list
+    """
+    values = np.asarray(values)
+    codes = np.full(values.shape, -1, dtype=np.intp)
+    for code, category in enumerate(categories):
+        codes[values == category] = code
+    return codes
+
+
+def _factor_table(factors: Dict[str, float], default: float) -> np.ndarray:
+    """Factors indexed by category code; code -1 picks the trailing default"""
+    return np.array(list(factors.values()) + [default], dtype=np.float64)
+
+
+def calculate_surplus_scores(attendees: np.ndarray,
+                             duration_hours: np.ndarray,
+                             catering_codes: np.ndarray,
+                             weather_codes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calculate_surplus_score over columns of events
+    
+    Args:
+        attendees: Attendee counts
+        duration_hours: Event durations
+        catering_codes: encode_categories(catering_types, config.CATERING_FACTORS)
+        weather_codes: encode_categories(weathers, config.WEATHER_FACTORS)
+    
+    Returns:
+        Scores between 0-1, identical to the scalar function's
+    """
+    attendees = np.asarray(attendees, dtype=np.float64)
+    duration_hours = np.asarray(duration_hours, dtype=np.float64)
+    catering_factor = _factor_table(config.CATERING_FACTORS, 0.5)[catering_codes]
+    weather_factor = _factor_table(config.WEATHER_FACTORS, 0.0)[weather_codes]
+    
+    # Same operations, in the same order, as the scalar formula
+    attendees_score = config.SURPLUS_WEIGHTS["attendees"] * (attendees / 1000)
+    duration_score = config.SURPLUS_WEIGHTS["duration"] * (duration_hours / 5)
+    catering_score = config.SURPLUS_WEIGHTS["catering_factor"] * catering_factor
+    weather_score = config.SURPLUS_WEIGHTS["weather_factor"] * weather_factor
+    
+    total_score = attendees_score + duration_score + catering_score - weather_score
+    
+    return np.minimum(np.maximum(total_score, 0.0), 1.0)
+
+
+def estimate_food_volumes(attendees: np.ndarray, surplus_scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Vectorized estimate_food_volume over columns of events
+    
+    Args:
+        attendees: Attendee counts
+        surplus_scores: Scores from calculate_surplus_scores
+    
+    Returns:
+        Dict of arrays: predicted_kg, category, urgency, score
+    """
+    attendees = np.asarray(attendees, dtype=np.float64)
+    surplus_scores = np.asarray(surplus_scores, dtype=np.float64)
+    
+    base_volume = (attendees * 0.5) * surplus_scores
+    
+    # One threshold search instead of a loop per event: find the band whose
+    # lower bound is the last one <= score, then check the score is below
+    # its upper bound (a score of exactly 1.0 is not, and stays "none")
+    names = list(config.SURPLUS_THRESHOLDS)
+    order = sorted(range(len(names)), key=lambda i: config.SURPLUS_THRESHOLDS[names[i]][0])
+    lows = np.array([config.SURPLUS_THRESHOLDS[names[i]][0] for i in order])
+    highs = np.array([config.SURPLUS_THRESHOLDS[names[i]][1] for i in order])
+    
+    band = np.searchsorted(lows, surplus_scores, side="right") - 1
+    in_band = (band >= 0) & (surplus_scores < highs[np.maximum(band, 0)])
+    
+    # Category and urgency looked up by band code (-1 = "none")
+    category_names = [names[i] for i in order] + ["none"]
+    urgency_names = [
+        {"perishable": "high", "non_perishable": "medium"}.get(name, "low")
+        for name in category_names
+    ]
+    codes = np.where(in_band, band, -1)
+    
+    return {
+        "predicted_kg": exact_round(base_volume, 2),
+        "category": np.array(category_names, dtype=object)[codes],
+        "urgency": np.array(urgency_names, dtype=object)[codes],
+        "score": exact_round(surplus_scores, 3)
+    }
+
+
 def get_weather_context(location: str, date: str) -> str:
     """
     Mock function to get weather context